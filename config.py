@@ -39,4 +39,13 @@ DATABASE_NAME = 'modbot.db'
 
 # Logging settings
 LOG_CHANNEL_NAME = 'mod-logs'
-STAFF_ALERT_CHANNEL = 'staff-alerts'
\ No newline at end of file
+STAFF_ALERT_CHANNEL = 'staff-alerts'
+# Unsent log rows older than this are not replayed on startup
+LOG_REPLAY_MAX_AGE_HOURS = int(os.getenv('LOG_REPLAY_MAX_AGE_HOURS', '24'))
+LOG_REPLAY_BATCH_SIZE = 100  # rows read and queued at a time
+
+# Raw aura history older than this many days is archived to compressed files and no
+# longer shown by `aura history`; off by default (0 keeps everything). Set e.g.
+# POINTS_HISTORY_RETENTION_DAYS=365 to enable. Per-day totals in points_daily are kept either way
+POINTS_HISTORY_RETENTION_DAYS = int(os.getenv('POINTS_HISTORY_RETENTION_DAYS', '0'))
+POINTS_HISTORY_ARCHIVE_DIR = os.getenv('POINTS_HISTORY_ARCHIVE_DIR', 'data/archive')
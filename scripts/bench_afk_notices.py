@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Outbound Discord calls for AFK notices in busy channels.
+Several channels each get bursts of messages pinging an AFK user (and the
+odd AFK user coming back), pushed through AFKSystem.handle_message with
+fake channels that count REST calls:
+
+  before  one send(delete_after=...) per notice: a send and a delete each
+  after   NoticeCoalescer: one send per channel and user, batched edits, one delete
+
+Lifetimes are scaled down so the run takes a few seconds.
+
+Usage: python scripts/bench_afk_notices.py [--channels 5] [--pings 200] [--rate 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and repo root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+import commands.afk as afk
+from utils.db_pool import close_all
+from utils.message_router import MessageRouter
+from utils.notice_coalescer import NoticeCoalescer
+
+GUILD_ID = 1
+AFK_USERS = [1, 2]
+SCALE = 0.1  # lifetimes and edit delay are multiplied by this
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.bot = False
+        self.display_name = f"user{user_id}"
+
+
+class FakeGuild:
+    id = GUILD_ID
+
+
+class FakeMessageHandle:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def edit(self, **kwargs):
+        self.channel.calls["edit"] += 1
+
+    async def delete(self):
+        self.channel.calls["delete"] += 1
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.calls = {"send": 0, "edit": 0, "delete": 0}
+
+    async def send(self, *args, delete_after=None, **kwargs):
+        self.calls["send"] += 1
+        if delete_after is not None:
+            # discord.py deletes it later with one more request
+            self.calls["delete"] += 1
+        return FakeMessageHandle(self)
+
+
+class FakeMessage:
+    def __init__(self, author, channel, mentions):
+        self.author = author
+        self.channel = channel
+        self.guild = FakeGuild()
+        self.mentions = mentions
+
+
+class FakeBot:
+    def __init__(self):
+        self.message_router = MessageRouter()
+
+
+class Uncoalesced:
+    """Previous behaviour: every notice is its own message with delete_after"""
+
+    def post(self, channel, key, embed, lifetime):
+        asyncio.create_task(channel.send(embed=embed, delete_after=lifetime))
+
+    async def close(self):
+        pass
+
+
+async def run(name: str, coalesce: bool, args):
+    rng = random.Random(3)
+    channels = [FakeChannel(100 + i) for i in range(args.channels)]
+    cog = afk.AFKSystem(FakeBot())
+    await cog.cog_load()
+    if coalesce:
+        cog.notices = NoticeCoalescer(afk.AFK_NOTICE_EDIT_DELAY * SCALE, name="bench")
+    else:
+        cog.notices = Uncoalesced()
+    for user_id in AFK_USERS:
+        await cog.set_afk(user_id, GUILD_ID, "benchmark")
+
+    started = time.perf_counter()
+    for i in range(args.pings):
+        channel = rng.choice(channels)
+        if i and i % 50 == 0:
+            # An AFK user comes back (and goes AFK again right away)
+            user_id = rng.choice(AFK_USERS)
+            await cog.handle_message(FakeMessage(FakeUser(user_id), channel, []))
+            await cog.set_afk(user_id, GUILD_ID, "benchmark")
+        target = FakeUser(rng.choice(AFK_USERS))
+        await cog.handle_message(FakeMessage(FakeUser(rng.randint(100, 5000)), channel, [target]))
+        await asyncio.sleep(1 / args.rate)
+    # Let the remaining notices expire
+    if coalesce:
+        while len(cog.notices):
+            await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    totals = {kind: sum(channel.calls[kind] for channel in channels) for kind in ("send", "edit", "delete")}
+    print(f"{name:<20} {sum(totals.values()):>6} REST calls   "
+          f"(send {totals['send']}, edit {totals['edit']}, delete {totals['delete']})   {elapsed:.1f}s")
+    await cog.cog_unload()
+    await close_all()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--channels", type=int, default=5)
+    parser.add_argument("--pings", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=20.0, help="pings per second across all channels")
+    args = parser.parse_args()
+
+    afk.AFK_NOTICE_LIFETIME *= SCALE
+    afk.WELCOME_BACK_LIFETIME *= SCALE
+    print(f"{args.pings} AFK pings over {args.channels} channels at {args.rate:.0f}/s\n")
+
+    cwd = os.getcwd()
+    try:
+        for name, coalesce in (("before (per notice)", False), ("after (coalesced)", True)):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                await run(name, coalesce, args)
+                os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
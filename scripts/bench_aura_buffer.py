@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Auto-thanks aura award throughput.
+Pushes N awards spread over a handful of staff members through
+StaffPoints.auto_give_point two ways:
+
+  before  one write transaction per award (the previous auto_give_point)
+  after   AuraAwardBuffer: journal append per award, one transaction per batch
+
+then checks both databases end up with the same points and history.
+
+Usage: python scripts/bench_aura_buffer.py [--awards 5000] [--staff 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and repo root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from utils.db_pool import close_all
+from commands.staff_points import StaffPoints
+
+GUILD_ID = 1
+BOT_USER_ID = 999
+
+
+class FakeUser:
+    id = BOT_USER_ID
+
+
+class FakeBot:
+    user = FakeUser()
+
+
+class FakePermissions:
+    administrator = True
+    manage_guild = True
+
+
+class FakeGuild:
+    id = GUILD_ID
+
+
+class FakeMember:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.guild = FakeGuild()
+        self.guild_permissions = FakePermissions()
+        self.roles = []
+
+
+async def give_point_unbuffered(cog: StaffPoints, member: FakeMember, reason: str):
+    """Previous behaviour: a transaction per award"""
+    async def apply(db):
+        await db.execute("""
+            INSERT OR IGNORE INTO staff_points (guild_id, user_id, points, total_earned, last_updated)
+            VALUES (?, ?, 0, 0, datetime('now'))
+        """, (member.guild.id, member.id))
+        await db.execute("""
+            UPDATE staff_points
+            SET points = points + 1, total_earned = total_earned + 1, last_updated = datetime('now')
+            WHERE guild_id = ? AND user_id = ?
+        """, (member.guild.id, member.id))
+        await db.execute("""
+            INSERT INTO points_history (guild_id, user_id, moderator_id, points_change, reason, action_type)
+            VALUES (?, ?, ?, 1, ?, 'auto_add')
+        """, (member.guild.id, member.id, BOT_USER_ID, reason))
+        return await cog._read_standing(db, member.guild.id, member.id)
+
+    cog.ranks.update(member.guild.id, member.id, *await cog.db.transaction(apply))
+
+
+async def measure(name: str, members, buffered: bool):
+    cog = StaffPoints(FakeBot())
+    await cog.cog_load()
+    started = time.perf_counter()
+    # Concurrent, like awards arriving from many messages at once
+    if buffered:
+        await asyncio.gather(*(cog.auto_give_point(member, "bench") for member in members))
+    else:
+        await asyncio.gather(*(give_point_unbuffered(cog, member, "bench") for member in members))
+    accepted = time.perf_counter() - started
+    await cog.cog_unload()
+    elapsed = time.perf_counter() - started
+    transactions = cog.aura_buffer.flushes if buffered else len(members)
+    print(f"{name:<22} {len(members) / accepted:>10.0f} awards/s accepted   "
+          f"{elapsed:.2f}s until written   {transactions} transaction(s)")
+    points = await cog.db.fetchall("SELECT user_id, points, total_earned FROM staff_points ORDER BY user_id")
+    history = await cog.db.fetchone("SELECT COUNT(*) FROM points_history")
+    await close_all()
+    return points, history[0]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--awards", type=int, default=5000)
+    parser.add_argument("--staff", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    members = [FakeMember(rng.randint(1, args.staff)) for _ in range(args.awards)]
+    print(f"{args.awards} awards over {args.staff} staff members\n")
+
+    results = []
+    cwd = os.getcwd()
+    try:
+        for name, buffered in (("before (per award)", False), ("after (buffered)", True)):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                results.append(await measure(name, members, buffered))
+                os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+
+    print(f"\nresults match: {results[0] == results[1]}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Aura rank and leaderboard lookups with a large staff_points table.
+Seeds a temporary staff_points.db with N staff rows in one guild, then
+compares the previous SQL (COUNT(*)+1 rank subquery, full leaderboard
+scan) with StaffPoints' in-memory AuraRankIndex, including the cost of
+keeping the index current through modify_points.
+
+Usage: python scripts/bench_aura_rank.py [--rows 50000] [--lookups 2000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and repo root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from utils.db_pool import close_all
+from commands.staff_points import StaffPoints, LEADERBOARD_PAGE_SIZE
+
+GUILD_ID = 1
+
+
+class FakeBot:
+    user = None
+
+    def get_user(self, user_id):
+        return None
+
+
+def seed(rows: int):
+    rng = random.Random(11)
+    Path("data").mkdir(exist_ok=True)
+    conn = sqlite3.connect("data/staff_points.db")
+    conn.execute("""
+        CREATE TABLE staff_points (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            points INTEGER DEFAULT 0,
+            total_earned INTEGER DEFAULT 0,
+            total_spent INTEGER DEFAULT 0,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(guild_id, user_id)
+        )
+    """)
+    values = []
+    for user_id in range(1, rows + 1):
+        points = int(rng.paretovariate(1.2)) - 1
+        values.append((GUILD_ID, user_id, points, points + rng.randint(0, 5)))
+    conn.executemany("INSERT INTO staff_points (guild_id, user_id, points, total_earned) VALUES (?, ?, ?, ?)", values)
+    conn.commit()
+    conn.close()
+
+
+async def timed(label: str, count: int, coro_factory):
+    started = time.perf_counter()
+    for i in range(count):
+        await coro_factory(i)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed / count * 1e6:>10.1f} us/op")
+
+
+async def run(rows: int, lookups: int):
+    seed(rows)
+    cog = StaffPoints(FakeBot())
+    started = time.perf_counter()
+    await cog.cog_load()
+    print(f"{rows} staff rows, index built in {time.perf_counter() - started:.2f}s (with table setup)\n")
+
+    rng = random.Random(5)
+    users = [rng.randint(1, rows) for _ in range(lookups)]
+
+    async def sql_rank(i):
+        await cog.db.fetchone("""
+            SELECT COUNT(*) + 1 as rank
+            FROM staff_points 
+            WHERE guild_id = ? AND points > (
+                SELECT COALESCE(points, 0) FROM staff_points 
+                WHERE guild_id = ? AND user_id = ?
+            )
+        """, (GUILD_ID, GUILD_ID, users[i]))
+
+    async def index_rank(i):
+        points, _ = cog.ranks.get(GUILD_ID, users[i])
+        cog.ranks.rank(GUILD_ID, points)
+
+    async def sql_leaderboard(i):
+        rows = await cog.db.fetchall("""
+            SELECT user_id, points, total_earned, last_updated
+            FROM staff_points 
+            WHERE guild_id = ? AND points > 0
+            GROUP BY user_id
+            ORDER BY points DESC, total_earned DESC
+        """, (GUILD_ID,))
+        seen = set()
+        for row in rows:
+            seen.add(row[0])
+
+    async def index_leaderboard(i):
+        cog.ranks.page(GUILD_ID, (i % 10) * LEADERBOARD_PAGE_SIZE, LEADERBOARD_PAGE_SIZE)
+        cog.ranks.totals(GUILD_ID)
+
+    async def modify(i):
+        await cog.modify_points(GUILD_ID, users[i], rng.choice((1, 1, 2, -1)), 0, "bench", "add")
+
+    await timed("rank: COUNT(*)+1 subquery", lookups, sql_rank)
+    await timed("rank: AuraRankIndex", lookups, index_rank)
+    await timed("leaderboard: full scan + dedupe", max(1, lookups // 50), sql_leaderboard)
+    await timed("leaderboard page: AuraRankIndex", lookups, index_leaderboard)
+    await timed("modify_points (+ index update)", max(1, lookups // 4), modify)
+
+    # The index must agree with the table after the writes
+    table = await cog.db.fetchall("SELECT user_id, points, total_earned FROM staff_points WHERE guild_id = ?", (GUILD_ID,))
+    mismatched = sum(1 for user_id, points, earned in table if cog.ranks.get(GUILD_ID, user_id) != (points, earned))
+    print(f"\nindex rows out of sync: {mismatched}")
+    await close_all()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            await run(args.rows, args.lookups)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: connect-per-query vs the shared db_pool layer.
+Runs the same shift-style workload (mostly reads, some writes) against a
+temporary database both ways and prints per-query latency and queries/sec.
+
+Usage: python scripts/bench_db_pool.py [--ops 4000] [--concurrency 32] [--write-ratio 0.2]
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiosqlite
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from utils.db_pool import Database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shifts (
+    shift_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    start DATETIME NOT NULL,
+    end DATETIME DEFAULT NULL,
+    start_note TEXT DEFAULT NULL,
+    end_note TEXT DEFAULT NULL,
+    paused BOOLEAN DEFAULT 0,
+    pause_time DATETIME DEFAULT NULL,
+    pause_intervals TEXT DEFAULT '[]'
+)
+"""
+READ_SQL = "SELECT * FROM shifts WHERE user_id = ? AND guild_id = ? AND end IS NULL"
+WRITE_SQL = "UPDATE shifts SET paused = ?, pause_time = ? WHERE shift_id = ?"
+USERS = 500
+GUILD_ID = 1
+
+
+def seed(path: Path):
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    conn.executemany(
+        "INSERT INTO shifts (guild_id, user_id, start) VALUES (?, ?, ?)",
+        [(GUILD_ID, uid, "2025-01-01T00:00:00+00:00") for uid in range(USERS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def make_ops(count: int, write_ratio: float):
+    rng = random.Random(42)
+    ops = []
+    for _ in range(count):
+        if rng.random() < write_ratio:
+            ops.append(("w", (rng.randint(0, 1), "2025-01-01T01:00:00+00:00", rng.randint(1, USERS))))
+        else:
+            ops.append(("r", (rng.randint(0, USERS - 1), GUILD_ID)))
+    return ops
+
+
+async def run_connect_per_query(path: Path, ops, concurrency: int):
+    """Old behaviour: open a fresh aiosqlite connection for every query"""
+    async def one(kind, params):
+        async with aiosqlite.connect(path) as db:
+            if kind == "r":
+                cursor = await db.execute(READ_SQL, params)
+                await cursor.fetchone()
+            else:
+                await db.execute(WRITE_SQL, params)
+                await db.commit()
+    return await drive(ops, concurrency, one)
+
+
+async def run_pool(path: Path, ops, concurrency: int):
+    """New behaviour: shared readers plus a single writer task"""
+    db = Database(path)
+    await db.open()
+
+    async def one(kind, params):
+        if kind == "r":
+            await db.fetchone(READ_SQL, params)
+        else:
+            await db.execute(WRITE_SQL, params)
+    try:
+        return await drive(ops, concurrency, one)
+    finally:
+        await db.close()
+
+
+async def drive(ops, concurrency: int, one):
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for op in ops:
+        queue.put_nowait(op)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            kind, params = queue.get_nowait()
+            t0 = time.perf_counter()
+            try:
+                await one(kind, params)
+            except sqlite3.OperationalError:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return latencies, elapsed, errors
+
+
+def report(name: str, latencies, elapsed: float, errors: int):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} {len(latencies) / elapsed:>10.0f} q/s   "
+          f"mean {statistics.mean(latencies) * 1000:>7.2f} ms   "
+          f"p50 {statistics.median(latencies) * 1000:>7.2f} ms   "
+          f"p95 {p95 * 1000:>7.2f} ms   errors {errors}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    ops = make_ops(args.ops, args.write_ratio)
+    print(f"{args.ops} queries, {args.concurrency} concurrent tasks, {args.write_ratio:.0%} writes\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        before = Path(tmp) / "before.db"
+        after = Path(tmp) / "after.db"
+        seed(before)
+        seed(after)
+        report("before (connect/query)", *await run_connect_per_query(before, ops, args.concurrency))
+        report("after (db_pool)", *await run_pool(after, ops, args.concurrency))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Server lockdown and unlockdown against a fake Discord REST stand-in.
+Each permission edit takes --latency seconds, and requests are spaced to
+--global-rate per second like Discord's global limit:
+
+  before  one channel at a time; unlockdown resets Send Messages to "inherit"
+  after   LockdownEngine: a worker pool, a checkpoint of the original overwrites, exact restore
+
+The channels start with a mix of overwrites (none, Send Messages allowed or
+denied, other permissions only). A third run interrupts the lockdown partway,
+resumes it, and then unlocks. Each run reports whether every channel ended up
+exactly as it started.
+
+Usage: python scripts/bench_lockdown.py [--channels 300] [--latency 0.05] [--global-rate 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+import discord
+
+from utils.db_pool import close_all, get_database
+from utils.lockdown import LockdownEngine
+
+
+class FakeREST:
+    def __init__(self, latency: float, rate: float):
+        self.latency = latency
+        self.spacing = 1 / rate
+        self.next_slot = 0.0
+        self.requests = 0
+
+    async def call(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.spacing
+        await asyncio.sleep(slot - now + self.latency)
+        self.requests += 1
+
+
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, rest: FakeREST):
+        self.id = channel_id
+        self.rest = rest
+        self._overwrites = {}
+
+    @property
+    def overwrites(self):
+        return dict(self._overwrites)
+
+    def overwrites_for(self, role) -> discord.PermissionOverwrite:
+        overwrite = self._overwrites.get(role)
+        return discord.PermissionOverwrite.from_pair(*overwrite.pair()) if overwrite else discord.PermissionOverwrite()
+
+    async def set_permissions(self, role, *, overwrite=None, reason=None):
+        await self.rest.call()
+        if overwrite is None:
+            self._overwrites.pop(role, None)
+        else:
+            self._overwrites[role] = discord.PermissionOverwrite.from_pair(*overwrite.pair())
+
+
+class FakeGuild:
+    def __init__(self, count: int, rest: FakeREST):
+        self.id = 1
+        self.default_role = FakeRole(1)
+        self.text_channels = [FakeChannel(100 + i, rest) for i in range(count)]
+        self._by_id = {channel.id: channel for channel in self.text_channels}
+        for i, channel in enumerate(self.text_channels):
+            kind = i % 4
+            if kind == 1:
+                channel._overwrites[self.default_role] = discord.PermissionOverwrite(send_messages=False)
+            elif kind == 2:
+                channel._overwrites[self.default_role] = discord.PermissionOverwrite(send_messages=True)
+            elif kind == 3:
+                channel._overwrites[self.default_role] = discord.PermissionOverwrite(add_reactions=False)
+
+    def get_channel(self, channel_id):
+        return self._by_id.get(channel_id)
+
+    def state(self):
+        return {channel.id: (channel._overwrites[self.default_role].pair() if self.default_role in channel._overwrites else None)
+                for channel in self.text_channels}
+
+
+async def sequential(guild: FakeGuild) -> float:
+    """The loops ModCog used before LockdownEngine; returns when the lock half finished"""
+    for channel in guild.text_channels:
+        overwrites = channel.overwrites_for(guild.default_role)
+        overwrites.send_messages = False
+        await channel.set_permissions(guild.default_role, overwrite=overwrites)
+    lock_done = time.perf_counter()
+    for channel in guild.text_channels:
+        overwrites = channel.overwrites_for(guild.default_role)
+        overwrites.send_messages = None
+        await channel.set_permissions(guild.default_role, overwrite=overwrites)
+    return lock_done
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--channels", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per REST request")
+    parser.add_argument("--global-rate", type=float, default=50, help="requests per second")
+    args = parser.parse_args()
+
+    print(f"{args.channels} channels, {args.latency * 1000:.0f} ms per edit, {args.global_rate:.0f} requests/s\n")
+
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)
+    db = get_database(Path(tmp) / "lockdown.db")
+    engine = LockdownEngine(db)
+    await engine.setup()
+
+    # before
+    rest = FakeREST(args.latency, args.global_rate)
+    guild = FakeGuild(args.channels, rest)
+    original = guild.state()
+    start = time.perf_counter()
+    lock_done = await sequential(guild)
+    end = time.perf_counter()
+    print(f"{'before (sequential)':<22} lock {lock_done - start:6.2f}s   unlock {end - lock_done:6.2f}s   "
+          f"{rest.requests} requests   exact restore: {guild.state() == original}")
+
+    # after
+    rest = FakeREST(args.latency, args.global_rate)
+    guild = FakeGuild(args.channels, rest)
+    start = time.perf_counter()
+    await engine.lock(guild, moderator_id=0, reason="bench")
+    lock_done = time.perf_counter()
+    await engine.unlock(guild, reason="bench")
+    end = time.perf_counter()
+    print(f"{'after (LockdownEngine)':<22} lock {lock_done - start:6.2f}s   unlock {end - lock_done:6.2f}s   "
+          f"{rest.requests} requests   exact restore: {guild.state() == original}")
+
+    # interrupted lock, resumed, then unlocked
+    rest = FakeREST(args.latency, args.global_rate)
+    guild = FakeGuild(args.channels, rest)
+    task = asyncio.create_task(engine.lock(guild, moderator_id=0, reason="bench"))
+    while rest.requests < args.channels // 2:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    interrupted_at = rest.requests
+    result = await engine.lock(guild, moderator_id=0, reason="bench")
+    locked = all(channel.overwrites_for(guild.default_role).send_messages is False for channel in guild.text_channels)
+    await engine.unlock(guild, reason="bench")
+    print(f"{'interrupted + resumed':<22} stopped after {interrupted_at} edits, resumed {result.total} "
+          f"(resumed={result.resumed}), all locked: {locked}   exact restore: {guild.state() == original}")
+
+    await close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
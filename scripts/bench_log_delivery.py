@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Log delivery drain against a fake REST channel.
+Queues a backlog of log events while the bot is "not ready", then lets
+LoggingCog deliver them to fake member/mod log channels. Each fake channel
+enforces a Discord-style bucket (N requests per window, waiting like
+discord.py does when the bucket is empty), so the run shows how many
+requests the backlog costs and how long it takes to drain.
+
+Usage: python scripts/bench_log_delivery.py [--events 5000] [--limit 5] [--window 5.0] [--speedup 100]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and repo root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from utils.db_pool import close_all
+from commands.logging import (
+    LoggingCog, MEMBER_LOGS_CHANNEL, MOD_LOGS_CHANNEL, EMBEDS_PER_MESSAGE, EMBED_CHARS_PER_MESSAGE,
+)
+
+LEGACY_SLEEP = 0.5
+
+
+class FakeChannel:
+    """Message endpoint with a fixed-window rate-limit bucket"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = 0.0
+        self.requests = 0
+        self.embeds = 0
+
+    async def send(self, embeds):
+        assert 1 <= len(embeds) <= EMBEDS_PER_MESSAGE, "too many embeds in one message"
+        assert sum(len(e) for e in embeds) <= EMBED_CHARS_PER_MESSAGE, "message over the embed character limit"
+        now = time.perf_counter()
+        if now >= self.reset_at:
+            self.remaining, self.reset_at = self.limit, now + self.window
+        if self.remaining == 0:
+            await asyncio.sleep(self.reset_at - now)
+            self.remaining, self.reset_at = self.limit, time.perf_counter() + self.window
+        self.remaining -= 1
+        self.requests += 1
+        self.embeds += len(embeds)
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+    def __str__(self):
+        return f"user{self.id}"
+
+
+class FakeBot:
+    def __init__(self, channels):
+        self.channels = channels
+        self.ready = asyncio.Event()
+
+    async def wait_until_ready(self):
+        await self.ready.wait()
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_user(self, user_id):
+        return FakeUser(user_id)
+
+
+async def drain(events: int, limit: int, window: float):
+    channels = {MEMBER_LOGS_CHANNEL: FakeChannel(limit, window), MOD_LOGS_CHANNEL: FakeChannel(limit, window)}
+    bot = FakeBot(channels)
+    cog = LoggingCog(bot)
+    await cog.setup_database()
+
+    # Build the backlog: mostly joins/leaves with some moderation events
+    kinds = ("MEMBER_JOIN", "MEMBER_LEAVE", "MEMBER_JOIN", "BAN", "TIMEOUT")
+    await asyncio.gather(*(
+        cog.log_event(kinds[i % len(kinds)], user_id=i, guild_id=1, moderator_id=7, details=f"event {i}")
+        for i in range(events)
+    ))
+    backlog = cog.get_delivery_stats()
+
+    started = time.perf_counter()
+    bot.ready.set()
+    for queue in cog.log_queues.values():
+        await queue.join()
+    elapsed = time.perf_counter() - started
+    stats = cog.get_delivery_stats()
+
+    await cog.cog_unload()
+    unsent = (await cog.db.fetchone("SELECT COUNT(*) FROM bot_logs WHERE sent_to_discord = 0"))[0]
+    await close_all()
+    return channels, backlog, stats, elapsed, unsent
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=5, help="requests per bucket window")
+    parser.add_argument("--window", type=float, default=5.0, help="bucket window in seconds")
+    parser.add_argument("--speedup", type=float, default=100.0, help="compress the bucket window by this factor")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            channels, backlog, stats, elapsed, unsent = await drain(
+                args.events, args.limit, args.window / args.speedup
+            )
+        finally:
+            os.chdir(cwd)
+
+    requests = sum(c.requests for c in channels.values())
+    delivered = sum(c.embeds for c in channels.values())
+    print(f"Backlog of {args.events} events, bucket {args.limit} requests / {args.window:g}s per channel\n")
+    for dest in backlog:
+        print(f"{dest:<7} queued {backlog[dest]['depth']:>5}   sent {stats[dest]['embeds']:>5.0f} embeds "
+              f"in {stats[dest]['messages']:>4.0f} messages   depth after {stats[dest]['depth']}")
+    print(f"\nembeds delivered   {delivered} / {args.events}")
+    print(f"REST requests      {requests}")
+    print(f"unsent rows        {unsent}")
+    print(f"drain time         {elapsed:.2f}s ({elapsed * args.speedup:.0f}s at real bucket speed)")
+
+    # Previous pipeline: one request per event plus a fixed 0.5s sleep, one channel at a time
+    legacy = max(args.events * LEGACY_SLEEP, args.events / args.limit * args.window)
+    print(f"legacy estimate    {args.events} requests, {legacy:.0f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
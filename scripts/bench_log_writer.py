@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bot_logs writes, one transaction per event vs group commit.
+Submits N log events at once (like a burst of gateway events) and then
+acknowledges them all, once with a commit per row and once through the
+BatchWriter used by LoggingCog. Prints events/sec for inserts and acks.
+
+Usage: python scripts/bench_log_writer.py [--events 5000] [--batch 200] [--delay-ms 5]
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add src and repo root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from utils.db_pool import BatchWriter, Database
+from commands.logging import INSERT_LOG_SQL, _insert_log_rows, _mark_logs_sent
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS bot_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT,
+        event_type TEXT,
+        guild_id INTEGER,
+        user_id INTEGER,
+        moderator_id INTEGER,
+        channel_id INTEGER,
+        details TEXT,
+        sent_to_discord BOOLEAN DEFAULT 0
+    )
+'''
+
+
+def make_rows(count: int):
+    now = datetime.now(timezone.utc).isoformat()
+    return [(now, "MEMBER_JOIN", 1, i, None, None, f"member{i} joined the server") for i in range(count)]
+
+
+async def run_per_row(db: Database, rows):
+    """Previous behaviour: one INSERT and one UPDATE transaction per event"""
+    started = time.perf_counter()
+    ids = await asyncio.gather(*(db.execute(INSERT_LOG_SQL, row) for row in rows))
+    inserted = time.perf_counter()
+    await asyncio.gather(*(db.execute("UPDATE bot_logs SET sent_to_discord = 1 WHERE id = ?", (i,)) for i in ids))
+    acked = time.perf_counter()
+    return ids, inserted - started, acked - inserted
+
+
+async def run_group_commit(db: Database, rows, batch: int, delay: float):
+    """LoggingCog behaviour: inserts and acks go through BatchWriter"""
+    log_writer = BatchWriter(db, _insert_log_rows, batch, delay, name="bot_logs")
+    ack_writer = BatchWriter(db, _mark_logs_sent, batch, delay, name="bot_logs-ack")
+    started = time.perf_counter()
+    ids = await asyncio.gather(*(log_writer.submit(row) for row in rows))
+    inserted = time.perf_counter()
+    await asyncio.gather(*(ack_writer.submit(i) for i in ids))
+    acked = time.perf_counter()
+    await log_writer.close()
+    await ack_writer.close()
+    return ids, inserted - started, acked - inserted
+
+
+async def verify(db: Database, ids, rows):
+    """Every event got its own id and every row is marked as sent"""
+    assert len(set(ids)) == len(rows), "duplicate log ids"
+    stored = await db.fetchall("SELECT id, user_id, sent_to_discord FROM bot_logs ORDER BY id")
+    assert [r[0] for r in stored] == sorted(ids), "ids do not match stored rows"
+    by_id = {r[0]: r[1] for r in stored}
+    assert all(by_id[log_id] == row[3] for log_id, row in zip(ids, rows)), "id returned for the wrong row"
+    assert all(r[2] == 1 for r in stored), "unacknowledged rows"
+
+
+def report(name: str, events: int, insert_s: float, ack_s: float):
+    print(f"{name:<22} inserts {events / insert_s:>9.0f} events/s   acks {events / ack_s:>9.0f} events/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    rows = make_rows(args.events)
+    print(f"{args.events} log events, batch {args.batch}, delay {args.delay_ms} ms\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, runner in (
+            ("before (txn per row)", lambda db: run_per_row(db, rows)),
+            ("after (group commit)", lambda db: run_group_commit(db, rows, args.batch, args.delay_ms / 1000)),
+        ):
+            db = Database(Path(tmp) / f"{name.split()[0]}.db")
+            await db.execute(SCHEMA)
+            ids, insert_s, ack_s = await runner(db)
+            await verify(db, ids, rows)
+            report(name, args.events, insert_s, ack_s)
+            await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
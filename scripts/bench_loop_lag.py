@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Event loop lag probe under a burst of member events.
+Dispatches N on_member_join events to LoggingCog at once (one task per event,
+like the gateway does) and reports loop lag with the legacy blocking sqlite3
+insert and with the async storage facade.
+
+Usage: python scripts/bench_loop_lag.py [--events 1000]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and repo root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from utils.db_pool import close_all
+from utils.loop_lag import LoopLagProbe
+from commands.logging import LoggingCog
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, member_id: int, guild: FakeGuild):
+        self.id = member_id
+        self.guild = guild
+
+    def __str__(self):
+        return f"member{self.id}"
+
+
+class FakeBot:
+    """Never becomes ready, so only the database path of log_event is measured"""
+
+    async def wait_until_ready(self):
+        await asyncio.Event().wait()
+
+    def get_channel(self, channel_id):
+        return None
+
+
+class LegacyLoggingCog(LoggingCog):
+    """LoggingCog with the old blocking sqlite3 insert, for comparison"""
+
+    async def _store_log_in_db(self, timestamp, event_type, user_id, guild_id, moderator_id, channel_id, details):
+        conn = sqlite3.connect("modbot.db")
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO bot_logs
+            (timestamp, event_type, guild_id, user_id, moderator_id, channel_id, details)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (timestamp.isoformat(), event_type, guild_id, user_id, moderator_id, channel_id, details))
+        log_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return log_id
+
+
+async def run_burst(cog_class, events: int):
+    cog = cog_class(FakeBot())
+    await cog.setup_database()
+    guild = FakeGuild(1)
+    probe = LoopLagProbe(interval=0.005, window=100_000, warn_ms=float("inf"))
+    probe.start()
+    await asyncio.sleep(0.05)
+    probe.reset()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(asyncio.create_task(cog.on_member_join(FakeMember(i, guild))) for i in range(events)))
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.02)
+
+    probe.stop()
+    await cog.cog_unload()
+    await close_all()
+    return elapsed, probe.snapshot()
+
+
+def report(name: str, events: int, elapsed: float, lag):
+    print(f"{name:<18} {events / elapsed:>8.0f} events/s   "
+          f"loop lag mean {lag['mean_ms']:>7.2f} ms   p99 {lag['p99_ms']:>8.2f} ms   max {lag['max_ms']:>8.2f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"Burst of {args.events} member join events\n")
+    cwd = os.getcwd()
+    try:
+        for name, cog_class in (("before (sqlite3)", LegacyLoggingCog), ("after (async db)", LoggingCog)):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                report(name, args.events, *await run_burst(cog_class, args.events))
+                os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
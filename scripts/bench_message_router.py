@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Synthetic on_message throughput with all message handlers loaded.
+Loads the six cogs that handle messages (AFK, Appeals, MemberEvents,
+MessageHandler, AutoBanChannel, AdvancedModeration) against a fake bot and
+pushes a mix of guild messages through them two ways:
+
+  before  one task per cog listener per message, each cog classifying the
+          message itself (what discord.py did with six on_message listeners)
+  after   one MessageRouter.dispatch task per message
+
+Usage: python scripts/bench_message_router.py [--messages 50000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and repo root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from utils.db_pool import close_all
+from utils.message_router import MessageRouter
+from commands.afk import AFKSystem
+from commands.appeals import Appeals
+from commands.spam_catch import AutoBanChannel
+from commands.advanced_moderation import AdvancedModeration
+from events.member_events import MemberEvents, WELCOME_CHANNEL_ID
+from events.message_handler import MessageHandler
+
+GUILD_ID = 1
+CHANNELS = [100 + i for i in range(20)] + [WELCOME_CHANNEL_ID]
+AFK_USERS = range(1, 6)
+
+
+class FakePermissions:
+    administrator = False
+
+
+class FakeUser:
+    def __init__(self, user_id: int, bot: bool = False):
+        self.id = user_id
+        self.bot = bot
+        self.display_name = f"user{user_id}"
+        self.guild_permissions = FakePermissions()
+        self.roles = []
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+
+    async def send(self, *args, **kwargs):
+        return None
+
+
+class FakeGuild:
+    id = GUILD_ID
+    owner_id = 0
+
+    def get_member(self, user_id):
+        return FakeUser(user_id)
+
+
+class FakeMessage:
+    reference = None
+
+    def __init__(self, author, channel, content, mentions):
+        self.author = author
+        self.channel = channel
+        self.guild = FakeGuild()
+        self.content = content
+        self.mentions = mentions
+
+
+class FakeBot:
+    def __init__(self):
+        self.message_router = MessageRouter()
+        self.guilds = []
+        self.user = FakeUser(0, bot=True)
+
+    def get_cog(self, name):
+        return None
+
+    def get_channel(self, channel_id):
+        return None
+
+    def is_closed(self):
+        return False
+
+    async def wait_until_ready(self):
+        return None
+
+
+def make_messages(count: int):
+    """Mostly plain chatter, plus mentions, bot messages and some 'thanks'"""
+    rng = random.Random(7)
+    channels = {cid: FakeChannel(cid) for cid in CHANNELS}
+    messages = []
+    for _ in range(count):
+        roll = rng.random()
+        author = FakeUser(rng.randint(100, 5000), bot=roll < 0.1)
+        mentions = []
+        content = "just chatting about code"
+        if 0.1 <= roll < 0.3:
+            mentions = [FakeUser(rng.randint(100, 5000))]
+            content = f"hey {mentions[0].mention}"
+        elif 0.3 <= roll < 0.35:
+            content = "thanks for the help!"
+        elif 0.35 <= roll < 0.36:
+            mentions = [FakeUser(rng.choice(AFK_USERS))]
+        messages.append(FakeMessage(author, channels[rng.choice(CHANNELS)], content, mentions))
+    return messages
+
+
+async def load_cogs(bot: FakeBot):
+    cogs = [AFKSystem(bot), Appeals(bot), MemberEvents(bot), MessageHandler(bot),
+            AutoBanChannel(bot), AdvancedModeration(bot)]
+    for cog in cogs:
+        await cog.cog_load()
+    afk = cogs[0]
+    for user_id in AFK_USERS:
+        await afk.set_afk(user_id, GUILD_ID, "benchmark")
+    return cogs
+
+
+async def unload_cogs(cogs):
+    for cog in cogs:
+        result = cog.cog_unload()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+async def run_listeners(bot: FakeBot, messages):
+    """Previous behaviour: every cog's listener runs for every message"""
+    router = bot.message_router
+    routes = list(router._routes.values())
+
+    async def listener(route, message):
+        # Each listener repeats the bot/DM/channel/content checks on its own
+        if route.interest.matches(router.classify(message)):
+            await route.handler(message)
+
+    tasks = []
+    for message in messages:
+        for route in routes:
+            tasks.append(asyncio.create_task(listener(route, message)))
+    await asyncio.gather(*tasks)
+
+
+async def run_router(bot: FakeBot, messages):
+    """New behaviour: one dispatch per message"""
+    await asyncio.gather(*(asyncio.create_task(bot.message_router.dispatch(message)) for message in messages))
+
+
+async def measure(name: str, runner, messages):
+    bot = FakeBot()
+    cogs = await load_cogs(bot)
+    started = time.perf_counter()
+    await runner(bot, messages)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<22} {len(messages) / elapsed:>10.0f} messages/s   ({elapsed:.2f}s)")
+    if runner is run_router:
+        for handler, stats in bot.message_router.stats().items():
+            avg = stats.total_ms / stats.calls if stats.calls else 0.0
+            print(f"    {handler:<20} {stats.calls:>7} calls   avg {avg:.3f} ms   max {stats.max_ms:.2f} ms")
+    await unload_cogs(cogs)
+    await close_all()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=50000)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    print(f"{args.messages} synthetic guild messages, 6 message handlers loaded\n")
+    cwd = os.getcwd()
+    try:
+        for name, runner in (("before (6 listeners)", run_listeners), ("after (router)", run_router)):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                await measure(name, runner, messages)
+                os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
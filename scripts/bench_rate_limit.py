@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Memory held by moderation rate limiting as distinct keys pile up.
+Every event comes from a new (user, command) key, on a fake clock that
+advances ``1/rate`` seconds per event, with the tempban limit (3 per 300s):
+
+  before  defaultdict(list) of timestamps, trimmed only when the same key acts again
+  after   RateLimiter: expiries of the last 3 events per key, idle keys evicted on each check
+
+Memory is measured with tracemalloc at a few checkpoints; the throughput
+line is timed separately with tracemalloc off.
+
+Usage: python scripts/bench_rate_limit.py [--keys 1000000] [--rate 100]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+# Add src to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from utils.rate_limit import RateLimiter
+
+MAX_USES, WINDOW = 3, 300
+CHECKPOINTS = 4
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_legacy(clock: FakeClock):
+    """The list-per-key check AdvancedModeration used before RateLimiter"""
+    cooldowns = defaultdict(list)
+
+    def check(key) -> bool:
+        now = clock()
+        uses = cooldowns[key]
+        uses[:] = [t for t in uses if now - t < WINDOW]
+        if len(uses) >= MAX_USES:
+            return False
+        uses.append(now)
+        return True
+
+    return check, cooldowns
+
+
+def make_limiter(clock: FakeClock):
+    limiter = RateLimiter(MAX_USES, WINDOW, clock=clock)
+    return limiter.allow, limiter
+
+
+def run(factory, keys: int, rate: float, measure: bool):
+    clock = FakeClock()
+    check, state = factory(clock)
+    step = 1 / rate
+    every = max(1, keys // CHECKPOINTS)
+    samples = []
+    if measure:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(keys):
+        clock.now += step
+        check((i, "tempban"))
+        if measure and (i + 1) % every == 0:
+            samples.append((i + 1, len(state), tracemalloc.get_traced_memory()[0]))
+    elapsed = time.perf_counter() - start
+    if measure:
+        tracemalloc.stop()
+    return elapsed, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=1_000_000, help="distinct keys (one event each)")
+    parser.add_argument("--rate", type=float, default=100, help="events per fake second")
+    args = parser.parse_args()
+
+    # One use holds a key for WINDOW seconds
+    held = min(args.keys, int(WINDOW * args.rate))
+    print(f"{args.keys} distinct keys at {args.rate:.0f}/s, {MAX_USES} uses per {WINDOW}s; ~{held} keys held at a time\n")
+    for name, factory in (("before (lists)", make_legacy), ("after (RateLimiter)", make_limiter)):
+        elapsed, _ = run(factory, args.keys, args.rate, measure=False)
+        _, samples = run(factory, args.keys, args.rate, measure=True)
+        print(f"{name:<20} {args.keys / elapsed:>10.0f} checks/s")
+        for seen, live, memory in samples:
+            print(f"  after {seen:>8} keys: {live:>8} tracked   {memory / 1024 / 1024:>7.1f} MiB")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Shift row decoding, legacy ISO strings vs. epoch integers.
+Builds a staff_shifts.db with N legacy rows (ISO timestamps, JSON pause
+intervals), times Shift.from_row on them, migrates the file to epoch
+columns and the shift_pauses table with migrate_staff_shifts_db and
+times the decode again. Also
+prints the query plan of the history query to show it uses an index.
+
+Usage: python scripts/bench_shift_decode.py [--rows 100000]
+"""
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add src and repo root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from utils.database_init import migrate_staff_shifts_db
+from commands.staff_shifts import Shift
+
+LEGACY_TABLE_SQL = '''
+    CREATE TABLE shifts (
+        shift_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        start DATETIME NOT NULL,
+        end DATETIME DEFAULT NULL,
+        start_note TEXT DEFAULT NULL,
+        end_note TEXT DEFAULT NULL,
+        paused BOOLEAN DEFAULT 0,
+        pause_time DATETIME DEFAULT NULL,
+        pause_intervals TEXT DEFAULT '[]'
+    )
+'''
+
+
+def build_legacy_db(path: str, count: int):
+    """Rows as the bot wrote them before the migration"""
+    rng = random.Random(3)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for _ in range(count):
+        start = now - timedelta(seconds=rng.randint(0, 90 * 86400))
+        end = start + timedelta(seconds=rng.randint(600, 8 * 3600))
+        intervals = []
+        if rng.random() < 0.3:
+            pause = start + timedelta(seconds=rng.randint(60, 600))
+            intervals.append((pause.isoformat(), (pause + timedelta(seconds=rng.randint(60, 900))).isoformat()))
+        rows.append((rng.randint(1, 3), rng.randint(1, 200), start.isoformat(), end.isoformat(),
+                     "start", "end", 0, None, json.dumps(intervals)))
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_TABLE_SQL)
+    conn.executemany(
+        "INSERT INTO shifts (guild_id, user_id, start, end, start_note, end_note, paused, pause_time, pause_intervals) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def time_decode(path: str):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT * FROM shifts").fetchall()
+    conn.close()
+    started = time.perf_counter()
+    shifts = [Shift.from_row(row) for row in rows]
+    return shifts, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "staff_shifts.db")
+        build_legacy_db(path, args.rows)
+
+        legacy, legacy_time = time_decode(path)
+        started = time.perf_counter()
+        migrate_staff_shifts_db(path)
+        migrate_time = time.perf_counter() - started
+        epoch, epoch_time = time_decode(path)
+
+        mismatched = sum(
+            1 for a, b in zip(legacy, epoch)
+            if (a.shift_id, int(a.start.timestamp()), int(a.end.timestamp()))
+            != (b.shift_id, int(b.start.timestamp()), int(b.end.timestamp()))
+        )
+
+        conn = sqlite3.connect(path)
+        pauses = conn.execute("SELECT COUNT(*) FROM shift_pauses").fetchone()[0]
+        legacy_pauses = sum(len(shift.pause_intervals) for shift in legacy)
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM shifts WHERE guild_id = ? AND user_id = ? AND start >= ? "
+            "ORDER BY start DESC LIMIT ?", (1, 1, 0, 20)
+        ).fetchall()
+        conn.close()
+
+    print(f"{args.rows} shift rows\n")
+    print(f"legacy ISO decode   {legacy_time:.3f}s   {args.rows / legacy_time:>10.0f} rows/s")
+    print(f"epoch decode        {epoch_time:.3f}s   {args.rows / epoch_time:>10.0f} rows/s")
+    print(f"speedup             {legacy_time / epoch_time:.1f}x")
+    print(f"migration           {migrate_time:.3f}s")
+    print(f"mismatched rows     {mismatched}")
+    print(f"pauses moved        {pauses} / {legacy_pauses}")
+    print("\nhistory query plan:")
+    for step in plan:
+        print(f"    {step[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 """
-Database migration script to add pause functionality columns to staff_shifts.db
-Run this once to update your existing database schema.
+Database migration script for staff_shifts.db
+Adds the pause columns if missing and converts shift timestamps from ISO
+strings to integer epoch seconds. The bot runs the same migration on
+startup; run this by hand to migrate without starting the bot.
 """
 import sqlite3
 import sys
 from pathlib import Path
 
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from utils.database_init import migrate_staff_shifts_db
+
 def migrate_database():
     db_path = Path("data/staff_shifts.db")
     
@@ -19,48 +26,22 @@ def migrate_database():
     
     try:
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Check if columns already exist
-        cursor.execute("PRAGMA table_info(shifts)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
+        columns = [f"{column[1]} {column[2]}" for column in conn.execute("PRAGMA table_info(shifts)")]
+        conn.close()
         print(f"Current columns: {', '.join(columns)}")
         
-        columns_to_add = []
-        if 'paused' not in columns:
-            columns_to_add.append(('paused', 'BOOLEAN DEFAULT 0'))
-        if 'pause_time' not in columns:
-            columns_to_add.append(('pause_time', 'DATETIME DEFAULT NULL'))
-        if 'pause_intervals' not in columns:
-            columns_to_add.append(('pause_intervals', "TEXT DEFAULT '[]'"))
+        converted = migrate_staff_shifts_db(str(db_path))
         
-        if not columns_to_add:
+        conn = sqlite3.connect(db_path)
+        new_columns = [f"{column[1]} {column[2]}" for column in conn.execute("PRAGMA table_info(shifts)")]
+        conn.close()
+        if new_columns == columns:
             print("✅ Database is already up to date! No migration needed.")
-            conn.close()
             return
         
-        # Add missing columns
-        for column_name, column_def in columns_to_add:
-            try:
-                cursor.execute(f"ALTER TABLE shifts ADD COLUMN {column_name} {column_def}")
-                print(f"✅ Added column: {column_name}")
-            except sqlite3.OperationalError as e:
-                if "duplicate column name" in str(e):
-                    print(f"⚠️  Column {column_name} already exists, skipping")
-                else:
-                    raise
-        
-        conn.commit()
-        
-        # Verify the migration
-        cursor.execute("PRAGMA table_info(shifts)")
-        new_columns = [column[1] for column in cursor.fetchall()]
-        print(f"\n✅ Migration complete!")
+        print(f"\n✅ Migration complete! Converted {converted} shift(s)")
         print(f"Updated columns: {', '.join(new_columns)}")
         
-        conn.close()
-        
         print("\n🎉 Database migration successful!")
         print("You can now restart your bot.")
         
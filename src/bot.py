@@ -68,9 +68,22 @@ class CodeVerseBot(commands.Bot):
         super().__init__(command_prefix='?', intents=intents, help_command=None)
         self.start_time = datetime.now(timezone.utc)
         self.instance_id = INSTANCE_ID
+        self.loop_lag = None
+        # Recent audit log entries, used by ban/unban/update handlers to find the moderator
+        from utils.audit_index import AuditLogIndex
+        self.audit_index = AuditLogIndex()
+        # Single on_message listener that dispatches to cogs by declared interest
+        from utils.message_router import MessageRouter
+        self.message_router = MessageRouter()
+        self.add_listener(self.message_router.dispatch, 'on_message')
 
     async def setup_hook(self):
         """Async setup tasks (load cogs, etc.)."""
+        # Sample event loop lag for the lifetime of the bot (shown in ?diag)
+        from utils.loop_lag import LoopLagProbe
+        self.loop_lag = LoopLagProbe()
+        self.loop_lag.start()
+
         # CRITICAL: Restore data BEFORE initializing databases or loading cogs
         try:
             from utils.data_persistence import startup_restore
@@ -116,6 +129,22 @@ class CodeVerseBot(commands.Bot):
         except Exception as e:
             logger.error(f"❌ Failed to connect SAM logging bridge: {e}")
 
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        """Feed the audit log index (cogs still receive the event through their listeners)"""
+        self.audit_index.add(entry)
+
+    async def close(self):
+        """Shut down cogs first, then drain and close shared database connections."""
+        await super().close()
+        if self.loop_lag:
+            self.loop_lag.stop()
+        try:
+            from utils.db_pool import close_all
+            await close_all()
+            logger.info("🗄️ Database connections closed")
+        except Exception as e:
+            logger.error(f"❌ Failed to close database connections: {e}")
+
 bot = CodeVerseBot()
 
 @bot.event
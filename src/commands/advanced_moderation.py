@@ -3,19 +3,30 @@ from discord.ext import commands
 from discord import app_commands
 import asyncio
 import time
-from collections import defaultdict
 from datetime import datetime, timedelta
 import sqlite3
 from typing import Optional, List
 import re
 
+from utils.database import get_db
+from utils.job_scheduler import Job, JobScheduler
+from utils.message_router import MessageInterest
+from utils.rate_limit import RateLimiter
+
+# Safety limits per moderator: command -> (uses, per seconds), in any sliding window
+RATE_LIMITS = {
+    "tempban": (3, 300),
+    "mute": (5, 300),
+}
+
 class AdvancedModeration(commands.Cog):
     """Advanced moderation features with built-in safety mechanisms"""
     
     def __init__(self, bot):
         self.bot = bot
-        # Rate limiting for safety
-        self.command_cooldowns = defaultdict(list)
+        # Rate limiting for safety, keyed by (user_id, command)
+        self.rate_limiter = RateLimiter()
+        self.commands_used = 0
         # Automod disabled by user request
         self.automod_settings = {
             'invite_links': False,
@@ -26,21 +37,47 @@ class AdvancedModeration(commands.Cog):
         }
         # Logging channel ID
         self.log_channel_id = 1399746928585085068
+        # Tempban unbans, mute expiry and temporary roles survive restarts
+        self.jobs = JobScheduler(get_db(), name="moderation-jobs")
+        self.jobs.register("unban", self._expire_tempban)
+        self.jobs.register("unmute", self._expire_mute)
+        self.jobs.register("remove_role", self._expire_temprole)
+        self._jobs_start_task: Optional[asyncio.Task] = None
         
-    def _check_rate_limit(self, user_id: int, command: str, max_uses: int = 5, window: int = 60) -> bool:
-        """Check if user is rate limited for a command (safety mechanism)"""
-        now = time.time()
-        user_commands = self.command_cooldowns[f"{user_id}_{command}"]
+    async def cog_load(self):
+        await self.jobs.setup()
+        self._jobs_start_task = asyncio.create_task(self._start_jobs())
+        # Only routed while at least one automod feature is switched on
+        self.bot.message_router.register("advanced_moderation", self.handle_message, MessageInterest(
+            dm=False,
+            predicate=lambda info: any(self.automod_settings.values()),
+        ))
         
-        # Remove old entries
-        user_commands[:] = [cmd_time for cmd_time in user_commands if now - cmd_time < window]
+    async def cog_unload(self):
+        self.bot.message_router.unregister("advanced_moderation")
+        if self._jobs_start_task and not self._jobs_start_task.done():
+            self._jobs_start_task.cancel()
+        await self.jobs.close()
         
-        if len(user_commands) >= max_uses:
+    async def _start_jobs(self):
+        # Handlers look guilds and members up in the cache, so wait for it
+        await self.bot.wait_until_ready()
+        self.jobs.start()
+        
+    def _check_rate_limit(self, user_id: int, command: str, max_uses: int = 5, window: int = 60) -> bool:
+        """Check if user is rate limited for a command (safety mechanism)"""
+        if not self.rate_limiter.allow((user_id, command), max_uses, window):
             return False  # Rate limited
         
-        user_commands.append(now)
+        self.commands_used += 1
         return True
 
+    def _rate_limit_message(self, user_id: int, command: str) -> str:
+        max_uses, window = RATE_LIMITS[command]
+        wait = self.rate_limiter.retry_after((user_id, command), max_uses, window)
+        return (f"❌ Rate limit: You can only use {command} {max_uses} times per {window // 60} minutes. "
+                f"Try again in {max(1, round(wait))} seconds.")
+
     async def _log_action(self, guild: discord.Guild, embed: discord.Embed):
         """Log moderation action to designated channel"""
         try:
@@ -103,8 +140,8 @@ class AdvancedModeration(commands.Cog):
     async def tempban(self, ctx, member: discord.Member, duration: int, *, reason: str = "No reason provided"):
         """Temporarily ban a member (max 7 days for safety)"""
         # Safety checks
-        if not self._check_rate_limit(ctx.author.id, "tempban", 3, 300):  # 3 tempbans per 5 minutes
-            await ctx.send("❌ Rate limit: You can only use tempban 3 times per 5 minutes.", ephemeral=True)
+        if not self._check_rate_limit(ctx.author.id, "tempban", *RATE_LIMITS["tempban"]):  # 3 tempbans per 5 minutes
+            await ctx.send(self._rate_limit_message(ctx.author.id, "tempban"), ephemeral=True)
             return
             
         if duration > 10080:  # Max 7 days
@@ -138,7 +175,7 @@ class AdvancedModeration(commands.Cog):
             await member.ban(reason=f"Tempban ({duration}m): {reason}")
             
             # Schedule unban
-            self.bot.loop.create_task(self._schedule_unban(ctx.guild, member, duration * 60))
+            await self.jobs.schedule("unban", ctx.guild.id, member.id, time.time() + duration * 60, reason=reason)
             
             embed = discord.Embed(
                 title="⏰ Temporary Ban Issued",
@@ -171,14 +208,52 @@ class AdvancedModeration(commands.Cog):
         except Exception as e:
             await ctx.send(f"❌ Error occurred: {str(e)}", ephemeral=True)
 
-    async def _schedule_unban(self, guild: discord.Guild, member: discord.Member, delay: int):
-        """Schedule automatic unban"""
-        await asyncio.sleep(delay)
+    async def _expire_tempban(self, job: Job):
+        """Automatic unban when a tempban runs out (API errors are retried by the scheduler)"""
+        guild = self.bot.get_guild(job.guild_id)
+        if guild is None:
+            return  # Bot is no longer in the guild
         try:
-            await guild.unban(member, reason="Temporary ban expired")
-        except:
+            await guild.unban(discord.Object(id=job.user_id), reason="Temporary ban expired")
+        except discord.NotFound:
             pass  # Member may have been manually unbanned
 
+    async def _expire_mute(self, job: Job):
+        """Log the end of a mute; Discord lifts the timeout itself"""
+        guild = self.bot.get_guild(job.guild_id)
+        if guild is None:
+            return
+        member = guild.get_member(job.user_id)
+        if member is not None and member.is_timed_out():
+            return  # Extended by someone since; that timeout ends on its own
+        log_embed = discord.Embed(
+            title="🔊 Mute Expired",
+            description=f"**{member or job.user_id}**'s mute has ended",
+            color=0x2ecc71
+        )
+        log_embed.add_field(name="Target", value=f"{member or 'Unknown'} ({job.user_id})", inline=True)
+        if job.reason:
+            log_embed.add_field(name="Reason", value=job.reason, inline=False)
+        log_embed.timestamp = datetime.now()
+        await self._log_action(guild, log_embed)
+
+    async def _expire_temprole(self, job: Job):
+        """Remove a temporary role once its time is up"""
+        guild = self.bot.get_guild(job.guild_id)
+        if guild is None:
+            return
+        role = guild.get_role(job.ref_id)
+        if role is None:
+            return  # Role was deleted
+        member = guild.get_member(job.user_id)
+        if member is None:
+            try:
+                member = await guild.fetch_member(job.user_id)
+            except discord.NotFound:
+                return  # Member left
+        if role in member.roles:
+            await member.remove_roles(role, reason="Temporary role expired")
+
     @commands.hybrid_command(name="mute")
     @commands.has_permissions(moderate_members=True)
     @app_commands.describe(
@@ -189,8 +264,8 @@ class AdvancedModeration(commands.Cog):
     async def mute(self, ctx, member: discord.Member, duration: int, *, reason: str = "No reason provided"):
         """Mute a member using timeout (max 28 days)"""
         # Safety checks
-        if not self._check_rate_limit(ctx.author.id, "mute", 5, 300):  # 5 mutes per 5 minutes
-            await ctx.send("❌ Rate limit: You can only use mute 5 times per 5 minutes.", ephemeral=True)
+        if not self._check_rate_limit(ctx.author.id, "mute", *RATE_LIMITS["mute"]):  # 5 mutes per 5 minutes
+            await ctx.send(self._rate_limit_message(ctx.author.id, "mute"), ephemeral=True)
             return
             
         if duration > 40320:  # Max 28 days
@@ -204,6 +279,7 @@ class AdvancedModeration(commands.Cog):
         try:
             until = datetime.now() + timedelta(minutes=duration)
             await member.timeout(until, reason=reason)
+            await self.jobs.schedule("unmute", ctx.guild.id, member.id, until.timestamp(), reason=reason)
             
             embed = discord.Embed(
                 title="🔇 Member Muted",
@@ -243,6 +319,7 @@ class AdvancedModeration(commands.Cog):
         """Remove timeout from a member"""
         try:
             await member.timeout(None, reason=f"Unmuted by {ctx.author}")
+            await self.jobs.cancel("unmute", ctx.guild.id, member.id)
             
             embed = discord.Embed(
                 title="🔊 Member Unmuted",
@@ -270,6 +347,63 @@ class AdvancedModeration(commands.Cog):
         except Exception as e:
             await ctx.send(f"❌ Error occurred: {str(e)}", ephemeral=True)
 
+    @commands.hybrid_command(name="temprole")
+    @commands.has_permissions(manage_roles=True)
+    @app_commands.describe(
+        member="Member to give the role to",
+        role="Role to give temporarily",
+        duration="Duration in minutes (max 43200 = 30 days)",
+        reason="Reason for the role"
+    )
+    async def temprole(self, ctx, member: discord.Member, role: discord.Role, duration: int, *, reason: str = "No reason provided"):
+        """Give a member a role that is removed automatically (max 30 days)"""
+        if duration <= 0 or duration > 43200:  # Max 30 days
+            await ctx.send("❌ Duration must be between 1 and 43200 minutes (30 days)", ephemeral=True)
+            return
+            
+        if role >= ctx.author.top_role and ctx.author != ctx.guild.owner:
+            await ctx.send("❌ You cannot give a role equal to or higher than your top role", ephemeral=True)
+            return
+            
+        if role.managed or role >= ctx.guild.me.top_role:
+            await ctx.send("❌ I can't manage that role", ephemeral=True)
+            return
+
+        try:
+            await member.add_roles(role, reason=f"Temprole ({duration}m) by {ctx.author}: {reason}")
+            remove_at = time.time() + duration * 60
+            await self.jobs.schedule("remove_role", ctx.guild.id, member.id, remove_at, ref_id=role.id, reason=reason)
+            
+            embed = discord.Embed(
+                title="⏳ Temporary Role Given",
+                description=f"**{member}** has been given {role.mention}",
+                color=0x3498db
+            )
+            embed.add_field(name="Duration", value=f"{duration} minutes", inline=True)
+            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+            embed.add_field(name="Reason", value=reason, inline=False)
+            embed.add_field(name="Removed At", value=f"<t:{int(remove_at)}:F>", inline=False)
+            
+            await ctx.send(embed=embed)
+            
+            # Log to designated channel
+            log_embed = discord.Embed(
+                title="⏳ Temporary Role Given",
+                description=f"**{member}** was given {role.name}",
+                color=0x3498db
+            )
+            log_embed.add_field(name="Moderator", value=f"{ctx.author} ({ctx.author.id})", inline=True)
+            log_embed.add_field(name="Target", value=f"{member} ({member.id})", inline=True)
+            log_embed.add_field(name="Duration", value=f"{duration} minutes", inline=True)
+            log_embed.add_field(name="Reason", value=reason, inline=False)
+            log_embed.timestamp = datetime.now()
+            await self._log_action(ctx.guild, log_embed)
+            
+        except discord.Forbidden:
+            await ctx.send("❌ I don't have permission to give this role", ephemeral=True)
+        except Exception as e:
+            await ctx.send(f"❌ Error occurred: {str(e)}", ephemeral=True)
+
     # Note: slowmode command removed - it's already implemented in modcog.py
 
     @commands.hybrid_command(name="advmodstats")
@@ -286,20 +420,28 @@ class AdvancedModeration(commands.Cog):
             embed.description = f"Statistics for {moderator.mention}"
             # Add rate limit info for transparency
             commands_used = {}
-            for key, times in self.command_cooldowns.items():
-                if key.startswith(str(moderator.id)):
-                    command = key.split('_', 1)[1]
-                    commands_used[command] = len([t for t in times if time.time() - t < 3600])  # Last hour
+            for command, (max_uses, window) in RATE_LIMITS.items():
+                used = self.rate_limiter.used((moderator.id, command), max_uses, window)
+                if used:
+                    commands_used[command] = f"{used}/{max_uses} (per {window // 60} min)"
             
             if commands_used:
-                stats = "\n".join([f"**{cmd}**: {count} (last hour)" for cmd, count in commands_used.items()])
+                stats = "\n".join([f"**{cmd}**: {usage}" for cmd, usage in commands_used.items()])
                 embed.add_field(name="Recent Command Usage", value=stats, inline=False)
             else:
-                embed.add_field(name="Recent Activity", value="No commands used in the last hour", inline=False)
+                embed.add_field(name="Recent Activity", value="No rate-limited commands used recently", inline=False)
         else:
             embed.description = "Server moderation overview"
-            total_commands = sum(len(times) for times in self.command_cooldowns.values())
-            embed.add_field(name="Total Commands Used", value=str(total_commands), inline=True)
+            embed.add_field(name="Total Commands Used", value=str(self.commands_used), inline=True)
+            
+            # Pending timed actions in this server
+            scheduled = self.jobs.pending(guild_id=ctx.guild.id)
+            if scheduled:
+                counts = {}
+                for job in scheduled:
+                    counts[job.kind] = counts.get(job.kind, 0) + 1
+                embed.add_field(name="Scheduled Actions",
+                                value=", ".join(f"{kind}: {count}" for kind, count in counts.items()), inline=True)
             
             # Automod status
             enabled_features = [f for f, enabled in self.automod_settings.items() if enabled]
@@ -307,8 +449,7 @@ class AdvancedModeration(commands.Cog):
         
         await ctx.send(embed=embed)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
+    async def handle_message(self, message):
         """Advanced automod message scanning - DISABLED BY USER REQUEST"""
         # All automod features disabled per user request
         pass
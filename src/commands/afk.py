@@ -6,12 +6,51 @@ Allows users to set AFK status with custom reasons and auto-responds to mentions
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiosqlite
 import asyncio
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional, Dict
+from typing import Optional, Dict, Set
 from pathlib import Path
 
+from utils.db_pool import get_database
+from utils.message_router import MessageInterest
+from utils.notice_coalescer import NoticeCoalescer
+
+# Mention counts are kept in memory and written in one batch this often (seconds)
+MENTION_FLUSH_INTERVAL = 10.0
+
+# How long "User is AFK" and "Welcome Back" notices stay up after the latest
+# update; repeats in the same channel within that time edit the same message
+AFK_NOTICE_LIFETIME = 15
+WELCOME_BACK_LIFETIME = 10
+# Updates to a notice already showing are sent at most this often (seconds)
+AFK_NOTICE_EDIT_DELAY = 5.0
+
+
+@dataclass(slots=True)
+class AFKRecord:
+    """One AFK user as cached in memory; set_time is epoch seconds"""
+    guild_id: int
+    reason: str
+    set_time: int
+    mention_count: int = 0
+
+
+def parse_set_time(value) -> int:
+    """afk_users.set_time as epoch seconds (older rows hold ISO strings)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        dt = datetime.fromisoformat(str(value))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp())
+    except ValueError:
+        return int(time.time())
+
 
 class AFKSystem(commands.Cog):
     """AFK System for automatic away message responses"""
@@ -19,116 +58,151 @@ class AFKSystem(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.database_path = Path("data/afk.db")
-        self.afk_cache: Dict[int, Dict] = {}  # Cache for quick lookups
+        self.db = get_database(self.database_path)
+        self.afk_cache: Dict[int, AFKRecord] = {}  # Cache for quick lookups
+        # guild_id -> AFK user IDs, so per-server listings skip other guilds
+        self.guild_afk: Dict[int, Set[int]] = {}
+        # Users whose cached mention_count is ahead of the database
+        self.dirty_mentions: Set[int] = set()
+        self.flush_task: Optional[asyncio.Task] = None
+        # One live AFK / welcome-back notice per (channel, kind, user)
+        self.notices = NoticeCoalescer(AFK_NOTICE_EDIT_DELAY, name="afk-notices")
         self.ready = asyncio.Event()
         
     async def cog_load(self):
         """Initialize the AFK system when the cog loads"""
         await self.init_database()
         await self.load_afk_cache()
+        self.flush_task = asyncio.create_task(self.mention_flush_loop())
         self.ready.set()
+        # Only messages from AFK users or mentioning someone can matter here
+        self.bot.message_router.register("afk", self.handle_message, MessageInterest(
+            dm=False,
+            predicate=lambda info: info.author_id in self.afk_cache or not self.afk_cache.keys().isdisjoint(info.mention_ids),
+        ))
+    
+    async def cog_unload(self):
+        self.bot.message_router.unregister("afk")
+        if self.flush_task:
+            self.flush_task.cancel()
+        await self.flush_mention_counts()
+        await self.notices.close()
+    
+    async def mention_flush_loop(self):
+        """Write accumulated mention counts every MENTION_FLUSH_INTERVAL seconds"""
+        while True:
+            await asyncio.sleep(MENTION_FLUSH_INTERVAL)
+            try:
+                await self.flush_mention_counts()
+            except Exception as e:
+                print(f"[AFK] Error flushing mention counts: {e}")
+    
+    async def flush_mention_counts(self):
+        """Write the cached mention counts of every dirty AFK user in one transaction"""
+        if not self.dirty_mentions:
+            return
+        dirty, self.dirty_mentions = self.dirty_mentions, set()
+        # Absolute values, so a retried batch cannot double count
+        rows = [(self.afk_cache[user_id].mention_count, user_id) for user_id in dirty if user_id in self.afk_cache]
+        try:
+            await self.db.executemany("UPDATE afk_users SET mention_count = ? WHERE user_id = ?", rows)
+        except Exception:
+            self.dirty_mentions |= dirty
+            raise
         
     async def init_database(self):
         """Initialize the AFK database"""
         # Ensure data directory exists
         self.database_path.parent.mkdir(exist_ok=True)
         
-        async with aiosqlite.connect(self.database_path) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS afk_users (
-                    user_id INTEGER PRIMARY KEY,
-                    guild_id INTEGER NOT NULL,
-                    reason TEXT,
-                    set_time TEXT NOT NULL,
-                    mention_count INTEGER DEFAULT 0
-                )
-            """)
-            await db.commit()
+        await self.db.execute("""
+            CREATE TABLE IF NOT EXISTS afk_users (
+                user_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                reason TEXT,
+                set_time TEXT NOT NULL,
+                mention_count INTEGER DEFAULT 0
+            )
+        """)
             
     async def load_afk_cache(self):
         """Load all AFK users into cache for quick access"""
-        async with aiosqlite.connect(self.database_path) as db:
-            cursor = await db.execute("SELECT user_id, guild_id, reason, set_time, mention_count FROM afk_users")
-            rows = await cursor.fetchall()
-            
-            for row in rows:
-                user_id, guild_id, reason, set_time, mention_count = row
-                self.afk_cache[user_id] = {
-                    'guild_id': guild_id,
-                    'reason': reason,
-                    'set_time': set_time,
-                    'mention_count': mention_count
-                }
+        rows = await self.db.fetchall("SELECT user_id, guild_id, reason, set_time, mention_count FROM afk_users")
+        
+        self.afk_cache.clear()
+        self.guild_afk.clear()
+        for row in rows:
+            user_id, guild_id, reason, set_time, mention_count = row
+            self._cache_record(user_id, AFKRecord(guild_id, reason, parse_set_time(set_time), mention_count or 0))
+    
+    def _cache_record(self, user_id: int, record: AFKRecord):
+        old = self.afk_cache.get(user_id)
+        if old is not None and old.guild_id != record.guild_id:
+            self._drop_from_guild(user_id, old.guild_id)
+        self.afk_cache[user_id] = record
+        self.guild_afk.setdefault(record.guild_id, set()).add(user_id)
+    
+    def _drop_from_guild(self, user_id: int, guild_id: int):
+        members = self.guild_afk.get(guild_id)
+        if members is not None:
+            members.discard(user_id)
+            if not members:
+                del self.guild_afk[guild_id]
                 
     async def set_afk(self, user_id: int, guild_id: int, reason: Optional[str] = None):
         """Set a user as AFK"""
-        current_time = datetime.now(timezone.utc).isoformat()
+        current_time = int(time.time())
         afk_reason = reason or "No reason provided"
         
-        async with aiosqlite.connect(self.database_path) as db:
-            await db.execute("""
-                INSERT OR REPLACE INTO afk_users (user_id, guild_id, reason, set_time, mention_count)
-                VALUES (?, ?, ?, ?, 0)
-            """, (user_id, guild_id, afk_reason, current_time))
-            await db.commit()
+        await self.db.execute("""
+            INSERT OR REPLACE INTO afk_users (user_id, guild_id, reason, set_time, mention_count)
+            VALUES (?, ?, ?, ?, 0)
+        """, (user_id, guild_id, afk_reason, current_time))
             
         # Update cache
-        self.afk_cache[user_id] = {
-            'guild_id': guild_id,
-            'reason': afk_reason,
-            'set_time': current_time,
-            'mention_count': 0
-        }
+        self._cache_record(user_id, AFKRecord(guild_id, afk_reason, current_time))
+        self.dirty_mentions.discard(user_id)
         
     async def remove_afk(self, user_id: int):
         """Remove a user from AFK status"""
-        async with aiosqlite.connect(self.database_path) as db:
-            await db.execute("DELETE FROM afk_users WHERE user_id = ?", (user_id,))
-            await db.commit()
+        await self.db.execute("DELETE FROM afk_users WHERE user_id = ?", (user_id,))
             
         # Remove from cache
-        if user_id in self.afk_cache:
-            del self.afk_cache[user_id]
+        record = self.afk_cache.pop(user_id, None)
+        if record is not None:
+            self._drop_from_guild(user_id, record.guild_id)
+        self.dirty_mentions.discard(user_id)
             
-    async def increment_mention_count(self, user_id: int):
-        """Increment the mention count for an AFK user"""
-        if user_id in self.afk_cache:
-            self.afk_cache[user_id]['mention_count'] += 1
-            
-            async with aiosqlite.connect(self.database_path) as db:
-                await db.execute("""
-                    UPDATE afk_users SET mention_count = mention_count + 1 
-                    WHERE user_id = ?
-                """, (user_id,))
-                await db.commit()
+    def increment_mention_count(self, user_id: int) -> int:
+        """Count a mention of an AFK user (written with the next batch); returns the new count"""
+        record = self.afk_cache.get(user_id)
+        if record is None:
+            return 0
+        record.mention_count += 1
+        self.dirty_mentions.add(user_id)
+        return record.mention_count
                 
     def is_afk(self, user_id: int) -> bool:
         """Check if a user is currently AFK"""
         return user_id in self.afk_cache
         
-    def get_afk_info(self, user_id: int) -> Optional[Dict]:
+    def get_afk_info(self, user_id: int) -> Optional[AFKRecord]:
         """Get AFK information for a user"""
         return self.afk_cache.get(user_id)
         
-    def format_afk_duration(self, set_time_str: str) -> str:
-        """Format the AFK duration into a human-readable string"""
-        try:
-            set_time = datetime.fromisoformat(set_time_str)
-            current_time = datetime.now(timezone.utc)
-            duration = current_time - set_time
-            
-            days = duration.days
-            hours, remainder = divmod(duration.seconds, 3600)
-            minutes, _ = divmod(remainder, 60)
-            
-            if days > 0:
-                return f"{days}d {hours}h {minutes}m"
-            elif hours > 0:
-                return f"{hours}h {minutes}m"
-            else:
-                return f"{minutes}m"
-        except:
-            return "unknown time"
+    def format_afk_duration(self, set_time: int) -> str:
+        """Format the AFK duration (since epoch second ``set_time``) into a human-readable string"""
+        elapsed = max(0, int(time.time()) - set_time)
+        days, remainder = divmod(elapsed, 86400)
+        hours, remainder = divmod(remainder, 3600)
+        minutes = remainder // 60
+        
+        if days > 0:
+            return f"{days}d {hours}h {minutes}m"
+        elif hours > 0:
+            return f"{hours}h {minutes}m"
+        else:
+            return f"{minutes}m"
 
     @commands.hybrid_command(
         name="afk",
@@ -186,7 +260,7 @@ class AFKSystem(commands.Cog):
         )
         
         if was_afk and old_info:
-            old_reason = old_info['reason']
+            old_reason = old_info.reason
             if old_reason != reason:
                 embed.add_field(
                     name=" Previous Reason",
@@ -236,9 +310,9 @@ class AFKSystem(commands.Cog):
         )
         
         if afk_info:
-            duration = self.format_afk_duration(afk_info['set_time'])
-            mention_count = afk_info['mention_count']
-            reason = afk_info['reason']
+            duration = self.format_afk_duration(afk_info.set_time)
+            mention_count = afk_info.mention_count
+            reason = afk_info.reason
             
             embed.add_field(
                 name=" AFK Duration",
@@ -282,19 +356,19 @@ class AFKSystem(commands.Cog):
             await ctx.send(embed=embed, ephemeral=True)
             return
             
-        # Get AFK users in this guild
+        # Get AFK users in this guild (per-guild index, no scan of other servers)
         guild_afk_users = []
-        for user_id, afk_data in self.afk_cache.items():
-            if afk_data['guild_id'] == ctx.guild.id:
-                member = ctx.guild.get_member(user_id)
-                if member:  # Only include users still in the server
-                    duration = self.format_afk_duration(afk_data['set_time'])
-                    guild_afk_users.append({
-                        'member': member,
-                        'reason': afk_data['reason'],
-                        'duration': duration,
-                        'mentions': afk_data['mention_count']
-                    })
+        for user_id in self.guild_afk.get(ctx.guild.id, ()):
+            afk_data = self.afk_cache[user_id]
+            member = ctx.guild.get_member(user_id)
+            if member:  # Only include users still in the server
+                guild_afk_users.append({
+                    'member': member,
+                    'reason': afk_data.reason,
+                    'set_time': afk_data.set_time,
+                    'duration': self.format_afk_duration(afk_data.set_time),
+                    'mentions': afk_data.mention_count
+                })
                     
         if not guild_afk_users:
             embed = discord.Embed(
@@ -311,7 +385,7 @@ class AFKSystem(commands.Cog):
             return
             
         # Sort by AFK duration (longest first)
-        guild_afk_users.sort(key=lambda x: x['duration'], reverse=True)
+        guild_afk_users.sort(key=lambda x: x['set_time'])
         
         # Create embed with AFK users
         embed = discord.Embed(
@@ -352,25 +426,16 @@ class AFKSystem(commands.Cog):
         embed.timestamp = datetime.now(timezone.utc)
         await ctx.send(embed=embed)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """Handle messages to check for AFK users and auto-return"""
-        # Ignore bot messages
-        if message.author.bot:
-            return
-            
-        # Ignore DMs
-        if not message.guild:
-            return
-            
+    async def handle_message(self, message: discord.Message):
+        """Handle messages to check for AFK users and auto-return (routed for guild messages from humans)"""
         await self.ready.wait()
         
         # Check if the message author is AFK and should be returned
         if self.is_afk(message.author.id):
             afk_info = self.get_afk_info(message.author.id)
             if afk_info:
-                duration = self.format_afk_duration(afk_info['set_time'])
-                mention_count = afk_info['mention_count']
+                duration = self.format_afk_duration(afk_info.set_time)
+                mention_count = afk_info.mention_count
                 
                 # Remove from AFK
                 await self.remove_afk(message.author.id)
@@ -385,10 +450,8 @@ class AFKSystem(commands.Cog):
                 if mention_count > 0:
                     embed.add_field(name="Mentions received", value=str(mention_count), inline=True)
                 
-                try:
-                    await message.channel.send(embed=embed, delete_after=10)
-                except:
-                    pass  # Ignore if we can't send messages
+                self.notices.post(message.channel, (message.channel.id, "back", message.author.id),
+                                  embed, WELCOME_BACK_LIFETIME)
                     
         # Check for mentions of AFK users
         if message.mentions:
@@ -399,13 +462,13 @@ class AFKSystem(commands.Cog):
                     
                 if self.is_afk(mentioned_user.id):
                     afk_info = self.get_afk_info(mentioned_user.id)
-                    if afk_info and afk_info['guild_id'] == message.guild.id:
+                    if afk_info and afk_info.guild_id == message.guild.id:
                         # Increment mention count
-                        await self.increment_mention_count(mentioned_user.id)
+                        mention_count = self.increment_mention_count(mentioned_user.id)
                         
                         # Create AFK response
-                        duration = self.format_afk_duration(afk_info['set_time'])
-                        reason = afk_info['reason']
+                        duration = self.format_afk_duration(afk_info.set_time)
+                        reason = afk_info.reason
                         
                         embed = discord.Embed(
                             title="User is AFK",
@@ -424,15 +487,14 @@ class AFKSystem(commands.Cog):
                         )
                         embed.add_field(
                             name="Mentions",
-                            value=str(afk_info['mention_count'] + 1),  # +1 for current mention
+                            value=str(mention_count),
                             inline=True
                         )
                         embed.set_footer(text="They'll see your message when they return!")
                         
-                        try:
-                            await message.channel.send(embed=embed, delete_after=15)
-                        except:
-                            pass  # Ignore if we can't send messages
+                        # Repeat pings in this channel update the notice already showing
+                        self.notices.post(message.channel, (message.channel.id, "afk", mentioned_user.id),
+                                          embed, AFK_NOTICE_LIFETIME)
                         
                         # Only respond once per message, even if multiple AFK users are mentioned
                         break
@@ -1,8 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import sqlite3
 import sys
+import time
 import asyncio
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -11,19 +11,39 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from config import MODERATION_ROLE_ID
 
-from utils.database import DATABASE_NAME, init_db
+from utils.database import get_db, init_db
+from utils.appeal_store import AppealStore
+from utils.audit_index import find_audit_entry, is_timeout_entry
+from utils.message_router import MessageInterest
+from utils.paginator import KeysetPaginator
+from utils.scheduler import DeadlineScheduler
 from utils.embeds import create_error_embed, create_success_embed, create_info_embed
 
+# Appeals per page of the ?appeals listing
+APPEALS_PAGE_SIZE = 10
+
+# Seconds between full sweeps for appeals whose punishment has ended
+APPEAL_SWEEP_INTERVAL = 600
+
 class Appeals(commands.Cog):
     """Unban appeal system with auto-DM for moderation actions"""
 
     def __init__(self, bot):
         self.bot = bot
         init_db()
+        self.db = get_db()
+        self.store = AppealStore(self.db)
         self._timeout_dedupe_cache = {}  # {(user_id, guild_id, action): timestamp} - prevents double DM
         self._appeal_cleanup_task = None
         self._setup_appeal_cleanup_task()
         self._ban_event_handled = set()  # Track recently handled ban events to prevent duplicates
+        # guild_id -> banned user IDs, read at most once per sweep interval and kept
+        # current by ban/unban events in between
+        self._banned: dict[int, set[int]] = {}
+        self._banned_at: dict[int, float] = {}  # guild_id -> monotonic time of the last read
+        self._ban_locks: dict[int, asyncio.Lock] = {}
+        # Discord sends no event when a timeout runs out, so recheck appellants when theirs does
+        self.timeout_checks = DeadlineScheduler(self._recheck_user, name="appeal-timeout-checks")
         
     def _setup_appeal_cleanup_task(self):
         """Start background task to clean up expired appeals"""
@@ -31,72 +51,127 @@ class Appeals(commands.Cog):
             self._appeal_cleanup_task = asyncio.create_task(self._cleanup_expired_appeals())
             
     async def _cleanup_expired_appeals(self):
-        """Background task that checks for appeals where punishment is expired"""
+        """Background task that approves appeals whose punishment has ended"""
         try:
             while not self.bot.is_closed():
                 # Run every 10 minutes
-                await asyncio.sleep(600)
-                
-                # Get all pending appeals
-                conn = sqlite3.connect(DATABASE_NAME)
-                cursor = conn.cursor()
-                cursor.execute('SELECT id, user_id FROM unban_requests WHERE status = "pending"')
-                pending_appeals = cursor.fetchall()
-                conn.close()
-                
-                for appeal_id, user_id in pending_appeals:
-                    # Check if user is still punished in any guild
-                    is_punished = False
-                    for guild in self.bot.guilds:
-                        # Check if banned
-                        try:
-                            await guild.fetch_ban(discord.Object(id=user_id))
-                            is_punished = True
-                            break
-                        except discord.NotFound:
-                            pass
-                        except Exception:
-                            pass
-                        
-                        # Check if timed out
-                        member = guild.get_member(user_id)
-                        if member and getattr(member, 'timed_out_until', None):
-                            timeout_until = member.timed_out_until
-                            # If timeout is in the future, user is still punished
-                            if timeout_until and timeout_until > datetime.now(timezone.utc):
-                                is_punished = True
-                                break
-                    
-                    # Auto-approve appeal if punishment expired
-                    if not is_punished:
-                        print(f"[Appeals] Auto-approving appeal #{appeal_id} for {user_id} - punishment expired")
-                        conn = sqlite3.connect(DATABASE_NAME)
-                        cursor = conn.cursor()
-                        cursor.execute('UPDATE unban_requests SET status = "approved" WHERE id = ?', (appeal_id,))
-                        conn.commit()
-                        conn.close()
-                        
-                        # Try to DM the user
-                        try:
-                            user = await self.bot.fetch_user(user_id)
-                            if user:
-                                dm = discord.Embed(
-                                    title=" Appeal Automatically Approved",
-                                    description="## Your appeal has been automatically approved\n\nYour punishment has expired or been removed.",
-                                    color=0x2ecc71
-                                )
-                                dm.add_field(name=" Appeal ID", value=f"`#{appeal_id}`", inline=True)
-                                dm.add_field(name=" Result", value=f"**Auto-approved**", inline=True)
-                                dm.set_footer(text="CodeVerse Moderation System")
-                                await user.send(embed=dm)
-                        except Exception:
-                            pass
+                await asyncio.sleep(APPEAL_SWEEP_INTERVAL)
+                try:
+                    await self._sweep_expired_appeals()
+                except Exception as e:
+                    print(f"[Appeals] Error in cleanup task: {e}")
         except asyncio.CancelledError:
             pass
-        except Exception as e:
-            print(f"[Appeals] Error in cleanup task: {e}")
+
+    async def _load_bans(self, guild: discord.Guild) -> set[int] | None:
+        """Every banned user ID in a guild (None if the ban list can't be read)"""
+        try:
+            return {entry.user.id async for entry in guild.bans(limit=None)}
+        except discord.HTTPException as e:
+            print(f"[Appeals] Could not read bans in {guild.name}: {e}")
+            return None
+
+    async def _ban_snapshot(self, guild: discord.Guild, max_age: float = APPEAL_SWEEP_INTERVAL) -> set[int] | None:
+        """The guild's banned user IDs, re-read if older than max_age (None if it can't be read)"""
+        async with self._ban_locks.setdefault(guild.id, asyncio.Lock()):
+            loaded = self._banned_at.get(guild.id)
+            if loaded is None or time.monotonic() - loaded >= max_age:
+                banned = await self._load_bans(guild)
+                if banned is not None:
+                    self._banned[guild.id] = banned
+                # An unreadable ban list keeps the last snapshot and isn't retried on every event
+                self._banned_at[guild.id] = time.monotonic()
+            return self._banned.get(guild.id)
+
+    def _timeout_end(self, user_id: int) -> datetime | None:
+        """Latest active timeout for a user across guilds, from the member cache"""
+        latest = None
+        for guild in self.bot.guilds:
+            member = guild.get_member(user_id)
+            if member is not None and member.is_timed_out():
+                if latest is None or member.timed_out_until > latest:
+                    latest = member.timed_out_until
+        return latest
+
+    async def _sweep_expired_appeals(self) -> list[int]:
+        """Approve every pending appeal whose user is no longer banned or timed out anywhere"""
+        pending_users = self.store.pending_users()
+        if not pending_users:
+            return []
+
+        # One ban list per guild per sweep, rather than a fetch_ban per appeal and guild.
+        # With nothing pending the lists are left to be read on first use by the event path
+        snapshots = []
+        for guild in self.bot.guilds:
+            banned = await self._ban_snapshot(guild, max_age=0)
+            if banned is not None:
+                snapshots.append(banned)
+
+        expired = set()
+        for user_id in pending_users:
+            if any(user_id in banned for banned in snapshots):
+                continue
+            timeout_end = self._timeout_end(user_id)
+            if timeout_end is not None:
+                self.timeout_checks.schedule(user_id, timeout_end.timestamp() + 1)
+                continue
+            expired.add(user_id)
+
+        approved = await self.store.approve_users(expired)
+        for appeal_id, user_id in approved:
+            print(f"[Appeals] Auto-approving appeal #{appeal_id} for {user_id} - punishment expired")
+            await self._notify_auto_approved(user_id, appeal_id)
+        return [appeal_id for appeal_id, _ in approved]
+
+    async def _recheck_user(self, user_id: int):
+        """Approve a user's pending appeals if their punishment has ended (between sweeps)"""
+        if not self.store.has_pending(user_id):
+            return
+        timeout_end = self._timeout_end(user_id)
+        if timeout_end is not None:
+            self.timeout_checks.schedule(user_id, timeout_end.timestamp() + 1)
+            return
+        for guild in self.bot.guilds:
+            banned = await self._ban_snapshot(guild)
+            if banned is not None:
+                if user_id in banned:
+                    return
+                continue
+            # Ban list unreadable: ask about this one user
+            try:
+                await guild.fetch_ban(discord.Object(id=user_id))
+                return
+            except discord.NotFound:
+                pass
+            except discord.HTTPException:
+                pass
+
+        for appeal_id, _ in await self.store.approve_users({user_id}):
+            print(f"[Appeals] ✅ Auto-approved appeal #{appeal_id} - punishment ended for {user_id}")
+            await self._notify_auto_approved(user_id, appeal_id)
+
+    async def _notify_auto_approved(self, user_id: int, appeal_id: int):
+        """DM a user that their appeal was approved because the punishment ended"""
+        try:
+            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            if user:
+                dm = discord.Embed(
+                    title=" Appeal Automatically Approved",
+                    description="## Your appeal has been automatically approved\n\nYour punishment has expired or been removed.",
+                    color=0x2ecc71
+                )
+                dm.add_field(name=" Appeal ID", value=f"`#{appeal_id}`", inline=True)
+                dm.add_field(name=" Result", value=f"**Auto-approved**", inline=True)
+                dm.set_footer(text="CodeVerse Moderation System")
+                await user.send(embed=dm)
+        except Exception:
+            pass
 
     # ---------------- Internal Helper ----------------
+    async def _approve_pending_for_user(self, user_id: int) -> list[int]:
+        """Approve every pending appeal for a user in one transaction, returning their IDs"""
+        return [appeal_id for appeal_id, _ in await self.store.approve_users({user_id})]
+
     async def _send_appeal_form(self, user: discord.User | discord.Member, guild: discord.Guild, action_type: str, reason: str | None = None):
         """Send appeal form to user with improved deduplication"""
         try:
@@ -176,6 +251,8 @@ class Appeals(commands.Cog):
     @commands.Cog.listener()
     async def on_member_ban(self, guild: discord.Guild, user: discord.User):
         """Handle ban events and send appeals - PRIMARY ban handler"""
+        if guild.id in self._banned:
+            self._banned[guild.id].add(user.id)
         if user.bot or (self.bot.user and user.id == self.bot.user.id):
             return
         
@@ -194,24 +271,13 @@ class Appeals(commands.Cog):
             # Remove all entries, will be recreated as needed
             self._ban_event_handled.clear()
         
-        # Get reason from audit logs with retry
+        # Get reason from the audit log (recent entries only)
         reason = "No reason provided"
-        try:
-            await asyncio.sleep(1.5)  # Longer wait for audit log to be created
-            
-            # Check multiple entries to find the right one
-            async for entry in guild.audit_logs(action=discord.AuditLogAction.ban, limit=10):
-                if entry.target and entry.target.id == user.id:
-                    # Check if this is recent (within last 10 seconds)
-                    if entry.created_at:
-                        time_diff = (datetime.now(timezone.utc) - entry.created_at).total_seconds()
-                        if time_diff < 10:
-                            if entry.reason:
-                                reason = entry.reason
-                            print(f"[Appeals] Found ban audit log for {user}: {reason}")
-                            break
-        except Exception as e:
-            print(f"[Appeals] Error fetching ban audit logs: {e}")
+        entry = await find_audit_entry(self.bot, guild, discord.AuditLogAction.ban, user.id, limit=10)
+        if entry:
+            if entry.reason:
+                reason = entry.reason
+            print(f"[Appeals] Found ban audit log for {user}: {reason}")
         
         print(f"[Appeals] 🚫 Ban detected for {user} ({user.id}) in {guild.name}: {reason}")
         
@@ -237,6 +303,13 @@ class Appeals(commands.Cog):
                     print(f"[Appeals] Failed to send log to channel {cid}: {e}")
                 break
 
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        """Resolve pending appeals as soon as the last ban is lifted"""
+        if guild.id in self._banned:
+            self._banned[guild.id].discard(user.id)
+        await self._recheck_user(user.id)
+
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
         """Handle timeout changes - improved to prevent double DMs"""
@@ -249,22 +322,13 @@ class Appeals(commands.Cog):
         # Only send appeal form when timeout is APPLIED (not removed)
         if before_timeout is None and after_timeout is not None:
             reason = "Timeout applied"
-            try:
-                # Wait for audit log
-                await asyncio.sleep(1.5)
-                async for entry in after.guild.audit_logs(action=discord.AuditLogAction.member_update, limit=10):
-                    if entry.target and entry.target.id == after.id:
-                        # Check if this is recent
-                        if entry.created_at:
-                            time_diff = (datetime.now(timezone.utc) - entry.created_at).total_seconds()
-                            if time_diff < 10:
-                                audit_reason = entry.reason or reason
-                                # Skip if audit reason contains appeal-related keywords
-                                if audit_reason and not any(keyword in audit_reason.lower() for keyword in ['appeal', 'approved', 'unbanned', 'untimeout']):
-                                    reason = audit_reason
-                                break
-            except Exception as e:
-                print(f"[Appeals] Error fetching timeout audit logs: {e}")
+            entry = await find_audit_entry(self.bot, after.guild, discord.AuditLogAction.member_update, after.id,
+                                           limit=10, predicate=is_timeout_entry)
+            if entry:
+                audit_reason = entry.reason or reason
+                # Skip if audit reason contains appeal-related keywords
+                if audit_reason and not any(keyword in audit_reason.lower() for keyword in ['appeal', 'approved', 'unbanned', 'untimeout']):
+                    reason = audit_reason
             
             print(f"[Appeals] ⏱️ Timeout APPLIED to {after} ({after.id}): before={before_timeout}, after={after_timeout}, reason={reason}")
             await self._send_appeal_form(after, after.guild, "timed out", reason)
@@ -292,18 +356,12 @@ class Appeals(commands.Cog):
         # Check if timeout was REMOVED before expiry (manual untimeout/appeal approved)
         elif before_timeout is not None and after_timeout is None:
             # Auto-approve any pending appeals for this user in this guild
-            conn = sqlite3.connect(DATABASE_NAME)
-            cursor = conn.cursor()
-            cursor.execute('SELECT id FROM unban_requests WHERE user_id = ? AND status = "pending"', (after.id,))
-            appeals = cursor.fetchall()
+            appeals = await self._approve_pending_for_user(after.id)
             
             if appeals:
-                for (appeal_id,) in appeals:
-                    cursor.execute('UPDATE unban_requests SET status = "approved" WHERE id = ?', (appeal_id,))
+                for appeal_id in appeals:
                     print(f"[Appeals] ✅ Auto-approved appeal #{appeal_id} - timeout removed for {after} ({after.id})")
                 
-                conn.commit()
-                
                 # Try to DM the user about approval
                 try:
                     dm = discord.Embed(
@@ -316,12 +374,10 @@ class Appeals(commands.Cog):
                     await after.send(embed=dm)
                 except Exception:
                     pass
-            conn.close()
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
+    async def handle_message(self, message: discord.Message):
         """Accept DMs as appeals - improved to allow new appeals after punishment re-applied"""
-        if not isinstance(message.channel, discord.DMChannel) or message.author.bot:
+        if not isinstance(message.channel, discord.DMChannel):
             return
         content = message.content.strip()
         if not content:
@@ -335,18 +391,27 @@ class Appeals(commands.Cog):
         punishment_guild = None
         
         for guild in self.bot.guilds:
-            # Check if banned
-            try:
-                await guild.fetch_ban(discord.Object(id=message.author.id))
-                is_punished = True
-                punishment_type = "banned"
-                guild_name = guild.name
-                punishment_guild = guild
-                break
-            except discord.NotFound:
-                pass
-            except Exception:
-                pass
+            # Check if banned, from the guild's ban snapshot when it can be read
+            banned = await self._ban_snapshot(guild)
+            if banned is not None:
+                if message.author.id in banned:
+                    is_punished = True
+                    punishment_type = "banned"
+                    guild_name = guild.name
+                    punishment_guild = guild
+                    break
+            else:
+                try:
+                    await guild.fetch_ban(discord.Object(id=message.author.id))
+                    is_punished = True
+                    punishment_type = "banned"
+                    guild_name = guild.name
+                    punishment_guild = guild
+                    break
+                except discord.NotFound:
+                    pass
+                except Exception:
+                    pass
             
             # Check if timed out (must be a member)
             member = guild.get_member(message.author.id)
@@ -362,18 +427,12 @@ class Appeals(commands.Cog):
         
         # If not punished, auto-approve pending appeals and reject new appeal
         if not is_punished:
-            conn = sqlite3.connect(DATABASE_NAME)
-            cursor = conn.cursor()
-            cursor.execute('SELECT id FROM unban_requests WHERE user_id = ? AND status = "pending"', (message.author.id,))
-            appeals = cursor.fetchall()
+            appeals = await self._approve_pending_for_user(message.author.id)
             
             if appeals:
-                for (appeal_id,) in appeals:
-                    cursor.execute('UPDATE unban_requests SET status = "approved" WHERE id = ?', (appeal_id,))
+                for appeal_id in appeals:
                     print(f"[Appeals] ✅ Auto-approved appeal #{appeal_id} - punishment expired for {message.author.id}")
                 
-                conn.commit()
-                
                 try:
                     embed = discord.Embed(
                         title="✅ Your Appeal Status",
@@ -404,20 +463,13 @@ class Appeals(commands.Cog):
                 except Exception:
                     pass
             
-            conn.close()
             print(f"[Appeals] ❌ DM rejected from {message.author.id} - no active punishment found")
             return
         
-        conn = sqlite3.connect(DATABASE_NAME)
-        cur = conn.cursor()
-        
         # Check for pending appeals only - allows new appeal if re-punished after previous approval/denial
-        cur.execute('SELECT id, status FROM unban_requests WHERE user_id = ? AND status = "pending"', (message.author.id,))
-        existing = cur.fetchone()
+        appeal_id = self.store.pending_id(message.author.id)
         
-        if existing:
-            appeal_id, appeal_status = existing
-            conn.close()
+        if appeal_id is not None:
             try:
                 embed = discord.Embed(
                     title="⏳ Appeal Already Submitted",
@@ -433,12 +485,13 @@ class Appeals(commands.Cog):
             return
         
         # Create new appeal
-        cur.execute('INSERT INTO unban_requests (user_id, reason) VALUES (?, ?)', (message.author.id, content))
-        conn.commit()
-        appeal_id = cur.lastrowid
-        conn.close()
+        appeal_id = await self.store.create(message.author.id, content)
         
         print(f"[Appeals] ✅ New appeal #{appeal_id} created from {message.author} ({message.author.id}) - {punishment_type} in {guild_name}")
+        if punishment_type == "timed out":
+            timeout_end = self._timeout_end(message.author.id)
+            if timeout_end is not None:
+                self.timeout_checks.schedule(message.author.id, timeout_end.timestamp() + 1)
         
         # User confirmation
         try:
@@ -497,42 +550,40 @@ class Appeals(commands.Cog):
             await ctx.send(embed=embed)
             return
         
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
+        async def fetch(before, count):
+            return await self.store.page(None if status == "all" else status, before, count)
         
-        if status == "all":
-            cursor.execute('SELECT id, user_id, reason, status, timestamp FROM unban_requests ORDER BY timestamp DESC LIMIT 20')
-        else:
-            cursor.execute('SELECT id, user_id, reason, status, timestamp FROM unban_requests WHERE status = ? ORDER BY timestamp DESC LIMIT 20', (status,))
-        
-        appeals = cursor.fetchall()
-        conn.close()
-        
-        if not appeals:
-            embed = create_info_embed("No Appeals", f"No {status} appeals found.")
-            await ctx.send(embed=embed)
-            return
-        
-        embed = discord.Embed(title=f'{status.title()} Appeals', color=0x3498db)
-        
-        for appeal in appeals:
-            appeal_id, user_id, reason, appeal_status, timestamp = appeal
-            try:
-                user = await self.bot.fetch_user(user_id)
-                user_name = f"{user} ({user_id})"
-            except:
-                user_name = f"Unknown ({user_id})"
+        async def render(appeals, page):
+            embed = discord.Embed(title=f'{status.title()} Appeals', color=0x3498db)
             
-            status_emoji = {"pending": "🟡", "approved": "🟢", "denied": ""}.get(appeal_status, "")
+            # Users are looked up for the visible page only, from cache when possible
+            for appeal in appeals:
+                appeal_id, user_id, reason, appeal_status, timestamp = appeal
+                user = self.bot.get_user(user_id)
+                if user is None:
+                    try:
+                        user = await self.bot.fetch_user(user_id)
+                    except:
+                        user = None
+                user_name = f"{user} ({user_id})" if user else f"Unknown ({user_id})"
+                
+                status_emoji = {"pending": "🟡", "approved": "🟢", "denied": ""}.get(appeal_status, "")
+                reason = reason or ""
+                
+                embed.add_field(
+                    name=f'{status_emoji} Appeal #{appeal_id}', 
+                    value=f'**User:** {user_name}\n**Status:** {appeal_status.title()}\n**Reason:** {reason[:100]}{"..." if len(reason) > 100 else ""}\n**Time:** {timestamp}', 
+                    inline=False
+                )
             
-            embed.add_field(
-                name=f'{status_emoji} Appeal #{appeal_id}', 
-                value=f'**User:** {user_name}\n**Status:** {appeal_status.title()}\n**Reason:** {reason[:100]}{"..." if len(reason) > 100 else ""}\n**Time:** {timestamp}', 
-                inline=False
-            )
+            embed.set_footer(text=f"Page {page} • Use /approve <id> or /deny <id> <reason> to process appeals")
+            return embed
         
-        embed.set_footer(text=f"Use /approve <id> or /deny <id> <reason> to process appeals")
-        await ctx.send(embed=embed)
+        paginator = KeysetPaginator(fetch, render, key=lambda appeal: (appeal[4], appeal[0]),
+                                    page_size=APPEALS_PAGE_SIZE, author_id=ctx.author.id)
+        if not await paginator.start(ctx.send):
+            embed = create_info_embed("No Appeals", f"No {status} appeals found.")
+            await ctx.send(embed=embed)
 
     @commands.hybrid_command(name="approve")
     @commands.has_permissions(administrator=True)
@@ -542,22 +593,13 @@ class Appeals(commands.Cog):
     )
     async def approve(self, ctx, appeal_id: int, *, reason: str = "Appeal approved"):
         """Approve an unban appeal"""
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        cursor.execute('SELECT user_id FROM unban_requests WHERE id = ? AND status = "pending"', (appeal_id,))
-        result = cursor.fetchone()
+        user_id = await self.store.resolve(appeal_id, "approved")
         
-        if not result:
+        if user_id is None:
             embed = create_error_embed("Appeal Not Found", "Appeal not found or already processed.")
             await ctx.send(embed=embed)
-            conn.close()
             return
         
-        user_id = result[0]
-        cursor.execute('UPDATE unban_requests SET status = "approved" WHERE id = ?', (appeal_id,))
-        conn.commit()
-        conn.close()
-        
         # Determine if user is still a member (timeout case) or banned
         guild = ctx.guild
         member = guild.get_member(user_id) if guild else None
@@ -648,22 +690,13 @@ class Appeals(commands.Cog):
     )
     async def deny(self, ctx, appeal_id: int, *, reason: str = "Appeal denied"):
         """Deny an unban appeal"""
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        cursor.execute('SELECT user_id FROM unban_requests WHERE id = ? AND status = "pending"', (appeal_id,))
-        result = cursor.fetchone()
+        user_id = await self.store.resolve(appeal_id, "denied")
         
-        if not result:
+        if user_id is None:
             embed = create_error_embed("Appeal Not Found", "Appeal not found or already processed.")
             await ctx.send(embed=embed)
-            conn.close()
             return
         
-        user_id = result[0]
-        cursor.execute('UPDATE unban_requests SET status = "denied" WHERE id = ?', (appeal_id,))
-        conn.commit()
-        conn.close()
-        
         embed = discord.Embed(title='Appeal Denied', color=0xe74c3c)
         embed.add_field(name='Appeal ID', value=f"#{appeal_id}", inline=True)
         embed.add_field(name='User ID', value=str(user_id), inline=True)
@@ -701,11 +734,7 @@ class Appeals(commands.Cog):
     @app_commands.describe(appeal_id="The ID of the appeal to get information about")
     async def appealinfo(self, ctx, appeal_id: int):
         """Get detailed information about an appeal"""
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        cursor.execute('SELECT user_id, reason, status, timestamp FROM unban_requests WHERE id = ?', (appeal_id,))
-        result = cursor.fetchone()
-        conn.close()
+        result = await self.store.get(appeal_id)
         
         if not result:
             embed = create_error_embed("Appeal Not Found", f"No appeal found with ID #{appeal_id}")
@@ -775,10 +804,18 @@ class Appeals(commands.Cog):
             embed = create_error_embed("Failed to Send Appeal", f"Error: {str(e)}")
             await ctx.send(embed=embed)
     
-    def cog_unload(self):
+    async def cog_load(self):
+        await self.store.load()
+        # Appeals arrive as DMs from users
+        self.bot.message_router.register("appeals", self.handle_message, MessageInterest(dm=True))
+        self.timeout_checks.start()
+    
+    async def cog_unload(self):
         """Cleanup when cog is unloaded"""
+        self.bot.message_router.unregister("appeals")
         if self._appeal_cleanup_task and not self._appeal_cleanup_task.done():
             self._appeal_cleanup_task.cancel()
+        await self.timeout_checks.stop()
         self._timeout_dedupe_cache.clear()
         self._ban_event_handled.clear()
 
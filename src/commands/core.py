@@ -671,7 +671,7 @@ class HelpDropdown(discord.ui.Select):
                 "**`/lockdown [#channel] [reason]`** - Restrict channel access\n"
                 "**`/unlock [#channel]`** - Remove channel restrictions\n"
                 "**`/slowmode <seconds> [#channel]`** - Set channel slowmode\n"
-                "**`/massban <user_ids> [reason]`** - Ban multiple users at once\n"
+                "**`/massban <user_ids> [file] [reason]`** - Ban multiple users at once (IDs pasted or in a file)\n"
                 "**`/nuke [#channel] [reason]`** - Clone and replace channel"
             ),
             inline=False
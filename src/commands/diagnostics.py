@@ -30,12 +30,37 @@ class Diagnostics(commands.Cog):
         )
         
         # Performance
+        performance = f"**Latency:** {round(self.bot.latency*1000)}ms\n**Guilds:** {len(self.bot.guilds)}"
+        probe = getattr(self.bot, 'loop_lag', None)
+        if probe:
+            lag = probe.snapshot()
+            performance += f"\n**Loop Lag:** p99 {lag['p99_ms']:.0f}ms / max {lag['max_ms']:.0f}ms"
+        logging_cog = self.bot.get_cog('LoggingCog')
+        if logging_cog:
+            stats = logging_cog.get_delivery_stats().values()
+            depth = sum(s['depth'] for s in stats)
+            lag = max(s['lag'] for s in stats)
+            performance += f"\n**Log Queue:** {depth} pending / lag {lag:.1f}s"
         embed.add_field(
             name="Performance Metrics",
-            value=f"**Latency:** {round(self.bot.latency*1000)}ms\n**Guilds:** {len(self.bot.guilds)}",
+            value=performance,
             inline=True
         )
         
+        # Message handlers, slowest first
+        router = getattr(self.bot, 'message_router', None)
+        if router:
+            handler_stats = sorted(router.stats().items(), key=lambda item: item[1].total_ms, reverse=True)
+            lines = [
+                f"**{name}:** {s.calls} calls, avg {s.total_ms / s.calls:.1f}ms / max {s.max_ms:.0f}ms"
+                for name, s in handler_stats if s.calls
+            ]
+            embed.add_field(
+                name="Message Handlers",
+                value=f"**Messages:** {router.messages}\n" + ("\n".join(lines[:5]) or "No handler calls yet"),
+                inline=False
+            )
+        
         # Database Status
         db_files = []
         data_dir = Path("data")
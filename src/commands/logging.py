@@ -5,7 +5,6 @@ Handles all logging events and sends them to the appropriate channels.
 
 import discord
 from discord.ext import commands
-import sqlite3
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Union, Dict, Any, List, Tuple
 import asyncio
@@ -15,8 +14,10 @@ from pathlib import Path
 
 # Add parent directory to path to import config
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-from utils.database import DATABASE_NAME
-import logging
+from config import LOG_REPLAY_MAX_AGE_HOURS, LOG_REPLAY_BATCH_SIZE
+from utils.database import get_db
+from utils.db_pool import BatchWriter
+from utils.audit_index import find_audit_entry, is_timeout_entry
 
 logger = logging.getLogger("codeverse.logging")
 
@@ -24,30 +25,81 @@ logger = logging.getLogger("codeverse.logging")
 MEMBER_LOGS_CHANNEL = 1263434413581008956  # member updates (join/leave/role update)
 MOD_LOGS_CHANNEL = 1399746928585085068     # moderation logs (ban/kick/warn/timeout)
 
+# Event types routed to the moderation log channel; everything else goes to member logs
+MOD_LOG_PREFIXES = ("BAN", "KICK", "WARN", "TIMEOUT", "MUTE", "UNMUTE",
+                    "UNBAN", "MOD_", "POINT_", "APPEAL_")
+
+# Discord limits: 10 embeds and 6000 embed characters per message
+EMBEDS_PER_MESSAGE = 10
+EMBED_CHARS_PER_MESSAGE = 6000
+
+# Group commit for bot_logs: rows arriving within LOG_BATCH_DELAY seconds
+# (up to LOG_BATCH_MAX_ROWS) are written in a single transaction
+LOG_BATCH_MAX_ROWS = 200
+LOG_BATCH_DELAY = 0.005
+
+INSERT_LOG_SQL = '''
+    INSERT INTO bot_logs
+    (timestamp, event_type, guild_id, user_id, moderator_id, channel_id, details)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+async def _insert_log_rows(conn, rows):
+    """Insert a batch of bot_logs rows and return their ids in order"""
+    await conn.executemany(INSERT_LOG_SQL, rows)
+    async with conn.execute("SELECT last_insert_rowid()") as cursor:
+        last_id = (await cursor.fetchone())[0]
+    # Rows inserted by one executemany inside a single write transaction get
+    # consecutive AUTOINCREMENT ids, ending at last_insert_rowid()
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+async def _mark_logs_sent(conn, log_ids):
+    """Acknowledge a batch of delivered logs"""
+    await conn.executemany("UPDATE bot_logs SET sent_to_discord = 1 WHERE id = ?", [(log_id,) for log_id in log_ids])
+
 class LoggingCog(commands.Cog, name="LoggingCog"):
     """Centralized logging system for all bot events"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.log_queue = asyncio.Queue()
+        # One delivery queue per destination so a rate-limited channel
+        # does not hold back the other one
+        self.log_queues: Dict[str, asyncio.Queue] = {"member": asyncio.Queue(), "mod": asyncio.Queue()}
+        self.delivery_stats: Dict[str, Dict[str, float]] = {
+            dest: {"messages": 0, "embeds": 0, "lag": 0.0} for dest in self.log_queues
+        }
         self.is_ready = False
         self.member_log_channel = None
         self.mod_log_channel = None
+        self.db = get_db()
+        # Highest bot_logs id written before this session; unsent rows up to
+        # here are replayed once the bot is ready
+        self.replay_upto: Optional[int] = None
+        self.log_writer = BatchWriter(self.db, _insert_log_rows, LOG_BATCH_MAX_ROWS, LOG_BATCH_DELAY, name="bot_logs")
+        self.ack_writer = BatchWriter(self.db, _mark_logs_sent, LOG_BATCH_MAX_ROWS, LOG_BATCH_DELAY, name="bot_logs-ack")
+        
+        # Per-destination delivery tasks (and the replay), started by process_logs
+        self.delivery_tasks: Dict[str, asyncio.Task] = {}
         
         # Start log processing task
         self.log_task = asyncio.create_task(self.process_logs())
+    
+    async def cog_load(self):
+        """Create database tables if needed"""
+        await self.setup_database()
+        try:
+            row = await self.db.fetchone("SELECT MAX(id) FROM bot_logs")
+            self.replay_upto = row[0] if row else None
+        except Exception as e:
+            logger.error(f"Error reading log outbox: {e}")
         
-        # Create database tables if needed
-        self.setup_database()
-        
-    def setup_database(self):
+    async def setup_database(self):
         """Create database tables for logging if they don't exist"""
         try:
-            conn = sqlite3.connect(DATABASE_NAME)
-            cursor = conn.cursor()
-            
             # Create logs table
-            cursor.execute('''
+            await self.db.execute('''
                 CREATE TABLE IF NOT EXISTS bot_logs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp TEXT,
@@ -60,16 +112,28 @@ class LoggingCog(commands.Cog, name="LoggingCog"):
                     sent_to_discord BOOLEAN DEFAULT 0
                 )
             ''')
-            
-            conn.commit()
-            conn.close()
+            # Partial index over the outbox only, so replay cost follows the
+            # number of unsent rows rather than the size of the table
+            await self.db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_bot_logs_unsent
+                ON bot_logs(id) WHERE sent_to_discord = 0
+            ''')
         except Exception as e:
             logger.error(f"Error setting up logging database: {e}")
     
-    def cog_unload(self):
+    async def cog_unload(self):
         """Cleanup when cog is unloaded"""
         if self.log_task:
             self.log_task.cancel()
+        # The delivery tasks outlive process_logs if its gather fails, so stop them here
+        tasks = list(self.delivery_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.delivery_tasks.clear()
+        # Flush rows still waiting for their group commit
+        await self.log_writer.close()
+        await self.ack_writer.close()
     
     async def process_logs(self):
         """Background task to process log queue and send to appropriate channels"""
@@ -88,58 +152,140 @@ class LoggingCog(commands.Cog, name="LoggingCog"):
             if not self.mod_log_channel:
                 logger.warning(f"Moderation log channel {MOD_LOGS_CHANNEL} not found")
             
-            while True:
-                # Get log item from queue
-                log_item = await self.log_queue.get()
-                try:
-                    await self._process_log_item(log_item)
-                except Exception as e:
-                    logger.error(f"Error processing log item: {e}")
-                finally:
-                    self.log_queue.task_done()
-                
-                # Small delay to prevent API rate limits
-                await asyncio.sleep(0.5)
+            self.delivery_tasks = {
+                "member": asyncio.create_task(self._deliver("member", self.member_log_channel)),
+                "mod": asyncio.create_task(self._deliver("mod", self.mod_log_channel)),
+                "replay": asyncio.create_task(self._replay_unsent()),
+            }
+            await asyncio.gather(*self.delivery_tasks.values())
         
         except asyncio.CancelledError:
             logger.info("Log processing task cancelled")
         except Exception as e:
             logger.error(f"Log processing task encountered an error: {e}")
             
-    async def _process_log_item(self, log_item):
-        """Process a single log item from the queue"""
-        event_type = log_item.get("event_type")
-        user_id = log_item.get("user_id")
-        guild_id = log_item.get("guild_id")
-        details = log_item.get("details", "")
-        channel_id = log_item.get("channel_id")
-        moderator_id = log_item.get("moderator_id")
-        log_id = log_item.get("log_id")
-        
-        # Determine which channel to send to
-        is_mod_log = event_type.startswith(("BAN", "KICK", "WARN", "TIMEOUT", "MUTE", "UNMUTE", 
-                                           "UNBAN", "MOD_", "POINT_", "APPEAL_"))
-        
-        log_channel = self.mod_log_channel if is_mod_log else self.member_log_channel
-        
-        if not log_channel:
-            return  # No channel to send to
+    async def _replay_unsent(self):
+        """Queue bot_logs rows that were stored but never sent before the last shutdown"""
+        if not self.replay_upto:
+            return
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=LOG_REPLAY_MAX_AGE_HOURS)).isoformat()
+        last_id = 0
+        replayed = 0
+        expired = 0
+        while True:
+            rows = await self.db.fetchall('''
+                SELECT id, timestamp, event_type, guild_id, user_id, moderator_id, channel_id, details
+                FROM bot_logs
+                WHERE sent_to_discord = 0 AND id > ? AND id <= ?
+                ORDER BY id
+                LIMIT ?
+            ''', (last_id, self.replay_upto, LOG_REPLAY_BATCH_SIZE))
+            if not rows:
+                break
+            
+            too_old = []
+            for log_id, timestamp, event_type, guild_id, user_id, moderator_id, channel_id, details in rows:
+                last_id = log_id
+                if not timestamp or timestamp < cutoff:
+                    too_old.append(log_id)
+                    continue
+                log_item = {
+                    "log_id": log_id,
+                    "timestamp": datetime.fromisoformat(timestamp),
+                    "event_type": event_type or "UNKNOWN",
+                    "user_id": user_id,
+                    "guild_id": guild_id,
+                    "moderator_id": moderator_id,
+                    "channel_id": channel_id,
+                    "details": details,
+                }
+                dest = "mod" if log_item["event_type"].startswith(MOD_LOG_PREFIXES) else "member"
+                await self.log_queues[dest].put(log_item)
+                replayed += 1
+            
+            # Give up on expired rows for good, so they leave the unsent index
+            # instead of being read again on every restart
+            if too_old:
+                await self.db.transaction(lambda conn: _mark_logs_sent(conn, too_old))
+                expired += len(too_old)
+            
+            # Keep at most about one batch queued ahead of delivery
+            while sum(queue.qsize() for queue in self.log_queues.values()) > LOG_REPLAY_BATCH_SIZE:
+                await asyncio.sleep(0.5)
         
-        # Create and send appropriate embed based on event type
-        embed = await self._create_log_embed(log_item)
-        if embed:
+        if replayed:
+            logger.info(f"Replayed {replayed} unsent log entries")
+        if expired:
+            logger.info(f"Dropped {expired} unsent log entries older than {LOG_REPLAY_MAX_AGE_HOURS}h")
+    
+    async def _deliver(self, dest: str, log_channel):
+        """Drain one destination queue, packing up to 10 embeds per message"""
+        queue = self.log_queues[dest]
+        while True:
+            items = [await queue.get()]
+            while len(items) < EMBEDS_PER_MESSAGE and not queue.empty():
+                items.append(queue.get_nowait())
             try:
-                await log_channel.send(embed=embed)
-                
-                # Update database to mark log as sent
-                if log_id:
-                    conn = sqlite3.connect(DATABASE_NAME)
-                    cursor = conn.cursor()
-                    cursor.execute("UPDATE bot_logs SET sent_to_discord = 1 WHERE id = ?", (log_id,))
-                    conn.commit()
-                    conn.close()
+                if log_channel:
+                    await self._send_log_batch(dest, log_channel, items)
             except Exception as e:
-                logger.error(f"Error sending log to channel: {e}")
+                logger.error(f"Error sending logs to {dest} channel: {e}")
+            finally:
+                for _ in items:
+                    queue.task_done()
+    
+    async def _send_log_batch(self, dest: str, log_channel, items):
+        """Build embeds for a batch of log items and send them in as few messages as possible"""
+        embeds = await asyncio.gather(*(self._create_log_embed(item) for item in items))
+        
+        messages: List[List[Tuple[discord.Embed, Any]]] = []
+        chars = 0
+        for item, embed in zip(items, embeds):
+            if not embed:
+                continue
+            size = len(embed)
+            if not messages or len(messages[-1]) >= EMBEDS_PER_MESSAGE or chars + size > EMBED_CHARS_PER_MESSAGE:
+                messages.append([])
+                chars = 0
+            messages[-1].append((embed, item))
+            chars += size
+        
+        for message in messages:
+            # No fixed sleep here: discord.py keeps a bucket per route (this
+            # channel) from the X-RateLimit-* response headers and holds the
+            # request until the bucket has room
+            try:
+                try:
+                    await log_channel.send(embeds=[embed for embed, _ in message])
+                except discord.RateLimited as e:
+                    await asyncio.sleep(e.retry_after)
+                    await log_channel.send(embeds=[embed for embed, _ in message])
+            except discord.HTTPException as e:
+                # Leave these rows unacked for the next replay and carry on with the rest of the batch
+                logger.error(f"Error sending {len(message)} log(s) to {dest} channel: {e}")
+                continue
+            
+            stats = self.delivery_stats[dest]
+            stats["messages"] += 1
+            stats["embeds"] += len(message)
+            oldest = min(item["timestamp"] for _, item in message)
+            stats["lag"] = (datetime.now(timezone.utc) - oldest).total_seconds()
+            
+            # Mark logs as sent (batched with other acknowledgements)
+            for _, item in message:
+                if item.get("log_id"):
+                    self.ack_writer.submit_background(item["log_id"])
+    
+    def get_delivery_stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth, sent counts and delivery lag (seconds) per destination"""
+        return {
+            dest: {"depth": queue.qsize(), **self.delivery_stats[dest]}
+            for dest, queue in self.log_queues.items()
+        }
+    
+    async def _resolve_user(self, user_id: int):
+        """User from the cache, falling back to the API"""
+        return self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
                 
     async def _create_log_embed(self, log_item):
         """Create an appropriate embed for the log item"""
@@ -156,13 +302,13 @@ class LoggingCog(commands.Cog, name="LoggingCog"):
         
         if user_id:
             try:
-                user = await self.bot.fetch_user(user_id)
+                user = await self._resolve_user(user_id)
             except:
                 user = f"Unknown User ({user_id})"
         
         if moderator_id:
             try:
-                moderator = await self.bot.fetch_user(moderator_id)
+                moderator = await self._resolve_user(moderator_id)
             except:
                 moderator = f"Unknown Moderator ({moderator_id})"
         
@@ -380,27 +526,16 @@ class LoggingCog(commands.Cog, name="LoggingCog"):
             **extra_data  # Include any additional data
         }
         
-        # Add to processing queue
-        await self.log_queue.put(log_item)
+        # Add to the delivery queue for its channel
+        dest = "mod" if event_type.startswith(MOD_LOG_PREFIXES) else "member"
+        await self.log_queues[dest].put(log_item)
         
     async def _store_log_in_db(self, timestamp, event_type, user_id, guild_id, moderator_id, channel_id, details):
         """Store log in database and return log ID"""
         try:
-            conn = sqlite3.connect(DATABASE_NAME)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO bot_logs 
-                (timestamp, event_type, guild_id, user_id, moderator_id, channel_id, details)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            return await self.log_writer.submit((
                 timestamp.isoformat(), event_type, guild_id, user_id, moderator_id, channel_id, details
             ))
-            
-            log_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            return log_id
         except Exception as e:
             logger.error(f"Error storing log in database: {e}")
             return None
@@ -440,23 +575,16 @@ class LoggingCog(commands.Cog, name="LoggingCog"):
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
         """Log member ban events"""
-        # Wait a moment for audit log to be available
-        await asyncio.sleep(1)
-        
         reason = "No reason provided"
         moderator_id = None
         
-        # Try to get ban reason and moderator from audit log
-        try:
-            async for entry in guild.audit_logs(action=discord.AuditLogAction.ban, limit=5):
-                if entry.target and entry.target.id == user.id:
-                    if entry.reason:
-                        reason = entry.reason
-                    if entry.user:
-                        moderator_id = entry.user.id
-                    break
-        except:
-            pass
+        # Get ban reason and moderator from the audit log
+        entry = await find_audit_entry(self.bot, guild, discord.AuditLogAction.ban, user.id)
+        if entry:
+            if entry.reason:
+                reason = entry.reason
+            if entry.user:
+                moderator_id = entry.user.id
         
         await self.log_event(
             event_type="BAN",
@@ -469,23 +597,16 @@ class LoggingCog(commands.Cog, name="LoggingCog"):
     @commands.Cog.listener()
     async def on_member_unban(self, guild, user):
         """Log member unban events"""
-        # Wait a moment for audit log to be available
-        await asyncio.sleep(1)
-        
         reason = "No reason provided"
         moderator_id = None
         
-        # Try to get unban reason and moderator from audit log
-        try:
-            async for entry in guild.audit_logs(action=discord.AuditLogAction.unban, limit=5):
-                if entry.target and entry.target.id == user.id:
-                    if entry.reason:
-                        reason = entry.reason
-                    if entry.user:
-                        moderator_id = entry.user.id
-                    break
-        except:
-            pass
+        # Get unban reason and moderator from the audit log
+        entry = await find_audit_entry(self.bot, guild, discord.AuditLogAction.unban, user.id)
+        if entry:
+            if entry.reason:
+                reason = entry.reason
+            if entry.user:
+                moderator_id = entry.user.id
         
         await self.log_event(
             event_type="UNBAN",
@@ -517,15 +638,9 @@ class LoggingCog(commands.Cog, name="LoggingCog"):
             if role_changes:
                 # Try to get moderator from audit log
                 moderator_id = None
-                try:
-                    await asyncio.sleep(1)  # Wait for audit log
-                    async for entry in after.guild.audit_logs(action=discord.AuditLogAction.member_role_update, limit=5):
-                        if entry.target and entry.target.id == after.id:
-                            if entry.user:
-                                moderator_id = entry.user.id
-                            break
-                except:
-                    pass
+                entry = await find_audit_entry(self.bot, after.guild, discord.AuditLogAction.member_role_update, after.id)
+                if entry and entry.user:
+                    moderator_id = entry.user.id
                 
                 # Log the role changes
                 await self.log_event(
@@ -547,17 +662,13 @@ class LoggingCog(commands.Cog, name="LoggingCog"):
                 # Try to get moderator and reason from audit log
                 moderator_id = None
                 reason = "No reason provided"
-                try:
-                    await asyncio.sleep(1)  # Wait for audit log
-                    async for entry in after.guild.audit_logs(action=discord.AuditLogAction.member_update, limit=5):
-                        if entry.target and entry.target.id == after.id:
-                            if entry.user:
-                                moderator_id = entry.user.id
-                            if entry.reason:
-                                reason = entry.reason
-                            break
-                except:
-                    pass
+                entry = await find_audit_entry(self.bot, after.guild, discord.AuditLogAction.member_update, after.id,
+                                               predicate=is_timeout_entry)
+                if entry:
+                    if entry.user:
+                        moderator_id = entry.user.id
+                    if entry.reason:
+                        reason = entry.reason
                 
                 # Calculate duration
                 now = datetime.now(timezone.utc)
@@ -591,17 +702,13 @@ class LoggingCog(commands.Cog, name="LoggingCog"):
                 # Try to get moderator from audit log
                 moderator_id = None
                 reason = "Timeout removed"
-                try:
-                    await asyncio.sleep(1)  # Wait for audit log
-                    async for entry in after.guild.audit_logs(action=discord.AuditLogAction.member_update, limit=5):
-                        if entry.target and entry.target.id == after.id:
-                            if entry.user:
-                                moderator_id = entry.user.id
-                            if entry.reason:
-                                reason = entry.reason
-                            break
-                except:
-                    pass
+                entry = await find_audit_entry(self.bot, after.guild, discord.AuditLogAction.member_update, after.id,
+                                               predicate=is_timeout_entry)
+                if entry:
+                    if entry.user:
+                        moderator_id = entry.user.id
+                    if entry.reason:
+                        reason = entry.reason
                 
                 # Log timeout removal
                 await self.log_event(
@@ -5,6 +5,7 @@ Merges functionality from moderation.py, moderation_extended.py, and sam warning
 
 import discord
 import asyncio
+import io
 import json
 import os
 import re
@@ -14,10 +15,17 @@ from discord import app_commands
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Union
 from utils.helpers import create_success_embed, create_error_embed, create_warning_embed, log_action
+from utils.database import get_db
+from utils.lockdown import LockdownConflict, LockdownEngine, LockdownResult, UNLOCKING
+from utils.mass_ban import MassBanResult, mass_ban, parse_user_ids
 
 # Bot owner ID for restricted commands
 BOT_OWNER_ID = 955695820999639120
 
+# Massban input limits
+MASSBAN_MAX_IDS = 10000
+MASSBAN_MAX_FILE_BYTES = 1024 * 1024
+
 # SAM Module imports for warnings
 try:
     from sqlalchemy.ext.asyncio import AsyncSession
@@ -39,12 +47,16 @@ class ModCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.muted_users = {}  # Store muted users with timestamps
-        self.lockdown_channels = set()  # Store locked down channels
+        # Server-wide lockdowns, checkpointed so they can be resumed and undone exactly
+        self.lockdown_engine = LockdownEngine(get_db())
         self._db_session = None
         
         # Initialize warnings service if SAM is available
         self.warn_service_class = WarnService if SAM_AVAILABLE else None
 
+    async def cog_load(self):
+        await self.lockdown_engine.setup()
+
     # -------- Database Session Management (for Warnings) --------
     
     async def _get_db_session(self) -> AsyncSession:
@@ -435,8 +447,6 @@ class ModCog(commands.Cog):
             overwrites.send_messages = False
             await channel.set_permissions(ctx.guild.default_role, overwrite=overwrites, reason=f"Channel locked by {ctx.author}")
             
-            self.lockdown_channels.add(channel.id)
-            
             embed = discord.Embed(
                 title="🔒 Channel Locked",
                 description=f"{channel.mention} has been locked. Members cannot send messages.",
@@ -468,8 +478,6 @@ class ModCog(commands.Cog):
             overwrites.send_messages = None  # Reset to default
             await channel.set_permissions(ctx.guild.default_role, overwrite=overwrites, reason=f"Channel unlocked by {ctx.author}")
             
-            self.lockdown_channels.discard(channel.id)
-            
             embed = discord.Embed(
                 title="🔓 Channel Unlocked",
                 description=f"{channel.mention} has been unlocked. Members can send messages again.",
@@ -488,32 +496,34 @@ class ModCog(commands.Cog):
     @commands.bot_has_permissions(manage_channels=True)
     @commands.guild_only()
     async def lockdown(self, ctx: commands.Context):
-        """Lock all channels in the server"""
+        """Lock all channels in the server (resumes an interrupted lockdown)"""
         assert ctx.guild is not None
         
-        await ctx.send("🔒 Initiating server lockdown...")
+        status = await ctx.send("🔒 Initiating server lockdown...")
         
-        locked_count = 0
-        failed_count = 0
+        async def progress(result: LockdownResult):
+            await status.edit(content=f"🔒 Locking channels... {result.processed}/{result.total}")
         
-        for channel in ctx.guild.text_channels:
-            try:
-                overwrites = channel.overwrites_for(ctx.guild.default_role)
-                overwrites.send_messages = False
-                await channel.set_permissions(ctx.guild.default_role, overwrite=overwrites, reason=f"Server lockdown by {ctx.author}")
-                self.lockdown_channels.add(channel.id)
-                locked_count += 1
-            except:
-                failed_count += 1
+        try:
+            result = await self.lockdown_engine.lock(ctx.guild, moderator_id=ctx.author.id,
+                                                     reason=f"Server lockdown by {ctx.author}", progress=progress)
+        except LockdownConflict as e:
+            if e.phase == UNLOCKING:
+                return await ctx.send("❌ A previous `/unlockdown` did not finish. Run `/unlockdown` again to complete it.")
+            return await ctx.send("❌ The server is already locked down. Use `/unlockdown` to lift it.")
         
         embed = discord.Embed(
             title="🔒 Server Lockdown Complete",
-            description=f"Successfully locked **{locked_count}** channels.",
+            description=f"Successfully locked **{len(result.done)}** channels.",
             color=discord.Color.red()
         )
         
-        if failed_count > 0:
-            embed.add_field(name="⚠️ Failed", value=f"{failed_count} channels could not be locked.", inline=False)
+        if result.resumed:
+            embed.add_field(name="↩️ Resumed", value="Continued a lockdown that was interrupted.", inline=False)
+        
+        if result.failed:
+            failures = "\n".join(f"<#{channel_id}>: {why}" for channel_id, why in list(result.failed.items())[:10])
+            embed.add_field(name=f"⚠️ Failed ({len(result.failed)})", value=failures, inline=False)
         
         embed.set_footer(text=f"Lockdown initiated by {ctx.author}")
         await ctx.send(embed=embed)
@@ -523,37 +533,27 @@ class ModCog(commands.Cog):
     @commands.bot_has_permissions(manage_channels=True)
     @commands.guild_only()
     async def unlockdown(self, ctx: commands.Context):
-        """Unlock all previously locked channels"""
+        """Restore every channel to how it was before the lockdown"""
         assert ctx.guild is not None
         
-        if not self.lockdown_channels:
-            return await ctx.send("❌ No channels are currently locked down.")
+        status = await ctx.send("🔓 Removing server lockdown...")
         
-        await ctx.send("🔓 Removing server lockdown...")
+        async def progress(result: LockdownResult):
+            await status.edit(content=f"🔓 Restoring channels... {result.processed}/{result.total}")
         
-        unlocked_count = 0
-        failed_count = 0
-        
-        for channel_id in list(self.lockdown_channels):
-            channel = ctx.guild.get_channel(channel_id)
-            if channel and isinstance(channel, discord.TextChannel):
-                try:
-                    overwrites = channel.overwrites_for(ctx.guild.default_role)
-                    overwrites.send_messages = None
-                    await channel.set_permissions(ctx.guild.default_role, overwrite=overwrites, reason=f"Lockdown removed by {ctx.author}")
-                    self.lockdown_channels.discard(channel_id)
-                    unlocked_count += 1
-                except:
-                    failed_count += 1
+        result = await self.lockdown_engine.unlock(ctx.guild, reason=f"Lockdown removed by {ctx.author}", progress=progress)
+        if result is None:
+            return await ctx.send("❌ No channels are currently locked down.")
         
         embed = discord.Embed(
             title="🔓 Server Lockdown Removed",
-            description=f"Successfully unlocked **{unlocked_count}** channels.",
+            description=f"Successfully unlocked **{len(result.done)}** channels.",
             color=discord.Color.green()
         )
         
-        if failed_count > 0:
-            embed.add_field(name="⚠️ Failed", value=f"{failed_count} channels could not be unlocked.", inline=False)
+        if result.failed:
+            failures = "\n".join(f"<#{channel_id}>: {why}" for channel_id, why in list(result.failed.items())[:10])
+            embed.add_field(name=f"⚠️ Failed ({len(result.failed)})", value=failures + "\nRun `/unlockdown` again to retry.", inline=False)
         
         embed.set_footer(text=f"Lockdown removed by {ctx.author}")
         await ctx.send(embed=embed)
@@ -624,10 +624,14 @@ class ModCog(commands.Cog):
             await ctx.send(f"❌ Failed to nuke channel: {str(e)}")
 
     @commands.hybrid_command(name="massban", help="Ban multiple users by ID (OWNER ONLY)")
-    @app_commands.describe(user_ids="User IDs to ban (space-separated)", reason="Reason for the bans")
+    @app_commands.describe(
+        user_ids="User IDs to ban (any separators, mentions allowed)",
+        file="Text file of user IDs, for lists too long to paste",
+        reason="Reason for the bans"
+    )
     @commands.bot_has_permissions(ban_members=True)
     @commands.guild_only()
-    async def massban(self, ctx: commands.Context, user_ids: str, *, reason: str = "Mass ban"):
+    async def massban(self, ctx: commands.Context, user_ids: str = "", file: Optional[discord.Attachment] = None, *, reason: str = "Mass ban"):
         """Ban multiple users by their IDs (Owner only)"""
         # Check if user is the bot owner
         if ctx.author.id != BOT_OWNER_ID:
@@ -635,51 +639,69 @@ class ModCog(commands.Cog):
         
         assert ctx.guild is not None
         
-        # Parse user IDs
-        ids = [int(id.strip()) for id in user_ids.split() if id.strip().isdigit()]
+        # Parse user IDs from the text and the attached file
+        text = user_ids
+        if file is not None:
+            if file.size > MASSBAN_MAX_FILE_BYTES:
+                return await ctx.send("❌ ID file is too large (max 1 MB).")
+            text += "\n" + (await file.read()).decode("utf-8", errors="ignore")
+        ids = parse_user_ids(text)
         
         if not ids:
             return await ctx.send("❌ No valid user IDs provided.")
         
-        if len(ids) > 50:
-            return await ctx.send("❌ Cannot ban more than 50 users at once.")
+        if len(ids) > MASSBAN_MAX_IDS:
+            return await ctx.send(f"❌ Cannot ban more than {MASSBAN_MAX_IDS} users at once.")
         
-        await ctx.send(f"⚖️ Processing ban for {len(ids)} user(s)...")
+        protected = {ctx.author.id: "you", ctx.guild.owner_id: "server owner"}
+        if self.bot.user:
+            protected[self.bot.user.id] = "the bot"
         
-        banned = []
-        failed = []
+        status = await ctx.send(f"⚖️ Processing ban for {len(ids)} user(s)...")
         
-        for user_id in ids:
-            try:
-                user = await self.bot.fetch_user(user_id)
-                await ctx.guild.ban(user, reason=f"[MASSBAN] {reason}")
-                banned.append(f"{user} ({user_id})")
-            except Exception as e:
-                failed.append(f"{user_id}: {str(e)}")
+        async def progress(result: MassBanResult):
+            await status.edit(content=(
+                f"⚖️ Banning... {result.processed}/{result.total} processed "
+                f"({len(result.banned)} banned, {len(result.failed)} failed)"
+            ))
+        
+        result = await mass_ban(ctx.guild, ids, reason=f"[MASSBAN] {reason}", protected=protected, progress=progress)
         
         embed = discord.Embed(
             title="🔨 Mass Ban Complete",
             color=discord.Color.red()
         )
         
-        if banned:
+        if result.banned:
             embed.add_field(
-                name=f"✅ Banned ({len(banned)})",
-                value="\n".join(banned[:10]) + (f"\n...and {len(banned) - 10} more" if len(banned) > 10 else ""),
+                name=f"✅ Banned ({len(result.banned)})",
+                value="\n".join(f"<@{user_id}> ({user_id})" for user_id in result.banned[:10]) + (f"\n...and {len(result.banned) - 10} more" if len(result.banned) > 10 else ""),
                 inline=False
             )
         
-        if failed:
+        problems = [f"{user_id}: {why}" for user_id, why in result.failed.items()]
+        problems += [f"{user_id}: skipped ({why})" for user_id, why in result.skipped.items()]
+        if problems:
             embed.add_field(
-                name=f"❌ Failed ({len(failed)})",
-                value="\n".join(failed[:10]) + (f"\n...and {len(failed) - 10} more" if len(failed) > 10 else ""),
+                name=f"❌ Not Banned ({len(problems)})",
+                value="\n".join(problems[:10]) + (f"\n...and {len(problems) - 10} more" if len(problems) > 10 else ""),
                 inline=False
             )
         
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.set_footer(text=f"Mass ban by {ctx.author}")
         
-        await ctx.send(embed=embed)
+        # Full per-ID outcomes once they no longer fit in the embed
+        if len(result.banned) > 10 or len(problems) > 10:
+            report = discord.File(io.BytesIO(result.report().encode("utf-8")), filename="massban_report.txt")
+            await ctx.send(embed=embed, file=report)
+        else:
+            await ctx.send(embed=embed)
+        
+        try:
+            await status.edit(content=f"⚖️ Processed {result.processed}/{result.total} user(s).")
+        except discord.HTTPException:
+            pass
 
     @commands.hybrid_command(name="nickname", help="Change a member's nickname")
     @app_commands.describe(member="Member to change nickname", nickname="New nickname (leave empty to reset)")
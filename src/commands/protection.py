@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands
-from collections import defaultdict, deque
+from collections import deque
 import time
 from datetime import datetime
 import sys
@@ -12,6 +12,7 @@ from config import *
 
 from utils.database import add_points
 from utils.embeds import create_error_embed
+from utils.rate_limit import RateLimiter
 
 class Protection(commands.Cog):
     """Anti-spam, anti-raid, and anti-nuke protection systems"""
@@ -19,17 +20,14 @@ class Protection(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         
-        # Anti-spam tracking
-        self.user_messages = defaultdict(deque)
-        self.user_duplicates = defaultdict(lambda: defaultdict(int))
-        
         # Anti-raid tracking - auto-cleanup with maxlen
         self.recent_joins = deque(maxlen=JOIN_THRESHOLD * 2)
         
         # Anti-nuke tracking - auto-cleanup with maxlen
         self.recent_bans = deque(maxlen=MASS_BAN_THRESHOLD * 2)
         self.recent_kicks = deque(maxlen=MASS_KICK_THRESHOLD * 2)
-        self.recent_deletes = defaultdict(lambda: deque(maxlen=MASS_DELETE_THRESHOLD * 2))
+        # Bulk deletes per guild in a sliding NUKE_TIME_WINDOW; idle guilds are evicted
+        self.recent_deletes = RateLimiter(MASS_DELETE_THRESHOLD, NUKE_TIME_WINDOW)
 
     # @commands.Cog.listener()
     # async def on_message(self, message):
@@ -149,13 +147,9 @@ class Protection(commands.Cog):
             return
             
         guild = messages[0].guild
-        now = time.time()
-        self.recent_deletes[guild.id].append(now)
-        
-        # Count recent deletes
-        recent_count = sum(1 for t in self.recent_deletes[guild.id] if now - t < NUKE_TIME_WINDOW)
         
-        if recent_count > MASS_DELETE_THRESHOLD:
+        # Over MASS_DELETE_THRESHOLD bulk deletes within NUKE_TIME_WINDOW
+        if not self.recent_deletes.allow(guild.id):
             try:
                 embed = discord.Embed(
                     title="Mass Delete Alert",
@@ -187,10 +181,6 @@ class Protection(commands.Cog):
             embed.add_field(name="Mention Threshold", value=f"{MENTION_THRESHOLD} mentions", inline=True)
             embed.add_field(name="Caps Threshold", value=f"{int(CAPS_THRESHOLD * 100)}%", inline=True)
             
-            # Show current tracking stats
-            active_users = len(self.user_messages)
-            embed.add_field(name="Active Tracking", value=f"{active_users} users", inline=True)
-            
             await ctx.send(embed=embed)
         else:
             embed = create_error_embed("Invalid Action", "Use `!antispam status` to view current settings.")
@@ -3,6 +3,7 @@
 import discord
 from discord.ext import commands
 from datetime import timedelta
+from utils.message_router import MessageInterest
 
 PROTECTED_CHANNEL_ID = 1430566219643228210
 
@@ -10,10 +11,15 @@ class AutoBanChannel(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
+    async def cog_load(self):
+        self.bot.message_router.register("spam_catch", self.handle_message, MessageInterest(
+            channels=frozenset({PROTECTED_CHANNEL_ID}),
+        ))
+
+    async def cog_unload(self):
+        self.bot.message_router.unregister("spam_catch")
+
+    async def handle_message(self, message: discord.Message):
         if message.channel.id == PROTECTED_CHANNEL_ID:
             try:
                 if message.guild is None:
@@ -10,7 +10,45 @@ from typing import Optional, List, Tuple, cast
 from sqlite3 import Row
 import discord.abc
 import asyncio
+import logging
+import sys
+from pathlib import Path
 from utils.helpers import create_success_embed, create_error_embed, create_warning_embed
+from utils.aura_buffer import AuraAwardBuffer, Standings
+from utils.db_pool import get_database
+from utils.paginator import KeysetPaginator
+from utils.points_history import (POINTS_DAILY_SQL, activity_totals, archive_history, backfill_daily,
+                                  history_timestamp, record_history)
+from utils.rank_index import AuraRankIndex
+from utils.staff_resolver import POINTS, get_staff_resolver, parse_points_roles
+
+# Add parent directory to path to import config
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from config import POINTS_HISTORY_RETENTION_DAYS, POINTS_HISTORY_ARCHIVE_DIR
+
+logger = logging.getLogger("codeverse.staff_points")
+
+# Entries per leaderboard page
+LEADERBOARD_PAGE_SIZE = 20
+
+HISTORY_PAGE_SQL = """
+    SELECT id, points_change, reason, action_type, timestamp, moderator_id
+    FROM points_history
+    WHERE guild_id = ? AND user_id = ? {after}
+    ORDER BY timestamp DESC, id DESC
+    LIMIT ?
+"""
+
+# Auto-thanks awards are buffered and written together every AURA_FLUSH_INTERVAL
+# seconds, or as soon as AURA_FLUSH_MAX_PENDING are waiting
+AURA_FLUSH_INTERVAL = 5.0
+AURA_FLUSH_MAX_PENDING = 50
+AURA_JOURNAL_PATH = Path("data/aura_journal.jsonl")
+
+# How often raw points_history older than the retention window is archived (seconds)
+HISTORY_ARCHIVE_INTERVAL = 24 * 3600
+
+STANDING_SQL = "SELECT points, total_earned FROM staff_points WHERE guild_id = ? AND user_id = ?"
 
 class StaffPoints(commands.Cog):
     """Staff Points (Aura) System for tracking and rewarding staff performance"""
@@ -18,6 +56,14 @@ class StaffPoints(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.db_path = "data/staff_points.db"
+        self.db = get_database(self.db_path)
+        self.staff_resolver = get_staff_resolver()
+        # In-memory standings for rank lookups and leaderboard pages
+        self.ranks = AuraRankIndex()
+        # Auto-thanks awards not written yet; ranks and point reads include them
+        self.aura_buffer = AuraAwardBuffer(self.db, AURA_JOURNAL_PATH, interval=AURA_FLUSH_INTERVAL,
+                                           max_pending=AURA_FLUSH_MAX_PENDING, on_flush=self._apply_standings)
+        self.archive_task: Optional[asyncio.Task] = None
         
     def check_guild_context(self, ctx: commands.Context) -> Tuple[discord.Guild, discord.Member]:
         """Validate guild context and return guild and author as Member"""
@@ -30,10 +76,69 @@ class StaffPoints(commands.Cog):
     async def cog_load(self):
         """Initialize the database when the cog loads"""
         await self.init_database()
+        await self.load_staff_roles()
+        await self.load_ranks()
+        await backfill_daily(self.db)
+        await self.aura_buffer.setup()
+        self.aura_buffer.start()
+        if POINTS_HISTORY_RETENTION_DAYS > 0:
+            self.archive_task = asyncio.create_task(self.archive_loop())
+    
+    async def cog_unload(self):
+        """Write buffered awards before the cog goes away"""
+        if self.archive_task:
+            self.archive_task.cancel()
+        await self.aura_buffer.close()
+    
+    async def archive_loop(self):
+        """Archive raw history past the retention window once a day"""
+        while True:
+            try:
+                await self.archive_old_history(POINTS_HISTORY_RETENTION_DAYS)
+            except Exception as e:
+                logger.error(f"Error archiving points history: {e}")
+            await asyncio.sleep(HISTORY_ARCHIVE_INTERVAL)
+    
+    async def archive_old_history(self, retention_days: int) -> int:
+        """Move history rows older than ``retention_days`` to compressed files; points_daily keeps their totals"""
+        before_day = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+        return await archive_history(self.db, before_day, Path(POINTS_HISTORY_ARCHIVE_DIR))
+    
+    async def load_ranks(self):
+        """Build the rank index from staff_points"""
+        rows = await self.db.fetchall("SELECT guild_id, user_id, points, total_earned FROM staff_points")
+        self.ranks.load(rows)
+    
+    def _set_standing(self, guild_id: int, user_id: int, points: int, total_earned: int):
+        """Record a standing read from the database, plus awards still buffered"""
+        pending = self.aura_buffer.pending(guild_id, user_id)
+        self.ranks.update(guild_id, user_id, points + pending, total_earned + pending)
+    
+    def _apply_standings(self, standings: Standings):
+        """Flush callback: fold freshly written standings into the rank index"""
+        for (guild_id, user_id), (points, total_earned) in standings.items():
+            self._set_standing(guild_id, user_id, points, total_earned)
+    
+    @staticmethod
+    async def _read_standing(db: aiosqlite.Connection, guild_id: int, user_id: int) -> Tuple[int, int]:
+        """(points, total_earned) as written by the current transaction"""
+        async with db.execute(STANDING_SQL, (guild_id, user_id)) as cursor:
+            row = await cursor.fetchone()
+        return (row[0] or 0, row[1] or 0) if row else (0, 0)
+    
+    async def load_staff_roles(self):
+        """Warm the shared staff resolver from staff_config"""
+        rows = await self.db.fetchall("SELECT guild_id, staff_role_ids FROM staff_config")
+        self.staff_resolver.load(POINTS, ((guild_id, parse_points_roles(role_ids)) for guild_id, role_ids in rows))
+    
+    async def refresh_staff_roles(self, guild_id: int):
+        """Re-read one guild's staff roles after a staff_config write"""
+        result = await self.db.fetchone("SELECT staff_role_ids FROM staff_config WHERE guild_id = ?", (guild_id,))
+        self.staff_resolver.set_roles(POINTS, guild_id, parse_points_roles(result[0] if result else None))
     
     async def init_database(self):
         """Initialize the staff points database"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async def create_tables(db: aiosqlite.Connection):
             # Staff points table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS staff_points (
@@ -74,7 +179,16 @@ class StaffPoints(commands.Cog):
                 )
             """)
             
-            await db.commit()
+            # Per-day history totals, kept when raw history is archived
+            await db.execute(POINTS_DAILY_SQL)
+            
+            # Keyset pages of one user's history, newest first
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_points_history_user
+                ON points_history(guild_id, user_id, timestamp)
+            """)
+        
+        await self.db.transaction(create_tables)
 
     @commands.hybrid_group(name="aura", description="Staff aura management system")
     @commands.guild_only()
@@ -225,7 +339,7 @@ class StaffPoints(commands.Cog):
     @aura.command(name="history", description="View aura history for a staff member")
     @app_commands.describe(
         member="The staff member to check history for",
-        limit="Number of recent entries to show (default: 10, max: 50)"
+        limit="Number of entries per page (default: 10, max: 25)"
     )
     @commands.has_permissions(manage_messages=True)
     async def points_history(self, ctx: commands.Context, member: Optional[discord.Member] = None, limit: int = 10):
@@ -235,138 +349,114 @@ class StaffPoints(commands.Cog):
         if member is None:
             member = ctx.author  # type: ignore # we know author is Member because of guild_only
         assert isinstance(member, discord.Member), "Target must be a guild member"
+        guild_id = ctx.guild.id
             
-        if limit < 1 or limit > 50:
+        if limit < 1 or limit > 25:
             limit = 10
-            
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("""
-                SELECT points_change, reason, action_type, timestamp, moderator_id
-                FROM points_history 
-                WHERE guild_id = ? AND user_id = ?
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """, (ctx.guild.id, member.id, limit)) as cursor:
-                history_rows = list(await cursor.fetchall())
         
-        if not history_rows:
-            await ctx.reply(f" No points history found for {member.display_name}.", ephemeral=True)
-            return
+        # History is read from points_history, so write buffered awards first
+        await self.aura_buffer.flush()
         
-        embed = discord.Embed(
-            title=f" Points History - {member.display_name}",
-            color=0x3498DB
-        )
-        embed.set_thumbnail(url=member.display_avatar.url)
-
-        current_points = await self.get_user_points(ctx.guild.id, member.id)
-        embed.add_field(name="Current Points", value=f"{current_points} points", inline=True)
+        async def fetch(after, count):
+            if after is None:
+                return await self.db.fetchall(HISTORY_PAGE_SQL.format(after=""), (guild_id, member.id, count))
+            return await self.db.fetchall(HISTORY_PAGE_SQL.format(after="AND (timestamp, id) < (?, ?)"),
+                                          (guild_id, member.id, *after, count))
         
-        history_text = ""
-        for points_change, reason, action_type, timestamp, moderator_id in history_rows:
-            moderator = self.bot.get_user(moderator_id)
-            mod_name = moderator.display_name if moderator else "Unknown"
-            
-            # Parse timestamp
-            try:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                time_str = f"<t:{int(dt.timestamp())}:R>"
-            except:
-                time_str = "Unknown time"
-            
-            sign = "+" if points_change > 0 else ""
-            emoji = "" if points_change > 0 else "" if action_type == "remove" else ""
+        async def render(history_rows, page):
+            embed = discord.Embed(
+                title=f" Points History - {member.display_name}",
+                color=0x3498DB
+            )
+            embed.set_thumbnail(url=member.display_avatar.url)
+
+            current_points = await self.get_user_points(guild_id, member.id)
+            embed.add_field(name="Current Points", value=f"{current_points} points", inline=True)
             
-            history_text += f"{emoji} **{sign}{points_change}** points - {reason}\n"
-            history_text += f"   *by {mod_name} • {time_str}*\n\n"
-        
-        if len(history_text) > 1024:
-            history_text = history_text[:1021] + "..."
+            history_text = ""
+            for _, points_change, reason, action_type, timestamp, moderator_id in history_rows:
+                moderator = self.bot.get_user(moderator_id)
+                mod_name = moderator.display_name if moderator else "Unknown"
+                
+                # Parse timestamp
+                try:
+                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                    time_str = f"<t:{int(dt.timestamp())}:R>"
+                except:
+                    time_str = "Unknown time"
+                
+                sign = "+" if points_change > 0 else ""
+                emoji = "" if points_change > 0 else "" if action_type == "remove" else ""
+                
+                history_text += f"{emoji} **{sign}{points_change}** points - {reason}\n"
+                history_text += f"   *by {mod_name} • {time_str}*\n\n"
             
-        embed.add_field(name="Recent Activity", value=history_text or "No activity", inline=False)
-        embed.set_footer(text=f"Showing last {len(history_rows)} entries")
+            if len(history_text) > 1024:
+                history_text = history_text[:1021] + "..."
+                
+            embed.add_field(name="Recent Activity", value=history_text or "No activity", inline=False)
+            embed.set_footer(text=f"Page {page} • {len(history_rows)} entries")
+            return embed
         
-        await ctx.reply(embed=embed)
+        paginator = KeysetPaginator(fetch, render, key=lambda row: (row[4], row[0]),
+                                    page_size=limit, author_id=ctx.author.id)
+        if not await paginator.start(ctx.reply):
+            await ctx.reply(f" No points history found for {member.display_name}.", ephemeral=True)
 
     @aura.command(name="leaderboard", description="Show all staff members with aura")
     async def leaderboard(self, ctx: commands.Context):
         """Show all staff members with points"""
         assert ctx.guild is not None
-            
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("""
-                SELECT user_id, points, total_earned, last_updated
-                FROM staff_points 
-                WHERE guild_id = ? AND points > 0
-                GROUP BY user_id
-                ORDER BY points DESC, total_earned DESC
-            """, (ctx.guild.id,)) as cursor:
-                leaderboard_rows = list(await cursor.fetchall())
-        
-        if not leaderboard_rows:
+        guild_id = ctx.guild.id
+        
+        ranked = self.ranks.count(guild_id)
+        if not ranked:
             await ctx.reply(" No staff members with points found!", ephemeral=True)
             return
         
-        embed = discord.Embed(
-            title="Staff Aura Leaderboard",
-            description="All staff members with aura",
-            color=0x3498DB
-        )
+        async def fetch(after, count):
+            # Keyset over the in-memory ranking, ordered like
+            # ORDER BY points DESC, total_earned DESC, user_id
+            return self.ranks.page_after(guild_id, after, count)
         
-        leaderboard_text = ""
-        seen_users = set()  # Track users we've already added to prevent duplicates
-        rank = 1
-        for user_id, points, total_earned, last_updated in leaderboard_rows:
-            if user_id in seen_users:
-                continue  # Skip duplicate entries
-            seen_users.add(user_id)
+        async def render(leaderboard_rows, page):
+            embed = discord.Embed(
+                title="Staff Aura Leaderboard",
+                description="All staff members with aura",
+                color=0x3498DB
+            )
             
-            user = self.bot.get_user(user_id)
-            if user:
-                leaderboard_text += f"{rank}. **{user.name}** - {points} aura\n"
-                rank += 1
-        
-        if leaderboard_text:
-            # Split into chunks if too long
-            if len(leaderboard_text) > 1024:
-                chunks = [leaderboard_text[i:i+1024] for i in range(0, len(leaderboard_text), 1024)]
-                for i, chunk in enumerate(chunks):
-                    field_name = f"Rankings {i+1}" if i > 0 else "Rankings"
-                    embed.add_field(name=field_name, value=chunk, inline=False)
-            else:
-                embed.add_field(name="Rankings", value=leaderboard_text, inline=False)
-        
-        # Add some stats
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("""
-                SELECT COUNT(*), SUM(points), SUM(total_earned)
-                FROM staff_points 
-                WHERE guild_id = ?
-            """, (ctx.guild.id,)) as cursor:
-                stats = await cursor.fetchone()
-        
-        if stats and stats[0]:
-            total_staff, total_points, total_earned = stats
-            embed.add_field(name="Server Stats", value=f"Staff Members: {total_staff}\nTotal Points: {total_points or 0}\nTotal Earned: {total_earned or 0}", inline=True)
-        
-        embed.set_footer(text=f"Showing top {len(leaderboard_rows)} staff members")
-        embed.timestamp = datetime.now(timezone.utc)
-        
-        await ctx.reply(embed=embed)
+            leaderboard_text = ""
+            for position, user_id, points, total_earned in leaderboard_rows:
+                user = self.bot.get_user(user_id)
+                name = user.name if user else f"Unknown user ({user_id})"
+                leaderboard_text += f"{position}. **{name}** - {points} aura\n"
+            
+            if leaderboard_text:
+                embed.add_field(name="Rankings", value=leaderboard_text[:1024], inline=False)
+            
+            # Add some stats
+            total_staff, total_points, total_earned = self.ranks.totals(guild_id)
+            if total_staff:
+                embed.add_field(name="Server Stats", value=f"Staff Members: {total_staff}\nTotal Points: {total_points}\nTotal Earned: {total_earned}", inline=True)
+            
+            ranked = self.ranks.count(guild_id)
+            pages = (ranked + LEADERBOARD_PAGE_SIZE - 1) // LEADERBOARD_PAGE_SIZE
+            if leaderboard_rows:
+                embed.set_footer(text=f"Showing {leaderboard_rows[0][0]}-{leaderboard_rows[-1][0]} of {ranked} staff members (page {page}/{pages})")
+            embed.timestamp = datetime.now(timezone.utc)
+            return embed
+        
+        paginator = KeysetPaginator(fetch, render, key=lambda row: (-row[2], -row[3], row[1]),
+                                    page_size=LEADERBOARD_PAGE_SIZE, author_id=ctx.author.id)
+        if not await paginator.start(ctx.reply):
+            await ctx.reply(" No staff members with points found!", ephemeral=True)
 
     @aura.command(name="top", description="Show top 3 staff members")
     async def top_staff(self, ctx: commands.Context):
         """Show top 3 staff members"""
         assert ctx.guild is not None
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("""
-                SELECT user_id, points, total_earned
-                FROM staff_points 
-                WHERE guild_id = ? AND points > 0
-                ORDER BY points DESC, total_earned DESC
-                LIMIT 3
-            """, (ctx.guild.id,)) as cursor:
-                top_staff = await cursor.fetchall()
+        top_staff = self.ranks.page(ctx.guild.id, 0, 3)
         
         if not top_staff:
             await ctx.reply(" No staff members with points found!", ephemeral=True)
@@ -392,8 +482,11 @@ class StaffPoints(commands.Cog):
         await ctx.reply(embed=embed)
 
     @aura.command(name="stats", description="Show detailed statistics for a staff member")
-    @app_commands.describe(member="The staff member to show stats for")
-    async def staff_stats(self, ctx: commands.Context, member: Optional[discord.Member] = None):
+    @app_commands.describe(
+        member="The staff member to show stats for",
+        days="Number of days of recent activity to include (default: 30)"
+    )
+    async def staff_stats(self, ctx: commands.Context, member: Optional[discord.Member] = None, days: int = 30):
         """Show detailed statistics for a staff member"""
         assert ctx.guild is not None
         assert isinstance(ctx.author, discord.Member)
@@ -404,35 +497,21 @@ class StaffPoints(commands.Cog):
             await ctx.reply(" This command is only for staff members!", ephemeral=True)
             return
         
-        async with aiosqlite.connect(self.db_path) as db:
-            # Get basic stats
-            async with db.execute("""
-                SELECT points, total_earned, total_spent, last_updated
-                FROM staff_points 
-                WHERE guild_id = ? AND user_id = ?
-            """, (ctx.guild.id, member.id)) as cursor:
-                basic_stats = await cursor.fetchone()
-            
-            # Get rank
-            async with db.execute("""
-                SELECT COUNT(*) + 1 as rank
-                FROM staff_points 
-                WHERE guild_id = ? AND points > (
-                    SELECT COALESCE(points, 0) FROM staff_points 
-                    WHERE guild_id = ? AND user_id = ?
-                )
-            """, (ctx.guild.id, ctx.guild.id, member.id)) as cursor:
-                rank_data = await cursor.fetchone()
-            
-            # Get activity stats (last 30 days)
-            thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-            async with db.execute("""
-                SELECT COUNT(*), SUM(points_change), action_type
-                FROM points_history 
-                WHERE guild_id = ? AND user_id = ? AND timestamp > ?
-                GROUP BY action_type
-            """, (ctx.guild.id, member.id, thirty_days_ago.isoformat())) as cursor:
-                activity_stats = await cursor.fetchall()
+        # Stats aggregate history totals, so write buffered awards first
+        await self.aura_buffer.flush()
+        
+        # Get basic stats
+        basic_stats = await self.db.fetchone("""
+            SELECT points, total_earned, total_spent, last_updated
+            FROM staff_points 
+            WHERE guild_id = ? AND user_id = ?
+        """, (ctx.guild.id, member.id))
+        
+        # Get activity stats from the daily rollup
+        if days < 1 or days > 3650:
+            days = 30
+        start_day = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
+        activity_stats = await activity_totals(self.db, ctx.guild.id, member.id, start_day)
         
         if not basic_stats:
             # Initialize user if not exists
@@ -440,7 +519,7 @@ class StaffPoints(commands.Cog):
             basic_stats = (0, 0, 0, datetime.now(timezone.utc).isoformat())
         
         points, total_earned, total_spent, last_updated = basic_stats
-        rank = rank_data[0] if rank_data else 1
+        rank = self.ranks.rank(ctx.guild.id, points)
         
         embed = discord.Embed(
             title=f" Staff Statistics - {member.display_name}",
@@ -470,7 +549,7 @@ class StaffPoints(commands.Cog):
         
         if recent_actions > 0:
             embed.add_field(
-                name="Last 30 Days",
+                name=f"Last {days} Days",
                 value=f" {recent_actions} actions\n {recent_earned} earned\n {recent_lost} lost",
                 inline=True
             )
@@ -640,28 +719,28 @@ class StaffPoints(commands.Cog):
     # Helper methods
     async def init_user(self, guild_id: int, user_id: int):
         """Initialize a user in the points system"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT OR IGNORE INTO staff_points (guild_id, user_id, points, total_earned, total_spent)
-                VALUES (?, ?, 0, 0, 0)
-            """, (guild_id, user_id))
-            await db.commit()
+        await self.db.execute("""
+            INSERT OR IGNORE INTO staff_points (guild_id, user_id, points, total_earned, total_spent)
+            VALUES (?, ?, 0, 0, 0)
+        """, (guild_id, user_id))
+        if self.ranks.get(guild_id, user_id) is None:
+            self.ranks.update(guild_id, user_id, 0, 0)
 
     async def get_user_points(self, guild_id: int, user_id: int) -> int:
         """Get a user's current points"""
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("""
-                SELECT points FROM staff_points 
-                WHERE guild_id = ? AND user_id = ?
-            """, (guild_id, user_id)) as cursor:
-                result = await cursor.fetchone()
-                return result[0] if result else 0
+        result = await self.db.fetchone("""
+            SELECT points FROM staff_points 
+            WHERE guild_id = ? AND user_id = ?
+        """, (guild_id, user_id))
+        return (result[0] if result else 0) + self.aura_buffer.pending(guild_id, user_id)
 
     async def modify_points(self, guild_id: int, user_id: int, points_change: int, moderator_id: int, reason: str, action_type: str):
         """Modify a user's points and log the change"""
+        # Earlier buffered awards must land before this change
+        await self.aura_buffer.flush()
         await self.init_user(guild_id, user_id)
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async def apply(db: aiosqlite.Connection):
             # Update points
             if points_change > 0:
                 await db.execute("""
@@ -678,18 +757,19 @@ class StaffPoints(commands.Cog):
                 """, (points_change, abs_change, guild_id, user_id))
             
             # Log the change
-            await db.execute("""
-                INSERT INTO points_history (guild_id, user_id, moderator_id, points_change, reason, action_type)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (guild_id, user_id, moderator_id, points_change, reason, action_type))
-            
-            await db.commit()
+            await record_history(db, [(guild_id, user_id, moderator_id, points_change, reason, action_type,
+                                       history_timestamp())])
+            return await self._read_standing(db, guild_id, user_id)
+        
+        self._set_standing(guild_id, user_id, *await self.db.transaction(apply))
 
     async def set_user_points(self, guild_id: int, user_id: int, points: int, moderator_id: int, reason: str):
         """Set a user's points to a specific amount"""
+        # Earlier buffered awards must land before the new value is set
+        await self.aura_buffer.flush()
         await self.init_user(guild_id, user_id)
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async def apply(db: aiosqlite.Connection):
             # Get current points to calculate the change
             async with db.execute("""
                 SELECT points FROM staff_points 
@@ -708,12 +788,11 @@ class StaffPoints(commands.Cog):
             """, (points, guild_id, user_id))
             
             # Log the change
-            await db.execute("""
-                INSERT INTO points_history (guild_id, user_id, moderator_id, points_change, reason, action_type)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (guild_id, user_id, moderator_id, points_change, reason, "set"))
-            
-            await db.commit()
+            await record_history(db, [(guild_id, user_id, moderator_id, points_change, reason, "set",
+                                       history_timestamp())])
+            return await self._read_standing(db, guild_id, user_id)
+        
+        self._set_standing(guild_id, user_id, *await self.db.transaction(apply))
 
     async def is_staff_member(self, member: discord.Member) -> bool:
         """Check if a member is considered staff"""
@@ -721,19 +800,8 @@ class StaffPoints(commands.Cog):
         if member.guild_permissions.administrator or member.guild_permissions.manage_guild:
             return True
         
-        # Check configured staff roles
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("""
-                SELECT staff_role_ids FROM staff_config 
-                WHERE guild_id = ?
-            """, (member.guild.id,)) as cursor:
-                result = await cursor.fetchone()
-        
-        if result and result[0]:
-            staff_role_ids = [int(rid) for rid in result[0].split(',') if rid.isdigit()]
-            return any(role.id in staff_role_ids for role in member.roles)
-        
-        return False
+        # Check configured staff roles (cached, no database access)
+        return self.staff_resolver.has_staff_role(POINTS, member)
 
     async def show_user_points(self, ctx: commands.Context, member: discord.Member):
         """Show a user's points information"""
@@ -744,16 +812,7 @@ class StaffPoints(commands.Cog):
             await ctx.reply(f" {member.display_name} has no points recorded.", ephemeral=True)
             return
         
-        # Get rank
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("""
-                SELECT COUNT(*) + 1 as rank
-                FROM staff_points 
-                WHERE guild_id = ? AND points > ?
-            """, (ctx.guild.id, points)) as cursor:
-                rank_data = await cursor.fetchone()
-        
-        rank = rank_data[0] if rank_data else 1
+        rank = self.ranks.rank(ctx.guild.id, points)
         
         embed = discord.Embed(
             title=f" {member.display_name}'s Points",
@@ -771,12 +830,10 @@ class StaffPoints(commands.Cog):
     async def log_points_change(self, guild: discord.Guild, member: discord.Member, points_change: int, moderator: discord.Member, reason: str, action_type: str):
         """Log points changes to the configured channel"""
         assert isinstance(moderator, discord.Member), "Moderator must be a guild member"
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("""
-                SELECT points_channel_id FROM staff_config 
-                WHERE guild_id = ?
-            """, (guild.id,)) as cursor:
-                result = await cursor.fetchone()
+        result = await self.db.fetchone("""
+            SELECT points_channel_id FROM staff_config 
+            WHERE guild_id = ?
+        """, (guild.id,))
         
         if not result or not result[0]:
             return
@@ -827,12 +884,10 @@ class StaffPoints(commands.Cog):
     async def show_config(self, ctx: commands.Context):
         """Show current configuration"""
         assert ctx.guild is not None
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("""
-                SELECT staff_role_ids, points_channel_id FROM staff_config 
-                WHERE guild_id = ?
-            """, (ctx.guild.id,)) as cursor:
-                result = await cursor.fetchone()
+        result = await self.db.fetchone("""
+            SELECT staff_role_ids, points_channel_id FROM staff_config 
+            WHERE guild_id = ?
+        """, (ctx.guild.id,))
         
         embed = discord.Embed(
             title=" Staff Points Configuration",
@@ -880,16 +935,15 @@ class StaffPoints(commands.Cog):
 
     async def set_config(self, guild_id: int, key: str, value):
         """Set a configuration value"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(f"""
-                INSERT OR REPLACE INTO staff_config (guild_id, {key})
-                VALUES (?, ?)
-            """, (guild_id, value))
-            await db.commit()
+        await self.db.execute(f"""
+            INSERT OR REPLACE INTO staff_config (guild_id, {key})
+            VALUES (?, ?)
+        """, (guild_id, value))
+        await self.refresh_staff_roles(guild_id)
 
     async def add_staff_role(self, guild_id: int, role_id: int):
         """Add a staff role to the configuration"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async def apply(db: aiosqlite.Connection):
             # Get current roles
             async with db.execute("""
                 SELECT staff_role_ids FROM staff_config 
@@ -911,7 +965,9 @@ class StaffPoints(commands.Cog):
                 INSERT OR REPLACE INTO staff_config (guild_id, staff_role_ids)
                 VALUES (?, ?)
             """, (guild_id, new_roles))
-            await db.commit()
+        
+        await self.db.transaction(apply)
+        await self.refresh_staff_roles(guild_id)
 
 
 
@@ -921,28 +977,12 @@ class StaffPoints(commands.Cog):
             return False
         if not self.bot.user:
             return False
+        guild_id, user_id = member.guild.id, member.id
         
-        # Add point to database
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT OR IGNORE INTO staff_points (guild_id, user_id, points, total_earned, last_updated)
-                VALUES (?, ?, 0, 0, datetime('now'))
-            """, (member.guild.id, member.id))
-            
-            await db.execute("""
-                UPDATE staff_points 
-                SET points = points + 1, total_earned = total_earned + 1, last_updated = datetime('now')
-                WHERE guild_id = ? AND user_id = ?
-            """, (member.guild.id, member.id))
-            
-            # Log the transaction
-            await db.execute("""
-                INSERT INTO points_history (guild_id, user_id, moderator_id, points_change, reason, action_type)
-                VALUES (?, ?, ?, 1, ?, 'auto_add')
-            """, (member.guild.id, member.id, self.bot.user.id, reason))
-            
-            await db.commit()
-        
+        # Journaled now, written with the next batch
+        self.aura_buffer.add(guild_id, user_id, self.bot.user.id, reason)
+        points, total_earned = self.ranks.get(guild_id, user_id) or (0, 0)
+        self.ranks.update(guild_id, user_id, points + 1, total_earned + 1)
         return True
 
 
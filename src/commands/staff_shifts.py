@@ -24,23 +24,82 @@ SOFTWARE.
 
 import asyncio
 import json
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple
 
 import aiosqlite
 import discord
 from discord.ext import commands
 from discord import app_commands
 
+from utils.db_pool import get_database
+from utils.paginator import KeysetPaginator
+from utils.scheduler import DeadlineScheduler
+from utils.staff_resolver import SHIFTS, get_staff_resolver
+
+# How often the in-memory active-shift index is checked against the database
+ACTIVE_SHIFT_RECONCILE_INTERVAL = 600
+
+
+def to_epoch(dt: datetime) -> int:
+    """Shift timestamps are stored as whole seconds since the Unix epoch"""
+    return int(dt.timestamp())
+
+
+def from_epoch(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, timezone.utc)
+
+
+DAY = 86400
+# Rollup periods: totals per user per UTC day and per ISO week (Monday 00:00 UTC)
+ROLLUP_DAY = "day"
+ROLLUP_WEEK = "week"
+
+# Shifts per page of shift admin history
+SHIFT_HISTORY_PAGE_SIZE = 10
+
+
+def day_bucket(ts: int) -> int:
+    return ts - ts % DAY
+
+
+def week_bucket(ts: int) -> int:
+    # The epoch fell on a Thursday, so day 4 is the first Monday
+    return day_bucket(ts) - ((ts // DAY + 3) % 7) * DAY
+
+
+# Gross and net (pauses excluded) seconds of completed shifts
+SHIFT_DUTY_SQL = """
+    SELECT s.guild_id, s.user_id, s.start,
+           s.end - s.start AS gross,
+           s.end - s.start - (SELECT COALESCE(SUM(p.end - p.start), 0) FROM shift_pauses p
+                              WHERE p.shift_id = s.shift_id AND p.end IS NOT NULL) AS net
+    FROM shifts s
+    WHERE s.end IS NOT NULL {filter}
+"""
+
+ROLLUP_UPSERT_SQL = """
+    INSERT INTO shift_rollups (guild_id, user_id, period, bucket, shifts, gross_seconds, net_seconds)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (guild_id, period, bucket, user_id) DO UPDATE SET
+        shifts = shifts + excluded.shifts,
+        gross_seconds = gross_seconds + excluded.gross_seconds,
+        net_seconds = net_seconds + excluded.net_seconds
+"""
+
 
 @dataclass
 class Settings:
     guild_id: int
     log_channel_id: Optional[int]
     staff_role_ids: list[int]
+    # Auto-end limits; None disables
+    max_shift_hours: Optional[int] = None
+    pause_timeout_minutes: Optional[int] = None
 
 @dataclass
 class Shift:
@@ -53,21 +112,55 @@ class Shift:
     end_note: str | None = None
     paused: bool = False
     pause_time: datetime | None = None
+    # Closed pauses; kept in shift_pauses and only loaded for open shifts
     pause_intervals: list[tuple[datetime, datetime]] = field(default_factory=list)
     
     @classmethod
     def new(cls, guild_id: int, user_id: int, start: datetime, start_note: str | None = None):
         return cls(None, guild_id, user_id, start, None, start_note, None, False, None, [])
 
+    def copy(self) -> "Shift":
+        return replace(self, pause_intervals=list(self.pause_intervals))
+
+    def duty_seconds(self) -> int:
+        """Seconds on duty: start to end (or now), less closed and current pauses"""
+        end = self.end or datetime.now(timezone.utc)
+        seconds = (end - self.start).total_seconds()
+        seconds -= sum((b - a).total_seconds() for a, b in self.pause_intervals)
+        if self.paused and self.pause_time:
+            seconds -= max(0.0, (end - self.pause_time).total_seconds())
+        return max(0, int(seconds))
+
     @classmethod
     def from_row(cls, row):
         shift_id, guild_id, user_id, start, end, start_note, end_note, paused, pause_time, pause_intervals = row
+        if type(start) is not int:
+            return cls._from_legacy_row(row)
+        # Epoch columns: no string parsing, one C call per timestamp
+        fromtimestamp, utc = datetime.fromtimestamp, timezone.utc
+        intervals = []
+        if pause_intervals and pause_intervals != '[]':
+            intervals = [(fromtimestamp(a, utc), fromtimestamp(b, utc)) for a, b in json.loads(pause_intervals)]
+        return cls(
+            shift_id, guild_id, user_id, fromtimestamp(start, utc),
+            fromtimestamp(end, utc) if end is not None else None,
+            start_note, end_note, bool(paused),
+            fromtimestamp(pause_time, utc) if pause_time is not None else None,
+            intervals,
+        )
+
+    @classmethod
+    def _from_legacy_row(cls, row):
+        """Decode a row written before the epoch migration (ISO strings)"""
+        shift_id, guild_id, user_id, start, end, start_note, end_note, paused, pause_time, pause_intervals = row
         
         # Convert string datetimes back to datetime objects if needed
         def parse_datetime(dt_value, default_time=None):
             """Helper function to safely parse datetime values"""
             if isinstance(dt_value, datetime):
                 return dt_value
+            elif isinstance(dt_value, int):
+                return from_epoch(dt_value)
             elif isinstance(dt_value, str) and dt_value:
                 try:
                     # Handle various datetime string formats from SQLite
@@ -122,21 +215,21 @@ class EmbedProvider(ABC):
         self.bot = bot
     
     @abstractmethod
-    async def get_shift_start_embed(self, ctx: commands.Context, shift: Shift) -> discord.Embed:
+    async def get_shift_start_embed(self, member: discord.abc.User, shift: Shift) -> discord.Embed:
         """
         Returns an embed containing information about the start of a shift.
         """
         ...
     
     @abstractmethod
-    async def get_shift_end_embed(self, ctx: commands.Context, shift: Shift) -> discord.Embed:
+    async def get_shift_end_embed(self, member: discord.abc.User, shift: Shift) -> discord.Embed:
         """
         Returns an embed containing information about the end of a shift.
         """
         ...
 
     @abstractmethod
-    async def get_shift_discard_embed(self, ctx: commands.Context, shift: Shift) -> discord.Embed:
+    async def get_shift_discard_embed(self, member: discord.abc.User, shift: Shift) -> discord.Embed:
         """
         Returns an embed containing information about discarding a shift.
         """
@@ -147,12 +240,16 @@ class LogEmbedProvider(EmbedProvider):
         super().__init__(bot)
     
     def safe_timestamp(self, dt) -> int:
-        """Safely get timestamp from datetime object or string"""
+        """Safely get timestamp from datetime object, epoch seconds or string"""
         try:
             # If it's already a datetime object, use it directly
             if isinstance(dt, datetime):
                 return round(dt.timestamp())
             
+            # Epoch seconds, as stored in the shifts table
+            elif isinstance(dt, int):
+                return dt
+            
             # If it's a string, try to parse it
             elif isinstance(dt, str):
                 # Handle common datetime string formats
@@ -195,19 +292,19 @@ class LogEmbedProvider(EmbedProvider):
             print(f"Error in safe_timestamp: {e}, input: {dt}, type: {type(dt)}")
             return round(datetime.now(timezone.utc).timestamp())
     
-    async def get_shift_start_embed(self, ctx: commands.Context, shift: Shift):
-        embed=discord.Embed(title="Shift Started", description=f"{ctx.author.mention} has just started their shift.", color=0x00ff00)
-        embed.set_author(name=ctx.author.name, icon_url=ctx.author.display_avatar.url)
-        embed.set_thumbnail(url=ctx.author.display_avatar.url)
+    async def get_shift_start_embed(self, member: discord.abc.User, shift: Shift):
+        embed=discord.Embed(title="Shift Started", description=f"{member.mention} has just started their shift.", color=0x00ff00)
+        embed.set_author(name=member.name, icon_url=member.display_avatar.url)
+        embed.set_thumbnail(url=member.display_avatar.url)
         embed.add_field(name="Start Time", value=f"<t:{self.safe_timestamp(shift.start)}:F>", inline=False)
         if shift.start_note is not None:
             embed.add_field(name="Start Note", value=f"```\n{shift.start_note}\n```", inline=False)
         return embed
 
-    async def get_shift_end_embed(self, ctx: commands.Context, shift: Shift):
-        embed=discord.Embed(title="Shift Ended", description=f"{ctx.author.mention} has just ended their shift.", color=0xff0000)
-        embed.set_author(name=ctx.author.name, icon_url=ctx.author.display_avatar.url)
-        embed.set_thumbnail(url=ctx.author.display_avatar.url)
+    async def get_shift_end_embed(self, member: discord.abc.User, shift: Shift):
+        embed=discord.Embed(title="Shift Ended", description=f"{member.mention} has just ended their shift.", color=0xff0000)
+        embed.set_author(name=member.name, icon_url=member.display_avatar.url)
+        embed.set_thumbnail(url=member.display_avatar.url)
         embed.add_field(name="Start Time", value=f"<t:{self.safe_timestamp(shift.start)}:F>", inline=True)
         if shift.end:
             embed.add_field(name="End Time", value=f"<t:{self.safe_timestamp(shift.end)}:F>", inline=True)
@@ -217,10 +314,10 @@ class LogEmbedProvider(EmbedProvider):
             embed.add_field(name="End Note", value=f"```\n{shift.end_note}\n```", inline=False)
         return embed
     
-    async def get_shift_discard_embed(self, ctx: commands.Context, shift: Shift):
-        embed=discord.Embed(title="Shift Discarded", description=f"{ctx.author.mention} has just discarded their shift.", color=0xFFFF00)
-        embed.set_author(name=ctx.author.name, icon_url=ctx.author.display_avatar.url)
-        embed.set_thumbnail(url=ctx.author.display_avatar.url)
+    async def get_shift_discard_embed(self, member: discord.abc.User, shift: Shift):
+        embed=discord.Embed(title="Shift Discarded", description=f"{member.mention} has just discarded their shift.", color=0xFFFF00)
+        embed.set_author(name=member.name, icon_url=member.display_avatar.url)
+        embed.set_thumbnail(url=member.display_avatar.url)
         embed.add_field(name="Start Time", value=f"<t:{self.safe_timestamp(shift.start)}:F>", inline=True)
         if shift.start_note is not None:
             embed.add_field(name="Start Note", value=f"```\n{shift.start_note}\n```", inline=False)
@@ -233,237 +330,493 @@ class ShiftService:
         if not self.database_path.exists():
             self.database_path.parent.mkdir(parents=True, exist_ok=True)
             self.database_path.touch()
+        self.db = get_database(self.database_path)
+        # Write-through index of open shifts, keyed by (guild_id, user_id).
+        # None until load_active_shifts() has run; lookups fall back to SQL.
+        self._active: Optional[Dict[Tuple[int, int], Shift]] = None
+        # Bumped on every index write, so a reconcile can tell its read went stale
+        self._index_generation = 0
+        # Auto-end limits per guild: (max_shift_hours, pause_timeout_minutes)
+        self._limits: Dict[int, Tuple[Optional[int], Optional[int]]] = {}
+        # Called with (guild_id, user_id) after a user's open shift changes
+        self.on_shift_change: Optional[Callable[[int, int], None]] = None
+
+    def _changed(self, shift: Shift) -> None:
+        self._index_generation += 1
+        if self.on_shift_change is not None:
+            self.on_shift_change(shift.guild_id, shift.user_id)
+
+    async def _fetch_active_shifts(self) -> Dict[Tuple[int, int], Shift]:
+        rows = await self.db.fetchall("SELECT * FROM shifts WHERE end IS NULL")
+        active: Dict[Tuple[int, int], Shift] = {}
+        for row in rows:
+            shift = Shift.from_row(row)
+            key = (shift.guild_id, shift.user_id)
+            # Keep the newest if a user somehow has more than one open shift
+            if key not in active or (shift.shift_id or 0) > (active[key].shift_id or 0):
+                active[key] = shift
+        await self._load_pauses(list(active.values()))
+        return active
+
+    async def _load_pauses(self, shifts: list[Shift]) -> None:
+        """Fill in pause_intervals from shift_pauses for open shifts"""
+        by_id = {shift.shift_id: shift for shift in shifts}
+        if not by_id:
+            return
+        rows = await self.db.fetchall(
+            """SELECT p.shift_id, p.start, p.end FROM shift_pauses p
+               JOIN shifts s ON s.shift_id = p.shift_id
+               WHERE s.end IS NULL AND p.end IS NOT NULL
+               ORDER BY p.pause_id"""
+        )
+        for shift_id, start, end in rows:
+            shift = by_id.get(shift_id)
+            if shift is not None:
+                shift.pause_intervals.append((from_epoch(start), from_epoch(end)))
+
+    async def load_active_shifts(self) -> None:
+        """Warm the active-shift index from the database"""
+        self._active = await self._fetch_active_shifts()
+
+    async def reconcile_active_shifts(self) -> int:
+        """Rebuild the index from the database and return how many entries differed"""
+        generation = self._index_generation
+        fresh = await self._fetch_active_shifts()
+        if self._index_generation != generation:
+            # A shift changed while we were reading; the snapshot may predate it,
+            # so keep the write-through index and check again next time
+            return 0
+        current = self._active or {}
+        drift = sum(1 for key in fresh.keys() | current.keys() if fresh.get(key) != current.get(key))
+        self._active = fresh
+        return drift
 
     async def init_db(self):
         """
         Initializes the database for this cog.
         """
-        async with aiosqlite.connect(self.database_path) as db:
-            # The order of rows in the table and fields in the Shift data class **must** match
-            await db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS shifts (
-                    shift_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER NOT NULL,
-                    user_id INTEGER NOT NULL,
-                    start DATETIME NOT NULL,
-                    end DATETIME DEFAULT NULL,
-                    start_note TEXT DEFAULT NULL,
-                    end_note TEXT DEFAULT NULL,
-                    paused BOOLEAN DEFAULT 0,
-                    pause_time DATETIME DEFAULT NULL,
-                    pause_intervals TEXT DEFAULT '[]'
-                )
+        # The order of rows in the table and fields in the Shift data class **must** match
+        await self.db.execute(
             """
+            CREATE TABLE IF NOT EXISTS shifts (
+                shift_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                start INTEGER NOT NULL,
+                end INTEGER DEFAULT NULL,
+                start_note TEXT DEFAULT NULL,
+                end_note TEXT DEFAULT NULL,
+                paused BOOLEAN DEFAULT 0,
+                pause_time INTEGER DEFAULT NULL,
+                pause_intervals TEXT DEFAULT '[]'
             )
-            await db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS shift_settings (
-                    guild_id INTEGER PRIMARY KEY,
-                    log_channel_id INTEGER DEFAULT NULL,
-                    staff_role_ids TEXT DEFAULT '[]'
-                )
+        """
+        )
+        # History/stats filter on (guild_id[, user_id], start); open shifts on end IS NULL
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_shifts_guild_start ON shifts(guild_id, start)")
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_shifts_guild_user_start ON shifts(guild_id, user_id, start)")
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_shifts_open ON shifts(guild_id, user_id) WHERE end IS NULL")
+        # One row per pause; end is NULL while the pause is ongoing
+        await self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS shift_pauses (
+                pause_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                shift_id INTEGER NOT NULL,
+                start INTEGER NOT NULL,
+                end INTEGER DEFAULT NULL
+            )
+        """
+        )
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_shift_pauses_shift ON shift_pauses(shift_id, end)")
+        # Completed-shift totals per user and day/week, keyed by the day/week the shift started
+        await self.db.execute(
             """
+            CREATE TABLE IF NOT EXISTS shift_rollups (
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                period TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                shifts INTEGER NOT NULL DEFAULT 0,
+                gross_seconds INTEGER NOT NULL DEFAULT 0,
+                net_seconds INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, period, bucket, user_id)
             )
-            await db.commit()
+        """
+        )
+        await self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS shift_settings (
+                guild_id INTEGER PRIMARY KEY,
+                log_channel_id INTEGER DEFAULT NULL,
+                staff_role_ids TEXT DEFAULT '[]',
+                max_shift_hours INTEGER DEFAULT NULL,
+                pause_timeout_minutes INTEGER DEFAULT NULL
+            )
+        """
+        )
+        columns = {row[1] for row in await self.db.fetchall("PRAGMA table_info(shift_settings)")}
+        for column in ("max_shift_hours", "pause_timeout_minutes"):
+            if column not in columns:
+                await self.db.execute(f"ALTER TABLE shift_settings ADD COLUMN {column} INTEGER DEFAULT NULL")
 
     async def drop_db(self):
         """
         Drops all tables owned by this cog.
         """
-        async with aiosqlite.connect(self.database_path) as db:
+        async def drop(db: aiosqlite.Connection):
             await db.execute("DROP TABLE IF EXISTS shifts")
+            await db.execute("DROP TABLE IF EXISTS shift_pauses")
+            await db.execute("DROP TABLE IF EXISTS shift_rollups")
             await db.execute("DROP TABLE IF EXISTS shift_settings")
-            await db.commit()
+        await self.db.transaction(drop)
+        get_staff_resolver().invalidate(SHIFTS)
+        self._limits.clear()
+        if self._active is not None:
+            self._active.clear()
+        self._index_generation += 1
     
     async def get_shift(self, guild_id: int, user_id: int) -> Shift | None:
         """Finds the last unfinished shift for a user (or returns None)"""
-        async with aiosqlite.connect(self.database_path) as db:
-            cursor = await db.execute(
-                "SELECT * FROM shifts WHERE user_id = ? AND guild_id = ? AND end IS NULL",
-                (user_id, guild_id),
-            )
-            row = await cursor.fetchone()
-            if row:
-                return Shift.from_row(row)
-            return None
+        if self._active is not None:
+            shift = self._active.get((guild_id, user_id))
+            # Hand out a copy so callers can fill in end/end_note before end_shift()
+            return shift.copy() if shift else None
+        row = await self.db.fetchone(
+            "SELECT * FROM shifts WHERE user_id = ? AND guild_id = ? AND end IS NULL",
+            (user_id, guild_id),
+        )
+        if row:
+            shift = Shift.from_row(row)
+            await self._load_pauses([shift])
+            return shift
+        return None
     
     async def start_shift(self, shift: Shift) -> None:
         """Adds a shift to the database"""
-        async with aiosqlite.connect(self.database_path) as db:
-            await db.execute(
-                "INSERT INTO shifts (guild_id, user_id, start, start_note, paused, pause_time, pause_intervals) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (shift.guild_id, shift.user_id, shift.start.isoformat(), shift.start_note, int(shift.paused), shift.pause_time.isoformat() if shift.pause_time else None, json.dumps(shift.pause_intervals or [])),
-            )
-            await db.commit()
+        # The table keeps whole seconds; match it so the index agrees with the database
+        shift.start = shift.start.replace(microsecond=0)
+        shift.shift_id = await self.db.execute(
+            "INSERT INTO shifts (guild_id, user_id, start, start_note) VALUES (?, ?, ?, ?)",
+            (shift.guild_id, shift.user_id, to_epoch(shift.start), shift.start_note),
+        )
+        if self._active is not None:
+            self._active[(shift.guild_id, shift.user_id)] = shift.copy()
+        self._changed(shift)
+
     async def pause_shift(self, shift: Shift) -> None:
         """Pause a shift in the database"""
-        async with aiosqlite.connect(self.database_path) as db:
+        pause_time = datetime.now(timezone.utc).replace(microsecond=0)
+        async def pause(db: aiosqlite.Connection):
             await db.execute(
                 "UPDATE shifts SET paused = 1, pause_time = ? WHERE shift_id = ?",
-                (datetime.now(timezone.utc).isoformat(), shift.shift_id),
+                (to_epoch(pause_time), shift.shift_id),
             )
-            await db.commit()
+            await db.execute(
+                "INSERT INTO shift_pauses (shift_id, start) VALUES (?, ?)",
+                (shift.shift_id, to_epoch(pause_time)),
+            )
+        await self.db.transaction(pause)
+        indexed = self._indexed(shift)
+        if indexed:
+            indexed.paused = True
+            indexed.pause_time = pause_time
+        self._changed(shift)
 
     async def resume_shift(self, shift: Shift) -> None:
         """Resume a paused shift, record interval"""
-        async with aiosqlite.connect(self.database_path) as db:
-            # Load previous intervals
-            cursor = await db.execute("SELECT pause_intervals, pause_time FROM shifts WHERE shift_id = ?", (shift.shift_id,))
-            row = await cursor.fetchone()
+        resume_time = to_epoch(datetime.now(timezone.utc))
+        async def resume(db: aiosqlite.Connection):
+            async with db.execute("SELECT pause_time FROM shifts WHERE shift_id = ?", (shift.shift_id,)) as cursor:
+                row = await cursor.fetchone()
             if not row:
                 # This case should ideally not be reached if the shift object is valid
                 # but as a safeguard, we stop here.
-                return
-            intervals = json.loads(row[0]) if row[0] else []
-            pause_start = row[1]
-            if pause_start:
-                intervals.append((pause_start, datetime.now(timezone.utc).isoformat()))
-            await db.execute(
-                "UPDATE shifts SET paused = 0, pause_time = NULL, pause_intervals = ? WHERE shift_id = ?",
-                (json.dumps(intervals), shift.shift_id),
+                return None
+            pause_start = row[0]
+            cursor = await db.execute(
+                "UPDATE shift_pauses SET end = ? WHERE shift_id = ? AND end IS NULL",
+                (resume_time, shift.shift_id),
             )
-            await db.commit()
+            if cursor.rowcount == 0 and pause_start is not None:
+                # Paused before pauses had their own table
+                await db.execute(
+                    "INSERT INTO shift_pauses (shift_id, start, end) VALUES (?, ?, ?)",
+                    (shift.shift_id, pause_start, resume_time),
+                )
+            await db.execute("UPDATE shifts SET paused = 0, pause_time = NULL WHERE shift_id = ?", (shift.shift_id,))
+            return pause_start
+        pause_start = await self.db.transaction(resume)
+        indexed = self._indexed(shift)
+        if indexed:
+            indexed.paused = False
+            indexed.pause_time = None
+            if pause_start is not None:
+                indexed.pause_intervals.append((from_epoch(pause_start), from_epoch(resume_time)))
+        self._changed(shift)
     
     async def end_shift(self, shift: Shift) -> None:
         """Updates a shift in the database"""
-        async with aiosqlite.connect(self.database_path) as db:
-            end_time = shift.end.isoformat() if shift.end else None
+        end_time = to_epoch(shift.end) if shift.end else None
+        async def end(db: aiosqlite.Connection):
+            # Re-ending an ended shift replaces its rollup contribution
+            await self._rollup_shift(db, shift.shift_id, -1)
             await db.execute(
                 "UPDATE shifts SET end = ?, end_note = ? WHERE shift_id = ?",
                 (end_time, shift.end_note, shift.shift_id),
             )
-            await db.commit()
+            if end_time is not None:
+                # Ending while paused closes the pause at the end of the shift
+                await db.execute(
+                    "UPDATE shift_pauses SET end = ? WHERE shift_id = ? AND end IS NULL",
+                    (end_time, shift.shift_id),
+                )
+                await self._rollup_shift(db, shift.shift_id, 1)
+        await self.db.transaction(end)
+        if shift.end is not None:
+            self._unindex(shift)
+            self._changed(shift)
     
     async def discard_shift(self, shift: Shift) -> None:
         """Removes a shift from the database"""
-        async with aiosqlite.connect(self.database_path) as db:
+        async def discard(db: aiosqlite.Connection):
+            await self._rollup_shift(db, shift.shift_id, -1)
+            await db.execute("DELETE FROM shift_pauses WHERE shift_id = ?", (shift.shift_id,))
             await db.execute("DELETE FROM shifts WHERE shift_id = ?", (shift.shift_id,))
-            await db.commit()
+        await self.db.transaction(discard)
+        self._unindex(shift)
+        self._changed(shift)
     
-    async def get_active_shifts(self, guild_id: int) -> list[Shift]:
-        """Get all currently active shifts in the guild"""
-        async with aiosqlite.connect(self.database_path) as db:
-            cursor = await db.execute(
-                "SELECT * FROM shifts WHERE guild_id = ? AND end IS NULL ORDER BY start DESC",
-                (guild_id,)
-            )
-            rows = await cursor.fetchall()
-            shifts = []
-            for row in rows:
-                shifts.append(Shift.from_row(row))
-            return shifts
+    @staticmethod
+    async def _rollup_shift(db: aiosqlite.Connection, shift_id: Optional[int], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a completed shift's totals in shift_rollups"""
+        async with db.execute(SHIFT_DUTY_SQL.format(filter="AND s.shift_id = ?"), (shift_id,)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return
+        guild_id, user_id, start, gross, net = row
+        await db.executemany(ROLLUP_UPSERT_SQL, [
+            (guild_id, user_id, ROLLUP_DAY, day_bucket(start), sign, sign * gross, sign * net),
+            (guild_id, user_id, ROLLUP_WEEK, week_bucket(start), sign, sign * gross, sign * net),
+        ])
+        if sign < 0:
+            await db.execute("DELETE FROM shift_rollups WHERE guild_id = ? AND user_id = ? AND shifts <= 0", (guild_id, user_id))
     
-    async def get_shift_history(self, guild_id: int, user_id: Optional[int] = None, days: int = 30, limit: int = 50) -> list[Shift]:
-        """Get shift history with optional filtering"""
-        async with aiosqlite.connect(self.database_path) as db:
-            if user_id:
-                cursor = await db.execute(
-                    """SELECT * FROM shifts WHERE guild_id = ? AND user_id = ? 
-                       AND start >= datetime('now', '-{} days') 
-                       ORDER BY start DESC LIMIT ?""".format(days),
-                    (guild_id, user_id, limit)
-                )
+    async def has_rollups(self) -> bool:
+        return await self.db.fetchone("SELECT 1 FROM shift_rollups LIMIT 1") is not None
+    
+    async def backfill_rollups(self, guild_id: Optional[int] = None) -> int:
+        """Rebuild shift_rollups from shift history (one guild or all). Returns shifts counted."""
+        where, params = ("AND s.guild_id = ?", (guild_id,)) if guild_id else ("", ())
+        duty = SHIFT_DUTY_SQL.format(filter=where)
+        async def backfill(db: aiosqlite.Connection):
+            if guild_id:
+                await db.execute("DELETE FROM shift_rollups WHERE guild_id = ?", (guild_id,))
             else:
-                cursor = await db.execute(
-                    """SELECT * FROM shifts WHERE guild_id = ? 
-                       AND start >= datetime('now', '-{} days') 
-                       ORDER BY start DESC LIMIT ?""".format(days),
-                    (guild_id, limit)
+                await db.execute("DELETE FROM shift_rollups")
+            for period, bucket in (
+                (ROLLUP_DAY, f"start - start % {DAY}"),
+                (ROLLUP_WEEK, f"start - start % {DAY} - ((start / {DAY} + 3) % 7) * {DAY}"),
+            ):
+                await db.execute(
+                    f"""INSERT INTO shift_rollups (guild_id, user_id, period, bucket, shifts, gross_seconds, net_seconds)
+                        SELECT guild_id, user_id, ?, {bucket}, COUNT(*), SUM(gross), SUM(net)
+                        FROM ({duty})
+                        GROUP BY guild_id, user_id, {bucket}""",
+                    (period,) + params,
                 )
-            rows = await cursor.fetchall()
-            shifts = []
-            for row in rows:
-                shifts.append(Shift.from_row(row))
+            async with db.execute(
+                "SELECT COALESCE(SUM(shifts), 0) FROM shift_rollups WHERE period = ?" + (" AND guild_id = ?" if guild_id else ""),
+                (ROLLUP_DAY,) + params,
+            ) as cursor:
+                return (await cursor.fetchone())[0]
+        return await self.db.transaction(backfill)
+    
+    def _indexed(self, shift: Shift) -> Shift | None:
+        """The index entry for this shift, if it is the user's open shift"""
+        if self._active is None:
+            return None
+        indexed = self._active.get((shift.guild_id, shift.user_id))
+        if indexed and indexed.shift_id == shift.shift_id:
+            return indexed
+        return None
+    
+    def peek_active(self, guild_id: int, user_id: int) -> Shift | None:
+        """The indexed open shift itself (not a copy); do not modify it"""
+        return self._active.get((guild_id, user_id)) if self._active is not None else None
+    
+    def active_keys(self) -> list[Tuple[int, int]]:
+        return list(self._active or {})
+    
+    def auto_end_deadline(self, shift: Shift) -> Optional[Tuple[int, str]]:
+        """When (epoch seconds) and why an open shift should be auto-ended, if ever"""
+        max_hours, pause_minutes = self._limits.get(shift.guild_id, (None, None))
+        deadlines = []
+        if max_hours:
+            deadlines.append((to_epoch(shift.start) + max_hours * 3600, f"longer than the {max_hours}h maximum shift length"))
+        if pause_minutes and shift.paused and shift.pause_time:
+            deadlines.append((to_epoch(shift.pause_time) + pause_minutes * 60, f"paused for more than {pause_minutes} minute(s)"))
+        return min(deadlines) if deadlines else None
+    
+    def _unindex(self, shift: Shift) -> None:
+        if self._indexed(shift):
+            del self._active[(shift.guild_id, shift.user_id)]  # type: ignore[index]
+    
+    async def get_active_shifts(self, guild_id: int) -> list[Shift]:
+        """Get all currently active shifts in the guild"""
+        if self._active is not None:
+            shifts = [shift.copy() for (gid, _), shift in self._active.items() if gid == guild_id]
+            shifts.sort(key=lambda shift: shift.start, reverse=True)
             return shifts
+        rows = await self.db.fetchall(
+            "SELECT * FROM shifts WHERE guild_id = ? AND end IS NULL ORDER BY start DESC",
+            (guild_id,)
+        )
+        shifts = []
+        for row in rows:
+            shifts.append(Shift.from_row(row))
+        await self._load_pauses(shifts)
+        return shifts
+    
+    async def get_shift_history(self, guild_id: int, user_id: Optional[int] = None, days: int = 30, limit: int = 50,
+                                before: Optional[Tuple[int, int]] = None) -> list[Shift]:
+        """Get shift history with optional filtering, newest first; ``before`` is a (start, shift_id) keyset cursor"""
+        clauses = ["guild_id = ?", "start >= ?"]
+        params: list = [guild_id, self._cutoff(days)]
+        if user_id:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if before is not None:
+            clauses.append("(start, shift_id) < (?, ?)")
+            params.extend(before)
+        rows = await self.db.fetchall(
+            f"SELECT * FROM shifts WHERE {' AND '.join(clauses)} ORDER BY start DESC, shift_id DESC LIMIT ?",
+            (*params, limit)
+        )
+        shifts = []
+        for row in rows:
+            shifts.append(Shift.from_row(row))
+        return shifts
+    
+    @staticmethod
+    def _cutoff(days: int) -> int:
+        """Epoch second ``days`` days ago, for range scans on start"""
+        return to_epoch(datetime.now(timezone.utc)) - days * 86400
+    
+    async def _duty_totals(self, guild_id: int, days: int, user_id: Optional[int] = None) -> Dict[int, list[int]]:
+        """
+        Per-user [shifts, ongoing, gross_seconds, net_seconds] for the last ``days``
+        days (whole UTC days), read from the rollups plus the open shifts.
+        """
+        since = day_bucket(self._cutoff(days))
+        # Whole weeks come from the weekly rollup, the days before them from the daily one
+        first_week = week_bucket(since)
+        if first_week < since:
+            first_week += 7 * DAY
+        params: tuple = (guild_id, since, first_week, first_week)
+        user_filter = ""
+        if user_id:
+            user_filter = "AND user_id = ?"
+            params += (user_id,)
+        rows = await self.db.fetchall(
+            f"""SELECT user_id, SUM(shifts), SUM(gross_seconds), SUM(net_seconds)
+                FROM shift_rollups
+                WHERE guild_id = ? AND (
+                    (period = '{ROLLUP_DAY}' AND bucket >= ? AND bucket < ?)
+                    OR (period = '{ROLLUP_WEEK}' AND bucket >= ?)
+                ) {user_filter}
+                GROUP BY user_id""",
+            params
+        )
+        totals = {row[0]: [row[1], 0, row[2], row[3]] for row in rows}
+        for shift in await self.get_active_shifts(guild_id):
+            if (user_id and shift.user_id != user_id) or to_epoch(shift.start) < since:
+                continue
+            entry = totals.setdefault(shift.user_id, [0, 0, 0, 0])
+            entry[0] += 1
+            entry[1] += 1
+        return totals
     
     async def get_shift_stats(self, guild_id: int, user_id: Optional[int] = None, days: int = 30):
-        """Get shift statistics"""
-        async with aiosqlite.connect(self.database_path) as db:
-            if user_id:
-                # Individual user stats
-                cursor = await db.execute(
-                    """SELECT 
-                        COUNT(*) as total_shifts,
-                        COUNT(CASE WHEN end IS NOT NULL THEN 1 END) as completed_shifts,
-                        COALESCE(SUM(
-                            CASE WHEN end IS NOT NULL 
-                            THEN (julianday(end) - julianday(start)) * 24 * 60 * 60 
-                            END
-                        ), 0) as total_seconds,
-                        COALESCE(AVG(
-                            CASE WHEN end IS NOT NULL 
-                            THEN (julianday(end) - julianday(start)) * 24 * 60 * 60 
-                            END
-                        ), 0) as avg_seconds
-                    FROM shifts 
-                    WHERE guild_id = ? AND user_id = ? 
-                    AND start >= datetime('now', '-{} days')""".format(days),
-                    (guild_id, user_id)
-                )
-            else:
-                # Server-wide stats
-                cursor = await db.execute(
-                    """SELECT 
-                        COUNT(*) as total_shifts,
-                        COUNT(CASE WHEN end IS NOT NULL THEN 1 END) as completed_shifts,
-                        COUNT(DISTINCT user_id) as unique_staff,
-                        COALESCE(SUM(
-                            CASE WHEN end IS NOT NULL 
-                            THEN (julianday(end) - julianday(start)) * 24 * 60 * 60 
-                            END
-                        ), 0) as total_seconds,
-                        COALESCE(AVG(
-                            CASE WHEN end IS NOT NULL 
-                            THEN (julianday(end) - julianday(start)) * 24 * 60 * 60 
-                            END
-                        ), 0) as avg_seconds
-                    FROM shifts 
-                    WHERE guild_id = ? 
-                    AND start >= datetime('now', '-{} days')""".format(days),
-                    (guild_id,)
-                )
-            row = await cursor.fetchone()
-            return row
+        """
+        Get shift statistics from the duty rollups:
+        (total_shifts, completed_shifts, unique_staff, total_seconds, avg_seconds, paused_seconds).
+        Durations are net on-duty seconds of completed shifts (pauses excluded).
+        """
+        totals = await self._duty_totals(guild_id, days, user_id)
+        total_shifts = sum(entry[0] for entry in totals.values())
+        completed = total_shifts - sum(entry[1] for entry in totals.values())
+        gross = sum(entry[2] for entry in totals.values())
+        net = sum(entry[3] for entry in totals.values())
+        return (total_shifts, completed, len(totals), net, net / completed if completed else 0, gross - net)
     
-    async def force_end_shift(self, guild_id: int, user_id: int, end_note: Optional[str] = None) -> Shift | None:
-        """Force end a user's active shift (admin function)"""
+    async def get_duty_summary(self, guild_id: int, days: int = 7) -> list[tuple[int, int, int, int]]:
+        """Per-user (user_id, shifts, ongoing, net_seconds), most on-duty time first"""
+        totals = await self._duty_totals(guild_id, days)
+        summary = [(user_id, entry[0], entry[1], entry[3]) for user_id, entry in totals.items()]
+        summary.sort(key=lambda row: row[3], reverse=True)
+        return summary
+    
+    async def force_end_shift(self, guild_id: int, user_id: int, end_note: Optional[str] = None,
+                              end: Optional[datetime] = None) -> Shift | None:
+        """Force end a user's active shift (admin function), now or at ``end``"""
         shift = await self.get_shift(guild_id, user_id)
         if shift:
-            shift.end = datetime.now(timezone.utc)
+            shift.end = max(end, shift.start) if end else datetime.now(timezone.utc)
             shift.end_note = end_note
             await self.end_shift(shift)
             return shift
         return None
     
     async def get_settings(self, guild_id: int) -> Settings:
-        async with aiosqlite.connect(self.database_path) as db:
-            cursor = await db.execute(
-                "SELECT * FROM shift_settings WHERE guild_id = ?", (guild_id,)
-            )
-            row = await cursor.fetchone()
-            if row:
-                s = Settings(*row)
-                s.staff_role_ids = json.loads(s.staff_role_ids or "[]") # type: ignore
-                return s
-            else:
-                await self.create_default_settings(guild_id)
-                return Settings(guild_id, None, [])
+        row = await self.db.fetchone(
+            "SELECT * FROM shift_settings WHERE guild_id = ?", (guild_id,)
+        )
+        if row:
+            s = Settings(*row)
+            s.staff_role_ids = json.loads(s.staff_role_ids or "[]") # type: ignore
+            return s
+        else:
+            await self.create_default_settings(guild_id)
+            return Settings(guild_id, None, [])
     
     async def create_default_settings(self, guild_id: int) -> None:
-        async with aiosqlite.connect(self.database_path) as db:
-            await db.execute(
-                "INSERT INTO shift_settings (guild_id, log_channel_id, staff_role_ids) VALUES (?, ?, ?)", (guild_id, None, json.dumps([]))
-            )
-            await db.commit()
+        await self.db.execute(
+            "INSERT OR IGNORE INTO shift_settings (guild_id, log_channel_id, staff_role_ids) VALUES (?, ?, ?)", (guild_id, None, json.dumps([]))
+        )
     
     async def update_settings(self, settings: Settings) -> None:
-        async with aiosqlite.connect(self.database_path) as db:
-            await db.execute(
-                "UPDATE shift_settings SET log_channel_id = ?, staff_role_ids = ? WHERE guild_id = ?",
-                (settings.log_channel_id, json.dumps(settings.staff_role_ids), settings.guild_id),
-            )
-            await db.commit()
+        await self.db.execute(
+            "UPDATE shift_settings SET log_channel_id = ?, staff_role_ids = ?, max_shift_hours = ?, pause_timeout_minutes = ? WHERE guild_id = ?",
+            (settings.log_channel_id, json.dumps(settings.staff_role_ids), settings.max_shift_hours,
+             settings.pause_timeout_minutes, settings.guild_id),
+        )
+        get_staff_resolver().set_roles(SHIFTS, settings.guild_id, settings.staff_role_ids)
+        self._set_limits(settings.guild_id, settings.max_shift_hours, settings.pause_timeout_minutes)
+        if self.on_shift_change is not None:
+            for guild_id, user_id in self.active_keys():
+                if guild_id == settings.guild_id:
+                    self.on_shift_change(guild_id, user_id)
+    
+    def _set_limits(self, guild_id: int, max_hours: Optional[int], pause_minutes: Optional[int]) -> None:
+        if max_hours or pause_minutes:
+            self._limits[guild_id] = (max_hours, pause_minutes)
+        else:
+            self._limits.pop(guild_id, None)
+    
+    async def load_shift_limits(self) -> None:
+        """Cache each guild's auto-end limits from shift_settings"""
+        rows = await self.db.fetchall(
+            "SELECT guild_id, max_shift_hours, pause_timeout_minutes FROM shift_settings "
+            "WHERE max_shift_hours IS NOT NULL OR pause_timeout_minutes IS NOT NULL"
+        )
+        self._limits.clear()
+        for guild_id, max_hours, pause_minutes in rows:
+            self._set_limits(guild_id, max_hours, pause_minutes)
+    
+    async def load_staff_roles(self) -> None:
+        """Warm the shared staff resolver from shift_settings"""
+        rows = await self.db.fetchall("SELECT guild_id, staff_role_ids FROM shift_settings")
+        get_staff_resolver().load(SHIFTS, ((guild_id, json.loads(role_ids or "[]")) for guild_id, role_ids in rows))
 
 class StaffShifts(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -471,14 +824,22 @@ class StaffShifts(commands.Cog):
         self.log_embed_provider = LogEmbedProvider(bot)
         self.service = ShiftService(Path("data/staff_shifts.db"))
         self.ready = asyncio.Event()
+        self._reconcile_task: Optional[asyncio.Task] = None
+        # Deadlines of open shifts that the guild's limits will auto-end, keyed by (guild_id, user_id)
+        self.auto_end = DeadlineScheduler(self._auto_end_shift, name="shift-auto-end")
+        self.service.on_shift_change = self._schedule_auto_end
     
     def safe_timestamp(self, dt) -> int:
-        """Safely get timestamp from datetime object or string"""
+        """Safely get timestamp from datetime object, epoch seconds or string"""
         try:
             # If it's already a datetime object, use it directly
             if isinstance(dt, datetime):
                 return round(dt.timestamp())
             
+            # Epoch seconds, as stored in the shifts table
+            elif isinstance(dt, int):
+                return dt
+            
             # If it's a string, try to parse it
             elif isinstance(dt, str):
                 # Handle common datetime string formats
@@ -523,11 +884,81 @@ class StaffShifts(commands.Cog):
 
     async def cog_load(self) -> None:
         await self.service.init_db()
+        await self.service.load_staff_roles()
+        await self.service.load_active_shifts()
+        await self.service.load_shift_limits()
+        # Deadlines are derived from the stored shifts and limits, so a restart picks up where it left off
+        self._schedule_all_auto_ends()
+        self.auto_end.start()
+        if not await self.service.has_rollups():
+            counted = await self.service.backfill_rollups()
+            if counted:
+                print(f"[StaffShifts] Built duty rollups from {counted} shift(s)")
+        self._reconcile_task = asyncio.create_task(self._reconcile_active_shifts())
         self.ready.set()
     
-    async def log_start(self, ctx: commands.Context, shift: Shift):
-        assert ctx.guild is not None
-        settings = await self.service.get_settings(ctx.guild.id)
+    async def cog_unload(self) -> None:
+        if self._reconcile_task and not self._reconcile_task.done():
+            self._reconcile_task.cancel()
+        await self.auto_end.stop()
+        self.service.on_shift_change = None
+    
+    async def _reconcile_active_shifts(self) -> None:
+        """Periodically check the active-shift index against the database"""
+        while True:
+            await asyncio.sleep(ACTIVE_SHIFT_RECONCILE_INTERVAL)
+            try:
+                drift = await self.service.reconcile_active_shifts()
+                if drift:
+                    print(f"[StaffShifts] Active shift index corrected {drift} entr{'y' if drift == 1 else 'ies'}")
+                    self._schedule_all_auto_ends()
+            except Exception as e:
+                print(f"[StaffShifts] Active shift reconcile failed: {e}")
+    
+    def _schedule_auto_end(self, guild_id: int, user_id: int) -> None:
+        """Set or clear the auto-end deadline of a user's open shift"""
+        key = (guild_id, user_id)
+        shift = self.service.peek_active(guild_id, user_id)
+        deadline = self.service.auto_end_deadline(shift) if shift else None
+        if deadline is None:
+            self.auto_end.cancel(key)
+        else:
+            self.auto_end.schedule(key, deadline[0])
+    
+    def _schedule_all_auto_ends(self) -> None:
+        self.auto_end.clear()
+        for guild_id, user_id in self.service.active_keys():
+            self._schedule_auto_end(guild_id, user_id)
+    
+    async def _auto_end_shift(self, key: Tuple[int, int]) -> None:
+        """Scheduler callback: force-end a shift whose deadline has passed"""
+        guild_id, user_id = key
+        shift = self.service.peek_active(guild_id, user_id)
+        deadline = self.service.auto_end_deadline(shift) if shift else None
+        if deadline is None:
+            return
+        due, reason = deadline
+        if due > time.time():
+            # Limits or pause state changed since this was scheduled
+            self.auto_end.schedule(key, due)
+            return
+        ended = await self.service.force_end_shift(guild_id, user_id, f"[Auto-ended: {reason}]", end=from_epoch(due))
+        if ended is None:
+            return
+        print(f"[StaffShifts] Auto-ended shift {ended.shift_id} of user {user_id} in guild {guild_id}: {reason}")
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        member = guild.get_member(user_id)
+        if member is None:
+            try:
+                member = await self.bot.fetch_user(user_id)
+            except discord.HTTPException:
+                return
+        await self.log_end(guild, member, ended)
+    
+    async def log_start(self, guild: discord.Guild, member: discord.abc.User, shift: Shift):
+        settings = await self.service.get_settings(guild.id)
         if settings.log_channel_id is None:
             return
         log_channel = self.bot.get_channel(settings.log_channel_id) or await self.bot.fetch_channel(settings.log_channel_id)
@@ -535,12 +966,11 @@ class StaffShifts(commands.Cog):
             print("Log channel not found")
             return
         await log_channel.send(
-            embed=await self.log_embed_provider.get_shift_start_embed(ctx, shift)
+            embed=await self.log_embed_provider.get_shift_start_embed(member, shift)
         )
 
-    async def log_end(self, ctx: commands.Context, shift: Shift):
-        assert ctx.guild is not None
-        settings = await self.service.get_settings(ctx.guild.id)
+    async def log_end(self, guild: discord.Guild, member: discord.abc.User, shift: Shift):
+        settings = await self.service.get_settings(guild.id)
         if settings.log_channel_id is None:
             return
         log_channel = self.bot.get_channel(settings.log_channel_id) or await self.bot.fetch_channel(settings.log_channel_id)
@@ -549,12 +979,11 @@ class StaffShifts(commands.Cog):
             return
         assert shift.end is not None
         await log_channel.send(
-            embed=await self.log_embed_provider.get_shift_end_embed(ctx, shift)
+            embed=await self.log_embed_provider.get_shift_end_embed(member, shift)
         )
     
-    async def log_invalidate(self, ctx: commands.Context, shift: Shift):
-        assert ctx.guild is not None
-        settings = await self.service.get_settings(ctx.guild.id)
+    async def log_invalidate(self, guild: discord.Guild, member: discord.abc.User, shift: Shift):
+        settings = await self.service.get_settings(guild.id)
         if settings.log_channel_id is None:
             return
         log_channel = self.bot.get_channel(settings.log_channel_id) or await self.bot.fetch_channel(settings.log_channel_id)
@@ -562,22 +991,16 @@ class StaffShifts(commands.Cog):
             print("Log channel not found")
             return
         await log_channel.send(
-            embed=await self.log_embed_provider.get_shift_discard_embed(ctx, shift)
+            embed=await self.log_embed_provider.get_shift_discard_embed(member, shift)
         )
     
     async def is_staff(self, ctx: commands.Context) -> bool:
         assert ctx.guild is not None
         if not isinstance(ctx.author, discord.Member):
             return False
-        settings = await self.service.get_settings(ctx.guild.id)
         
-        # Debug: Check if any roles are configured
-        if not settings.staff_role_ids:
-            return False
-            
-        # Check if user has any of the configured staff roles
-        user_role_ids = [role.id for role in ctx.author.roles]
-        return any(role_id in settings.staff_role_ids for role_id in user_role_ids)
+        # Check if user has any of the configured staff roles (cached, no database access)
+        return get_staff_resolver().has_staff_role(SHIFTS, ctx.author)
     
     async def send_staff_error(self, ctx: commands.Context):
         """Send helpful error message when user is not staff"""
@@ -637,7 +1060,7 @@ class StaffShifts(commands.Cog):
         start = datetime.now(timezone.utc)
         await self.service.start_shift(Shift.new(ctx.guild.id, user_id, start, note))
         await ctx.send(f"The start of your shift has been logged at <t:{self.safe_timestamp(start)}:F>. Use `{ctx.prefix}shift end` to log its end.")
-        await self.log_start(ctx, Shift.new(ctx.guild.id, user_id, start, note))
+        await self.log_start(ctx.guild, ctx.author, Shift.new(ctx.guild.id, user_id, start, note))
     
     @shift.command(
         name="discard",
@@ -661,7 +1084,7 @@ class StaffShifts(commands.Cog):
             return
         await self.service.discard_shift(current_shift)
         await ctx.send("Your current shift has been discarded.")
-        await self.log_invalidate(ctx, current_shift)
+        await self.log_invalidate(ctx.guild, ctx.author, current_shift)
 
     @shift.command(
         name="pause",
@@ -746,7 +1169,7 @@ class StaffShifts(commands.Cog):
         
         # Use the end_time variable directly to avoid any potential issues
         await ctx.send(f"The end of your shift has been logged at <t:{self.safe_timestamp(end_time)}:F>.")
-        await self.log_end(ctx, current_shift)
+        await self.log_end(ctx.guild, ctx.author, current_shift)
     
     @shift.group("admin")
     @commands.has_permissions(manage_guild=True)
@@ -835,73 +1258,54 @@ class StaffShifts(commands.Cog):
             await ctx.send("Days must be between 1 and 365.")
             return
         
+        guild = ctx.guild
         user_id = user.id if user else None
-        shifts = await self.service.get_shift_history(ctx.guild.id, user_id, days, 20)
+        target = f" - {user.display_name}" if user else ""
         
-        if not shifts:
-            target = f" for {user.display_name}" if user else ""
+        async def fetch(before, count):
+            return await self.service.get_shift_history(guild.id, user_id, days, count, before)
+        
+        async def render(shifts, page):
             embed = discord.Embed(
-                title="Shift History", 
-                description=f"No shifts found{target} in the last {days} days.",
+                title=f"Shift History{target}", 
+                description=f"Shifts in the past {days} days (page {page})",
                 color=discord.Color.blue()
             )
-            await ctx.send(embed=embed)
-            return
-        
-        target = f" - {user.display_name}" if user else ""
-        embed = discord.Embed(
-            title=f"Shift History{target}", 
-            description=f"Latest {len(shifts)} shifts in the past {days} days",
-            color=discord.Color.blue()
-        )
-        
-        for shift in shifts[:10]:  # Limit to 10 for embed space
-            member = ctx.guild.get_member(shift.user_id)
-            username = member.display_name if member else f"Unknown User ({shift.user_id})"
             
-            if shift.end:
-                # Ensure both start and end are datetime objects for calculation
-                if isinstance(shift.start, str):
-                    try:
-                        start_str = str(shift.start)
-                        start_dt = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-                    except ValueError:
-                        start_str = str(shift.start)
-                        start_dt = datetime.strptime(start_str.replace('+00:00', ''), '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
-                else:
-                    start_dt = shift.start
+            # Only the shifts on this page are resolved to members
+            for shift in shifts:
+                member = guild.get_member(shift.user_id)
+                username = member.display_name if member else f"Unknown User ({shift.user_id})"
                 
-                if isinstance(shift.end, str):
-                    try:
-                        end_str = str(shift.end)
-                        end_dt = datetime.fromisoformat(end_str.replace('Z', '+00:00'))
-                    except ValueError:
-                        end_str = str(shift.end)
-                        end_dt = datetime.strptime(end_str.replace('+00:00', ''), '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+                if shift.end:
+                    duration = shift.end - shift.start
+                    hours, remainder = divmod(int(duration.total_seconds()), 3600)
+                    minutes = remainder // 60
+                    status = f"Active ({hours}h {minutes}m)"
                 else:
-                    end_dt = shift.end
+                    status = "Ongoing"
                 
-                duration = end_dt - start_dt
-                hours, remainder = divmod(int(duration.total_seconds()), 3600)
-                minutes = remainder // 60
-                status = f"Active ({hours}h {minutes}m)"
-            else:
-                status = "Ongoing"
-            
-            value = f"**Started:** <t:{self.safe_timestamp(shift.start)}:R>\n**Status:** {status}"
-            if shift.start_note:
-                value += f"\n**Note:** {shift.start_note[:50]}{'...' if len(shift.start_note) > 50 else ''}"
-            
-            embed.add_field(
-                name=username,
-                value=value,
-                inline=True
-            )
-        
-        if len(shifts) > 10:
-            embed.set_footer(text=f"Showing 10 of {len(shifts)} shifts")
+                value = f"**Started:** <t:{self.safe_timestamp(shift.start)}:R>\n**Status:** {status}"
+                if shift.start_note:
+                    value += f"\n**Note:** {shift.start_note[:50]}{'...' if len(shift.start_note) > 50 else ''}"
+                
+                embed.add_field(
+                    name=username,
+                    value=value,
+                    inline=True
+                )
+            return embed
         
-        await ctx.send(embed=embed)
+        paginator = KeysetPaginator(fetch, render, key=lambda shift: (to_epoch(shift.start), shift.shift_id),
+                                    page_size=SHIFT_HISTORY_PAGE_SIZE, author_id=ctx.author.id)
+        if not await paginator.start(ctx.send):
+            target = f" for {user.display_name}" if user else ""
+            embed = discord.Embed(
+                title="Shift History", 
+                description=f"No shifts found{target} in the last {days} days.",
+                color=discord.Color.blue()
+            )
+            await ctx.send(embed=embed)
     
     @shift_admin.command(
         name="end",
@@ -930,8 +1334,7 @@ class StaffShifts(commands.Cog):
         
         ended_shift = await self.service.force_end_shift(ctx.guild.id, user.id, end_note)
         if ended_shift and ended_shift.end:
-            duration = ended_shift.end - ended_shift.start
-            hours, remainder = divmod(int(duration.total_seconds()), 3600)
+            hours, remainder = divmod(ended_shift.duty_seconds(), 3600)
             minutes = remainder // 60
             
             embed = discord.Embed(
@@ -947,7 +1350,7 @@ class StaffShifts(commands.Cog):
             await ctx.send(embed=embed)
             
             # Log the forced end
-            await self.log_end(ctx, ended_shift)
+            await self.log_end(ctx.guild, user, ended_shift)
     
     @shift_admin.command(
         name="stats",
@@ -985,8 +1388,9 @@ class StaffShifts(commands.Cog):
         
         total_shifts = stats[0] if stats else 0
         completed_shifts = stats[1] if stats else 0
-        total_seconds = stats[3] if stats and len(stats) > 3 and stats[3] else 0
-        avg_seconds = stats[4] if stats and len(stats) > 4 and stats[4] else 0
+        total_seconds = stats[3] if stats and stats[3] else 0
+        avg_seconds = stats[4] if stats and stats[4] else 0
+        paused_seconds = stats[5] if stats and stats[5] else 0
         
         # Convert seconds to human readable
         total_hours = int(total_seconds // 3600)
@@ -997,11 +1401,13 @@ class StaffShifts(commands.Cog):
         embed.add_field(name="Completed Shifts", value=str(completed_shifts), inline=True)
         embed.add_field(name="Ongoing Shifts", value=str(total_shifts - completed_shifts), inline=True)
         embed.add_field(name="Total Hours", value=f"{total_hours}h", inline=True)
+        if paused_seconds:
+            embed.add_field(name="Paused Hours", value=f"{int(paused_seconds // 3600)}h", inline=True)
         
         if completed_shifts > 0:
             embed.add_field(name="Avg Shift Length", value=f"{avg_hours}h {avg_minutes}m", inline=True)
         
-        if not user and stats and len(stats) > 2:
+        if not user and stats:
             unique_staff = stats[2]
             embed.add_field(name="Active Staff", value=str(unique_staff), inline=True)
         
@@ -1024,8 +1430,8 @@ class StaffShifts(commands.Cog):
             await ctx.send("Days must be between 1 and 365.")
             return
         
-        # Get all shifts in the timeframe
-        all_shifts = await self.service.get_shift_history(ctx.guild.id, None, days, 1000)
+        # Per-user totals for the timeframe, aggregated in SQL
+        summary = await self.service.get_duty_summary(ctx.guild.id, days)
         
         # Get staff roles to identify all potential staff
         settings = await self.service.get_settings(ctx.guild.id)
@@ -1037,16 +1443,8 @@ class StaffShifts(commands.Cog):
         
         # Organize data by user
         user_data = {}
-        for shift in all_shifts:
-            if shift.user_id not in user_data:
-                user_data[shift.user_id] = {'shifts': 0, 'hours': 0, 'ongoing': 0}
-            
-            user_data[shift.user_id]['shifts'] += 1
-            if shift.end:
-                duration = (shift.end - shift.start).total_seconds()
-                user_data[shift.user_id]['hours'] += duration / 3600
-            else:
-                user_data[shift.user_id]['ongoing'] += 1
+        for user_id, shifts, ongoing, net_seconds in summary:
+            user_data[user_id] = {'shifts': shifts, 'hours': net_seconds / 3600, 'ongoing': ongoing}
         
         embed = discord.Embed(
             title="Staff Activity Summary",
@@ -1061,9 +1459,7 @@ class StaffShifts(commands.Cog):
             if member:
                 active_staff.append((member, data))
         
-        # Sort by total hours
-        active_staff.sort(key=lambda x: x[1]['hours'], reverse=True)
-        
+        # Already sorted by total hours
         if active_staff:
             top_staff = []
             for member, data in active_staff[:5]:  # Top 5
@@ -1105,6 +1501,22 @@ class StaffShifts(commands.Cog):
         
         await ctx.send(embed=embed)
     
+    @shift_admin.command(
+        name="backfill",
+        usage="shift admin backfill",
+        description="Rebuild duty totals from shift history",
+    )
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    @commands.cooldown(1, 60, commands.BucketType.guild)
+    async def shift_admin_backfill(self, ctx: commands.Context):
+        """Rebuild this server's daily/weekly duty totals from shift history"""
+        assert ctx.guild is not None
+        await self.ready.wait()
+        
+        counted = await self.service.backfill_rollups(ctx.guild.id)
+        await ctx.send(f"Rebuilt duty totals from {counted} completed shift(s).")
+    
     @shift.group("settings")
     async def shift_settings(self, ctx: commands.Context):
         if ctx.invoked_subcommand is None:
@@ -1131,6 +1543,54 @@ class StaffShifts(commands.Cog):
         else:
             await ctx.send("Shift logging will be disabled.")
     
+    @shift_settings.command(
+        name="maxlength",
+        usage="shift settings maxlength [hours]",
+        description="Auto-end shifts that run longer than this many hours (omit to disable).",
+    )
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    @commands.cooldown(1, 2, commands.BucketType.member)
+    async def shift_settings_maxlength(
+        self, ctx: commands.Context, hours: Optional[int] = None
+    ):
+        assert ctx.guild is not None
+        await self.ready.wait()
+        if hours is not None and not 1 <= hours <= 168:
+            await ctx.send("Maximum shift length must be between 1 and 168 hours.")
+            return
+        settings = await self.service.get_settings(ctx.guild.id)
+        settings.max_shift_hours = hours
+        await self.service.update_settings(settings)
+        if hours is not None:
+            await ctx.send(f"Shifts longer than {hours}h will be ended automatically.")
+        else:
+            await ctx.send("Shifts will no longer be ended automatically for their length.")
+    
+    @shift_settings.command(
+        name="pausetimeout",
+        usage="shift settings pausetimeout [minutes]",
+        description="Auto-end shifts paused for longer than this many minutes (omit to disable).",
+    )
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    @commands.cooldown(1, 2, commands.BucketType.member)
+    async def shift_settings_pausetimeout(
+        self, ctx: commands.Context, minutes: Optional[int] = None
+    ):
+        assert ctx.guild is not None
+        await self.ready.wait()
+        if minutes is not None and not 1 <= minutes <= 10080:
+            await ctx.send("Pause timeout must be between 1 and 10080 minutes.")
+            return
+        settings = await self.service.get_settings(ctx.guild.id)
+        settings.pause_timeout_minutes = minutes
+        await self.service.update_settings(settings)
+        if minutes is not None:
+            await ctx.send(f"Shifts paused for more than {minutes} minute(s) will be ended automatically.")
+        else:
+            await ctx.send("Paused shifts will no longer be ended automatically.")
+    
     @shift_settings.command(
         name="addrole",
         usage="shift settings addrole [role]",
@@ -4,33 +4,37 @@ import discord
 from discord.ext import commands
 from utils.json_store import add_or_update_user
 from utils.helpers import log_action  # Keep for backward compatibility
+from utils.message_router import MessageInterest
+from utils.staff_resolver import SHIFTS, get_staff_resolver
 import asyncio
 
+WELCOME_CHANNEL_ID = 1263070188589547541
+
 class MemberEvents(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         # Store bot welcome messages with their message IDs for auto-deletion
         self.bot_welcome_messages = {}  # {user_id: message_id}
         
+    async def cog_load(self):
+        # Staff welcomes: human messages with mentions in the welcome channel
+        self.bot.message_router.register("member_events", self.handle_message, MessageInterest(
+            dm=False,
+            channels=frozenset({WELCOME_CHANNEL_ID}),
+            mentions=True,
+            predicate=lambda info: not self.bot_welcome_messages.keys().isdisjoint(info.mention_ids),
+        ))
+        
+    async def cog_unload(self):
+        self.bot.message_router.unregister("member_events")
+        
     async def is_staff_member(self, member: discord.Member) -> bool:
         """Check if member is a staff member using staff-shifts module logic"""
         if not member.guild:
             return False
             
-        # Get staff shifts cog to check staff status
-        staff_shifts_cog = self.bot.get_cog('StaffShifts')
-        if not staff_shifts_cog:
-            return False
-            
-        try:
-            # Get staff settings from the staff shifts service
-            settings = await staff_shifts_cog.service.get_settings(member.guild.id)
-            
-            # Check if user has any of the configured staff roles
-            user_role_ids = [role.id for role in member.roles]
-            return any(role_id in settings.staff_role_ids for role_id in user_role_ids)
-        except:
-            return False
+        # Staff roles configured in staff shifts settings (cached, no database access)
+        return get_staff_resolver().has_staff_role(SHIFTS, member)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -49,7 +53,7 @@ class MemberEvents(commands.Cog):
             return
             
         # Get welcome channel
-        welcome_channel_id = 1263070188589547541  # The specified channel ID
+        welcome_channel_id = WELCOME_CHANNEL_ID
         welcome_channel = self.bot.get_channel(welcome_channel_id)
         if not welcome_channel:
             return
@@ -79,18 +83,8 @@ class MemberEvents(commands.Cog):
         except Exception as e:
             print(f"❌ Error sending welcome message: {e}")
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """Monitor for staff welcome messages to auto-delete bot welcome"""
-        # Ignore bot messages
-        if message.author.bot:
-            return
-            
-        # Only check in the welcome channel
-        welcome_channel_id = 1263070188589547541
-        if message.channel.id != welcome_channel_id:
-            return
-            
+    async def handle_message(self, message: discord.Message):
+        """Monitor for staff welcome messages to auto-delete bot welcome (routed for the welcome channel)"""
         # Check if author is staff
         if not isinstance(message.author, discord.Member):
             return
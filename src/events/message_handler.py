@@ -1,6 +1,7 @@
 from discord.ext import commands
 import logging, discord, os, re
 from datetime import datetime, timezone
+from utils.message_router import MessageInterest
 
 logger = logging.getLogger(__name__)
 
@@ -9,13 +10,18 @@ class MessageHandler(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Handle messages for auto-thanks detection"""
-        # Ignore bot messages or DMs
-        if message.author.bot or not message.guild:
-            return
-        
+    async def cog_load(self):
+        # Auto-thanks: guild messages containing the word "thanks"
+        self.bot.message_router.register("message_handler", self.handle_message, MessageInterest(
+            dm=False,
+            keywords=frozenset({"thanks"}),
+        ))
+
+    async def cog_unload(self):
+        self.bot.message_router.unregister("message_handler")
+
+    async def handle_message(self, message):
+        """Handle messages for auto-thanks detection (routed for guild messages saying thanks)"""
         # Check for thanks mentions
         await self.check_thanks_mention(message)
         
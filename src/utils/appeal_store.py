@@ -0,0 +1,119 @@
+"""
+Appeal store
+All reads and writes of unban_requests for the appeals cog. Users with a
+pending appeal are also kept in memory (user_id -> pending appeal IDs),
+loaded once and updated on every create/approve/deny, so the checks that
+run on each DM and event ("does this user have a pending appeal?") need no
+database round-trip. Listings and lookups use the indexes created in
+utils.database.init_db.
+"""
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import aiosqlite
+
+from utils.db_pool import Database
+
+# (id, user_id, reason, status, timestamp)
+AppealRow = Tuple[int, int, Optional[str], str, str]
+
+
+class AppealStore:
+    """Async unban_requests access plus an in-memory index of pending appeals"""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._pending: Dict[int, Set[int]] = {}
+
+    def __len__(self) -> int:
+        """Number of users with at least one pending appeal"""
+        return len(self._pending)
+
+    async def load(self) -> int:
+        """Rebuild the pending index from the table; returns the number of pending appeals"""
+        rows = await self.db.fetchall("SELECT id, user_id FROM unban_requests WHERE status = 'pending'")
+        self._pending = {}
+        for appeal_id, user_id in rows:
+            self._pending.setdefault(user_id, set()).add(appeal_id)
+        return len(rows)
+
+    def has_pending(self, user_id: int) -> bool:
+        return user_id in self._pending
+
+    def pending_id(self, user_id: int) -> Optional[int]:
+        """The user's oldest pending appeal, if any"""
+        ids = self._pending.get(user_id)
+        return min(ids) if ids else None
+
+    def pending_users(self) -> Set[int]:
+        return set(self._pending)
+
+    def _forget(self, user_id: int, appeal_id: int) -> None:
+        ids = self._pending.get(user_id)
+        if ids is not None:
+            ids.discard(appeal_id)
+            if not ids:
+                del self._pending[user_id]
+
+    async def create(self, user_id: int, reason: str) -> int:
+        appeal_id = await self.db.execute('INSERT INTO unban_requests (user_id, reason) VALUES (?, ?)', (user_id, reason))
+        self._pending.setdefault(user_id, set()).add(appeal_id)
+        return appeal_id
+
+    async def get(self, appeal_id: int) -> Optional[Tuple[int, Optional[str], str, str]]:
+        """``(user_id, reason, status, timestamp)`` of one appeal"""
+        return await self.db.fetchone('SELECT user_id, reason, status, timestamp FROM unban_requests WHERE id = ?', (appeal_id,))
+
+    async def page(self, status: Optional[str], before: Optional[Sequence], count: int) -> List[AppealRow]:
+        """Newest first; ``before`` is the ``(timestamp, id)`` of the last row already shown"""
+        clauses = []
+        params: list = []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if before is not None:
+            clauses.append("(timestamp, id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return await self.db.fetchall(
+            f'SELECT id, user_id, reason, status, timestamp FROM unban_requests {where} ORDER BY timestamp DESC, id DESC LIMIT ?',
+            (*params, count)
+        )
+
+    async def resolve(self, appeal_id: int, status: str) -> Optional[int]:
+        """Move a pending appeal to ``status`` and return its user ID (None if not pending)"""
+        async def resolve(conn: aiosqlite.Connection):
+            async with conn.execute("SELECT user_id FROM unban_requests WHERE id = ? AND status = 'pending'", (appeal_id,)) as cursor:
+                row = await cursor.fetchone()
+            if not row:
+                return None
+            await conn.execute("UPDATE unban_requests SET status = ? WHERE id = ?", (status, appeal_id))
+            return row[0]
+
+        user_id = await self.db.transaction(resolve)
+        if user_id is not None:
+            self._forget(user_id, appeal_id)
+        return user_id
+
+    async def approve_users(self, user_ids: Set[int]) -> List[Tuple[int, int]]:
+        """Approve every pending appeal of these users in one transaction, returning (appeal_id, user_id)"""
+        candidates = [(appeal_id, user_id) for user_id in user_ids for appeal_id in self._pending.get(user_id, ())]
+        if not candidates:
+            return []
+
+        async def approve(conn: aiosqlite.Connection):
+            approved = []
+            for appeal_id, user_id in candidates:
+                cursor = await conn.execute("UPDATE unban_requests SET status = 'approved' WHERE id = ? AND status = 'pending'", (appeal_id,))
+                if cursor.rowcount:
+                    approved.append((appeal_id, user_id))
+                await cursor.close()
+            return approved
+
+        approved = await self.db.transaction(approve)
+        # Rows that were no longer pending leave the index as well
+        for appeal_id, user_id in candidates:
+            self._forget(user_id, appeal_id)
+        return sorted(approved)
+
+
+__all__ = ['AppealStore']
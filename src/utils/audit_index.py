@@ -0,0 +1,139 @@
+"""
+Audit log correlation cache
+Keeps recent audit log entries from the on_audit_log_entry_create stream so
+ban/unban/member update handlers can find the moderator and reason without
+sleeping and paging guild.audit_logs() for every event.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger("codeverse.audit_index")
+
+# Entries are kept this long after they arrive (seconds)
+AUDIT_ENTRY_TTL = 60.0
+# How long a handler waits for its entry before falling back to REST (seconds)
+AUDIT_WAIT_TIMEOUT = 3.0
+# Entries created longer ago than this do not match a new event (seconds)
+AUDIT_MAX_AGE = 10.0
+
+Key = Tuple[int, discord.AuditLogAction, int]
+
+
+def is_timeout_entry(entry: discord.AuditLogEntry) -> bool:
+    """True for member_update entries that changed a timeout"""
+    return hasattr(entry.after, "timed_out_until")
+
+
+class AuditLogIndex:
+    """Recent audit log entries keyed by (guild_id, action, target_id)"""
+
+    def __init__(self, ttl: float = AUDIT_ENTRY_TTL):
+        self.ttl = ttl
+        self._entries: "OrderedDict[Key, List[Tuple[float, discord.AuditLogEntry]]]" = OrderedDict()
+        self._waiters: Dict[Key, List[asyncio.Future]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(guild_id: int, action: discord.AuditLogAction, target_id: int) -> Key:
+        return (guild_id, action, target_id)
+
+    def add(self, entry: discord.AuditLogEntry) -> None:
+        """Index an entry and wake any handler waiting for it"""
+        target_id = getattr(entry.target, "id", None)
+        if target_id is None or entry.guild is None:
+            return
+        now = time.monotonic()
+        self._evict(now)
+
+        key = self._key(entry.guild.id, entry.action, target_id)
+        items = self._entries.setdefault(key, [])
+        items.append((now, entry))
+        while now - items[0][0] >= self.ttl:
+            items.pop(0)
+        self._entries.move_to_end(key)
+
+        for future in self._waiters.pop(key, []):
+            if not future.done():
+                future.set_result(None)
+
+    def _evict(self, now: float) -> None:
+        # Keys are kept in order of their latest insert, so expired keys are at the front
+        while self._entries:
+            key, items = next(iter(self._entries.items()))
+            if now - items[-1][0] < self.ttl:
+                break
+            del self._entries[key]
+
+    def _lookup(self, key: Key, since: datetime,
+                predicate: Optional[Callable[[discord.AuditLogEntry], bool]]) -> Optional[discord.AuditLogEntry]:
+        for _, entry in reversed(self._entries.get(key, [])):
+            if entry.created_at and entry.created_at < since:
+                continue
+            if predicate is None or predicate(entry):
+                return entry
+        return None
+
+    async def wait_for(self, guild_id: int, action: discord.AuditLogAction, target_id: int, *,
+                       timeout: float = AUDIT_WAIT_TIMEOUT, max_age: float = AUDIT_MAX_AGE,
+                       predicate: Optional[Callable[[discord.AuditLogEntry], bool]] = None
+                       ) -> Optional[discord.AuditLogEntry]:
+        """Return the newest matching entry, waiting up to ``timeout`` for it to arrive"""
+        key = self._key(guild_id, action, target_id)
+        since = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = self._lookup(key, since, predicate)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.misses += 1
+                return None
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(key, []).append(future)
+            try:
+                await asyncio.wait_for(future, remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                waiters = self._waiters.get(key)
+                if waiters and future in waiters:
+                    waiters.remove(future)
+                    if not waiters:
+                        del self._waiters[key]
+
+
+async def find_audit_entry(bot, guild: discord.Guild, action: discord.AuditLogAction, target_id: int, *,
+                           limit: int = 5, max_age: float = AUDIT_MAX_AGE,
+                           predicate: Optional[Callable[[discord.AuditLogEntry], bool]] = None
+                           ) -> Optional[discord.AuditLogEntry]:
+    """
+    Find the audit log entry behind a gateway event.
+    Checks the bot's AuditLogIndex first and only pages guild.audit_logs()
+    if the entry did not arrive in time.
+    """
+    index: Optional[AuditLogIndex] = getattr(bot, "audit_index", None)
+    if index is not None:
+        entry = await index.wait_for(guild.id, action, target_id, max_age=max_age, predicate=predicate)
+        if entry is not None:
+            return entry
+
+    since = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+    try:
+        async for entry in guild.audit_logs(action=action, limit=limit):
+            if entry.target and entry.target.id == target_id:
+                if entry.created_at and entry.created_at < since:
+                    continue
+                if predicate is None or predicate(entry):
+                    return entry
+    except Exception as e:
+        logger.debug(f"Audit log lookup failed for {action} on {target_id}: {e}")
+    return None
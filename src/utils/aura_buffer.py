@@ -0,0 +1,266 @@
+"""
+Aura award buffer
+Coalesces auto-thanks aura awards per (guild, user) in memory and writes
+them to staff_points.db in one transaction every few seconds, or sooner
+once enough awards are waiting. Every award is appended to a small journal
+file before it is acknowledged, so awards that were accepted but not yet
+written survive a crash and are replayed on the next start.
+
+Journal layout (all next to the database):
+  aura_journal.jsonl            awards accepted since the last flush
+  aura_journal.<id>.flushing    a batch being (or failed to be) written
+The id of the newest batch written is stored in aura_journal_state in the
+same transaction as the batch itself, so a replay never applies it twice.
+"""
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiosqlite
+
+from utils.db_pool import Database
+from utils.points_history import history_timestamp, record_history
+
+logger = logging.getLogger("codeverse.aura_buffer")
+
+Key = Tuple[int, int]                 # (guild_id, user_id)
+Award = Tuple[str, str, int]          # (reason, timestamp, moderator_id)
+Standings = Dict[Key, Tuple[int, int]]  # (points, total_earned) after a flush
+
+JOURNAL_STATE_SQL = """
+    CREATE TABLE IF NOT EXISTS aura_journal_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        last_batch INTEGER NOT NULL
+    )
+"""
+
+
+async def _apply_awards(conn: aiosqlite.Connection, batch_id: int, awards: Dict[Key, List[Award]]) -> Standings:
+    """Write a batch of awards and mark it applied, in the caller's transaction"""
+    keys = list(awards)
+    await conn.executemany("""
+        INSERT OR IGNORE INTO staff_points (guild_id, user_id, points, total_earned, last_updated)
+        VALUES (?, ?, 0, 0, datetime('now'))
+    """, keys)
+    await conn.executemany("""
+        UPDATE staff_points
+        SET points = points + ?, total_earned = total_earned + ?, last_updated = datetime('now')
+        WHERE guild_id = ? AND user_id = ?
+    """, [(len(items), len(items), guild_id, user_id) for (guild_id, user_id), items in awards.items()])
+    await record_history(conn, [(guild_id, user_id, moderator_id, 1, reason, 'auto_add', timestamp)
+                                for (guild_id, user_id), items in awards.items()
+                                for reason, timestamp, moderator_id in items])
+    await conn.execute("INSERT OR REPLACE INTO aura_journal_state (id, last_batch) VALUES (1, ?)", (batch_id,))
+
+    standings: Standings = {}
+    for guild_id, user_id in keys:
+        async with conn.execute("SELECT points, total_earned FROM staff_points WHERE guild_id = ? AND user_id = ?",
+                                (guild_id, user_id)) as cursor:
+            row = await cursor.fetchone()
+        standings[(guild_id, user_id)] = (row[0] or 0, row[1] or 0) if row else (0, 0)
+    return standings
+
+
+class AuraAwardBuffer:
+    """Write-behind buffer for +1 aura awards"""
+
+    def __init__(self, db: Database, journal_path: Path, *, interval: float = 5.0, max_pending: int = 50,
+                 on_flush: Optional[Callable[[Standings], None]] = None):
+        self.db = db
+        self.journal_path = Path(journal_path)
+        self.interval = interval
+        self.max_pending = max(1, max_pending)
+        self.on_flush = on_flush
+        self._pending: Dict[Key, List[Award]] = {}
+        # Awards in a transaction that has not committed yet, still counted by pending()
+        self._in_flight: Dict[Key, int] = {}
+        self._count = 0
+        self._journal = None
+        self._lock = asyncio.Lock()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        # Batch ids only grow; recover() moves this past anything already used
+        self._next_batch = 1
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    # -- journal files ---------------------------------------------------
+
+    def _batch_path(self, batch_id: int) -> Path:
+        return self.journal_path.with_name(f"{self.journal_path.stem}.{batch_id}.flushing")
+
+    def _batch_files(self) -> List[Tuple[int, Path]]:
+        batches = []
+        for path in self.journal_path.parent.glob(f"{self.journal_path.stem}.*.flushing"):
+            batch_id = path.name[len(self.journal_path.stem) + 1:-len(".flushing")]
+            if batch_id.isdigit():
+                batches.append((int(batch_id), path))
+        return sorted(batches)
+
+    def _take_batch_id(self) -> int:
+        batch_id = self._next_batch
+        self._next_batch += 1
+        return batch_id
+
+    def _rotate(self, batch_id: int) -> None:
+        """Move the live journal aside as batch ``batch_id``"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self.journal_path.exists():
+            os.replace(self.journal_path, self._batch_path(batch_id))
+
+    def _append(self, record: dict) -> None:
+        if self._journal is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        # Reaches the OS before the award is acknowledged, so it survives the process dying
+        self._journal.flush()
+
+    @staticmethod
+    def _read_batch(path: Path) -> Iterable[Tuple[Key, Award]]:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    yield (int(record["g"]), int(record["u"])), (record["r"], record["t"], int(record["m"]))
+                except (ValueError, KeyError, TypeError):
+                    # A write torn by a crash leaves at most one partial line
+                    logger.warning(f"Skipping unreadable aura journal line in {path.name}")
+
+    # -- public API ------------------------------------------------------
+
+    def add(self, guild_id: int, user_id: int, moderator_id: int, reason: str) -> None:
+        """Accept one award; it is journaled now and written on the next flush"""
+        award = (reason, history_timestamp(), moderator_id)
+        self._append({"g": guild_id, "u": user_id, "m": moderator_id, "r": reason, "t": award[1]})
+        self._pending.setdefault((guild_id, user_id), []).append(award)
+        self._count += 1
+        if self._count >= self.max_pending:
+            self._full.set()
+
+    def pending(self, guild_id: int, user_id: int) -> int:
+        """Awards accepted for this user but not written yet"""
+        key = (guild_id, user_id)
+        items = self._pending.get(key)
+        return (len(items) if items else 0) + self._in_flight.get(key, 0)
+
+    async def _write(self, batch_id: int, awards: Dict[Key, List[Award]]) -> Standings:
+        """Apply a batch, keeping it visible to pending() until the transaction commits"""
+        for key, items in awards.items():
+            self._in_flight[key] = self._in_flight.get(key, 0) + len(items)
+        try:
+            return await self.db.transaction(lambda conn: _apply_awards(conn, batch_id, awards))
+        finally:
+            for key, items in awards.items():
+                left = self._in_flight.get(key, 0) - len(items)
+                if left > 0:
+                    self._in_flight[key] = left
+                else:
+                    self._in_flight.pop(key, None)
+
+    async def setup(self) -> int:
+        """Create the state table and replay awards left by an unclean shutdown (call before start)"""
+        await self.db.execute(JOURNAL_STATE_SQL)
+        return await self.recover()
+
+    async def recover(self) -> int:
+        """Apply every journaled batch that is newer than the last one written"""
+        async with self._lock:
+            row = await self.db.fetchone("SELECT last_batch FROM aura_journal_state WHERE id = 1")
+            last_batch = row[0] if row else 0
+            self._next_batch = max([last_batch] + [batch_id for batch_id, _ in self._batch_files()]) + 1
+            self._rotate(self._take_batch_id())
+            batches = self._batch_files()
+            if not batches:
+                return 0
+
+            awards: Dict[Key, List[Award]] = {}
+            replayed = 0
+            for batch_id, path in batches:
+                if batch_id <= last_batch:
+                    continue
+                for key, award in self._read_batch(path):
+                    awards.setdefault(key, []).append(award)
+                    replayed += 1
+
+            newest = batches[-1][0]
+            if awards:
+                standings = await self._write(newest, awards)
+                if self.on_flush:
+                    self.on_flush(standings)
+            for _, path in batches:
+                path.unlink(missing_ok=True)
+            if replayed:
+                logger.info(f"Replayed {replayed} journaled aura award(s)")
+            return replayed
+
+    async def flush(self) -> Standings:
+        """Write everything pending in one transaction"""
+        async with self._lock:
+            if not self._pending:
+                return {}
+            batch_id = self._take_batch_id()
+            self._rotate(batch_id)
+            awards, self._pending = self._pending, {}
+            self._count = 0
+            self._full.clear()
+            try:
+                standings = await self._write(batch_id, awards)
+            except Exception:
+                # Keep the batch file and put the awards back in front of newer
+                # ones; the next successful flush covers this batch id too
+                for key, items in awards.items():
+                    self._pending[key] = items + self._pending.get(key, [])
+                self._count = sum(len(items) for items in self._pending.values())
+                raise
+            for old_id, path in self._batch_files():
+                if old_id <= batch_id:
+                    path.unlink(missing_ok=True)
+            self.flushes += 1
+            if self.on_flush:
+                self.on_flush(standings)
+            return standings
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="aura-buffer")
+
+    async def close(self) -> None:
+        """Stop the flush task and write whatever is still pending"""
+        if self._task and not self._task.done():
+            # Wake the task and let it exit instead of cancelling it mid-flush
+            self._closing = True
+            self._full.set()
+            await self._task
+        self._task = None
+        self._closing = False
+        try:
+            await self.flush()
+        finally:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._closing:
+                return
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Aura award flush failed; will retry")
+
+
+__all__ = ['AuraAwardBuffer']
@@ -2,6 +2,7 @@ import sqlite3
 import discord
 from datetime import datetime
 from config import DATABASE_NAME, MODERATION_POINT_CAP, MODERATION_POINT_RESET_DAYS
+from utils.db_pool import Database, get_database
 
 # NOTE: This module now acts as a compatibility layer. The new point system lives in
 # `commands/point_moderation.py`. We retain these functions so existing imports
@@ -11,6 +12,14 @@ from config import DATABASE_NAME, MODERATION_POINT_CAP, MODERATION_POINT_RESET_D
 moderation_points = {}
 last_reset = datetime.utcnow()
 
+def get_db() -> Database:
+    """Shared async handle for DATABASE_NAME.
+
+    Statements run on reused connections in aiosqlite's worker threads, so
+    callers inside coroutines never block the event loop on sqlite I/O.
+    """
+    return get_database(DATABASE_NAME)
+
 def init_db():
     """Initialize legacy tables if still relied upon by old code."""
     try:
@@ -37,6 +46,12 @@ def init_db():
                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        # Keyset pages of the ?appeals listing, newest first: (status, timestamp) for one
+        # status, (timestamp) for all; the rowid tail of each index covers the id tie-break
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_unban_requests_status_time ON unban_requests(status, timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_unban_requests_time ON unban_requests(timestamp)')
+        # Per-user pending checks are served from AppealStore's in-memory index
+        cursor.execute('DROP INDEX IF EXISTS idx_unban_requests_user_status')
         # Keep legacy moderation_points for backward compatibility (not authoritative anymore)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS moderation_points (
@@ -54,10 +69,8 @@ def init_db():
 
 async def log_action(guild_id: int, user_id: int, moderator_id: int, action: str, reason: str):
     """Log moderation actions to legacy table (best effort)."""
-    try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        cursor.execute('''
+    async def insert(conn):
+        await conn.execute('''
             CREATE TABLE IF NOT EXISTS moderation_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 guild_id INTEGER,
@@ -68,18 +81,15 @@ async def log_action(guild_id: int, user_id: int, moderator_id: int, action: str
                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        cursor.execute('''
+        await conn.execute('''
             INSERT INTO moderation_log (guild_id, user_id, moderator_id, action, reason)
             VALUES (?, ?, ?, ?, ?)
         ''', (guild_id, user_id, moderator_id, action, reason))
-        conn.commit()
+
+    try:
+        await get_db().transaction(insert)
     except Exception:
         pass
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 async def add_points(member: discord.Member, points: int, reason: str, moderator: discord.Member | None = None):
     """Compatibility wrapper: route to new point system if available, else legacy in-memory fallback."""
@@ -3,8 +3,10 @@ Database Initialization Utility
 Ensures all required databases exist before bot startup
 """
 import os
+import json
 import sqlite3
 import logging
+from datetime import datetime, timezone
 from pathlib import Path
 
 logger = logging.getLogger("codeverse.database_init")
@@ -33,22 +35,46 @@ def initialize_all_databases():
         logger.error(f"❌ Database initialization failed: {e}")
         return False
 
+# Shift timestamps are whole seconds since the Unix epoch (UTC)
+SHIFTS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS shifts (
+        shift_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        start INTEGER NOT NULL,
+        end INTEGER DEFAULT NULL,
+        start_note TEXT DEFAULT NULL,
+        end_note TEXT DEFAULT NULL,
+        paused BOOLEAN DEFAULT 0,
+        pause_time INTEGER DEFAULT NULL,
+        pause_intervals TEXT DEFAULT '[]'
+    )
+'''
+
+# One row per pause; end is NULL while the pause is ongoing
+SHIFT_PAUSES_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS shift_pauses (
+        pause_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        shift_id INTEGER NOT NULL,
+        start INTEGER NOT NULL,
+        end INTEGER DEFAULT NULL
+    )
+'''
+
+SHIFTS_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_shifts_guild_start ON shifts(guild_id, start)",
+    "CREATE INDEX IF NOT EXISTS idx_shifts_guild_user_start ON shifts(guild_id, user_id, start)",
+    "CREATE INDEX IF NOT EXISTS idx_shifts_open ON shifts(guild_id, user_id) WHERE end IS NULL",
+    "CREATE INDEX IF NOT EXISTS idx_shift_pauses_shift ON shift_pauses(shift_id, end)",
+)
+
 def init_staff_shifts_db():
     """Initialize staff shifts database"""
     db_path = "data/staff_shifts.db"
     
     conn = sqlite3.connect(db_path)
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS shifts (
-            shift_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            start DATETIME NOT NULL,
-            end DATETIME DEFAULT NULL,
-            start_note TEXT DEFAULT NULL,
-            end_note TEXT DEFAULT NULL
-        )
-    ''')
+    conn.execute(SHIFTS_TABLE_SQL)
+    conn.execute(SHIFT_PAUSES_TABLE_SQL)
     
     conn.execute('''
         CREATE TABLE IF NOT EXISTS shift_settings (
@@ -60,8 +86,133 @@ def init_staff_shifts_db():
     
     conn.commit()
     conn.close()
+    migrate_staff_shifts_db(db_path)
     logger.info("✅ staff_shifts.db initialized")
 
+def _legacy_epoch(value):
+    """Convert a stored ISO/SQLite datetime string (or an epoch) to epoch seconds"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        dt = datetime.strptime(text[:19].replace('T', ' '), '%Y-%m-%d %H:%M:%S')
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+def _legacy_intervals(value):
+    try:
+        intervals = json.loads(value) if value else []
+    except (json.JSONDecodeError, TypeError):
+        return '[]'
+    converted = []
+    for interval in intervals:
+        try:
+            start, end = interval
+            converted.append([_legacy_epoch(start), _legacy_epoch(end)])
+        except (TypeError, ValueError):
+            continue
+    return json.dumps(converted)
+
+def _move_pause_intervals(conn):
+    """Copy shifts.pause_intervals JSON (and open pauses) into shift_pauses"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute(
+            "SELECT shift_id, end, paused, pause_time, pause_intervals FROM shifts "
+            "WHERE pause_intervals NOT IN ('[]', '') OR (paused = 1 AND pause_time IS NOT NULL)"
+        ).fetchall()
+        moved = 0
+        for shift_id, end, paused, pause_time, pause_intervals in rows:
+            try:
+                intervals = json.loads(pause_intervals) if pause_intervals else []
+            except (json.JSONDecodeError, TypeError):
+                intervals = []
+            valid = [
+                (shift_id, interval[0], interval[1]) for interval in intervals
+                if isinstance(interval, list) and len(interval) == 2 and None not in interval
+            ]
+            conn.executemany("INSERT INTO shift_pauses (shift_id, start, end) VALUES (?, ?, ?)", valid)
+            moved += len(valid)
+            if paused and pause_time is not None:
+                # Ended while paused: the pause ran until the end of the shift
+                cursor = conn.execute(
+                    "INSERT INTO shift_pauses (shift_id, start, end) SELECT ?, ?, ? "
+                    "WHERE NOT EXISTS (SELECT 1 FROM shift_pauses WHERE shift_id = ? AND end IS NULL)",
+                    (shift_id, pause_time, end, shift_id),
+                )
+                moved += cursor.rowcount
+        conn.execute("UPDATE shifts SET pause_intervals = '[]' WHERE pause_intervals NOT IN ('[]', '')")
+        conn.execute("UPDATE shifts SET paused = 0, pause_time = NULL WHERE end IS NOT NULL AND paused = 1")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return moved
+
+def migrate_staff_shifts_db(db_path="data/staff_shifts.db"):
+    """
+    Bring an existing shifts table up to the current schema: add the pause
+    columns if missing, rewrite ISO string timestamps as epoch integers and
+    move JSON pause intervals into shift_pauses. Safe to run repeatedly.
+    Returns the number of shift rows converted.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        columns = {row[1]: row[2].upper() for row in conn.execute("PRAGMA table_info(shifts)")}
+        if not columns:
+            return 0
+        
+        converted = 0
+        if columns.get('start') != 'INTEGER' or 'pause_intervals' not in columns:
+            select_columns = ", ".join(
+                name if name in columns else default
+                for name, default in (
+                    ('shift_id', 'NULL'), ('guild_id', 'NULL'), ('user_id', 'NULL'),
+                    ('start', 'NULL'), ('end', 'NULL'), ('start_note', 'NULL'), ('end_note', 'NULL'),
+                    ('paused', '0'), ('pause_time', 'NULL'), ('pause_intervals', "'[]'"),
+                )
+            )
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(f"SELECT {select_columns} FROM shifts").fetchall()
+                conn.execute("ALTER TABLE shifts RENAME TO shifts_legacy")
+                conn.execute(SHIFTS_TABLE_SQL)
+                conn.executemany(
+                    "INSERT INTO shifts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (shift_id, guild_id, user_id, _legacy_epoch(start), _legacy_epoch(end),
+                         start_note, end_note, int(bool(paused)), _legacy_epoch(pause_time),
+                         _legacy_intervals(pause_intervals))
+                        for shift_id, guild_id, user_id, start, end, start_note, end_note,
+                            paused, pause_time, pause_intervals in rows
+                    ),
+                )
+                conn.execute("DROP TABLE shifts_legacy")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            converted = len(rows)
+            logger.info(f"🔄 Migrated {converted} shift(s) to epoch timestamps")
+        
+        conn.execute(SHIFT_PAUSES_TABLE_SQL)
+        moved = _move_pause_intervals(conn)
+        if moved:
+            logger.info(f"🔄 Moved {moved} pause(s) into shift_pauses")
+        
+        for statement in SHIFTS_INDEX_SQL:
+            conn.execute(statement)
+        return converted
+    finally:
+        conn.close()
+
 def init_staff_points_db():
     """Initialize staff points (aura) database"""
     db_path = "data/staff_points.db"
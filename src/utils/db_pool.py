@@ -0,0 +1,281 @@
+"""
+Shared SQLite access layer
+Keeps long-lived read connections plus a single writer task per database file,
+so cogs no longer open a new connection (and thread) for every query.
+"""
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+import aiosqlite
+
+logger = logging.getLogger("codeverse.db_pool")
+
+T = TypeVar("T")
+
+# Applied to every connection. WAL lets readers run while the writer commits,
+# NORMAL sync is durable in WAL mode except on power loss of the last commit.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+DEFAULT_READERS = 2
+
+
+class Database:
+    """Pooled readers and one serialized writer for a single .db file"""
+
+    def __init__(self, path: Path, readers: int = DEFAULT_READERS):
+        self.path = Path(path)
+        self.readers = max(1, readers)
+        self._reader_pool: Optional[asyncio.Queue] = None
+        self._reader_conns: list[aiosqlite.Connection] = []
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._open_lock = asyncio.Lock()
+        self._opened = False
+
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.path)
+        for pragma in PRAGMAS:
+            await conn.execute(pragma)
+        return conn
+
+    async def open(self) -> None:
+        """Open the writer and reader connections (idempotent)"""
+        if self._opened:
+            return
+        async with self._open_lock:
+            if self._opened:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = await self._connect()
+            self._write_queue = asyncio.Queue()
+            self._writer_task = asyncio.create_task(self._run_writer(), name=f"db-writer:{self.path.name}")
+            self._reader_pool = asyncio.Queue()
+            for _ in range(self.readers):
+                conn = await self._connect()
+                self._reader_conns.append(conn)
+                self._reader_pool.put_nowait(conn)
+            self._opened = True
+            logger.info(f"Opened {self.path} (1 writer, {self.readers} readers)")
+
+    async def _run_writer(self) -> None:
+        """Apply queued write jobs one at a time, one transaction per job"""
+        assert self._write_queue is not None and self._writer is not None
+        while True:
+            job, future = await self._write_queue.get()
+            if job is None:
+                future.set_result(None)
+                return
+            try:
+                result = await job(self._writer)
+                await self._writer.commit()
+            except Exception as e:
+                try:
+                    await self._writer.rollback()
+                except Exception:
+                    pass
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    # ------------ Reads ------------
+
+    async def _read(self, sql: str, params: Sequence[Any], one: bool):
+        await self.open()
+        assert self._reader_pool is not None
+        conn = await self._reader_pool.get()
+        try:
+            async with conn.execute(sql, params) as cursor:
+                if one:
+                    return await cursor.fetchone()
+                return await cursor.fetchall()
+        finally:
+            self._reader_pool.put_nowait(conn)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()):
+        """Run a read query on a pooled connection and return the first row"""
+        return await self._read(sql, params, one=True)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> list:
+        """Run a read query on a pooled connection and return all rows"""
+        return list(await self._read(sql, params, one=False))
+
+    # ------------ Writes ------------
+
+    async def transaction(self, job: Callable[[aiosqlite.Connection], Awaitable[T]]) -> T:
+        """
+        Run ``job(conn)`` on the writer connection inside one transaction.
+        The job is committed when it returns and rolled back if it raises.
+        """
+        await self.open()
+        assert self._write_queue is not None
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((job, future))
+        return await future
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> Optional[int]:
+        """Run a single write statement and return the cursor's lastrowid"""
+        async def job(conn: aiosqlite.Connection):
+            async with conn.execute(sql, params) as cursor:
+                return cursor.lastrowid
+        return await self.transaction(job)
+
+    async def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> None:
+        """Run a write statement for every parameter set in one transaction"""
+        rows = list(seq_of_params)
+        if not rows:
+            return
+
+        async def job(conn: aiosqlite.Connection):
+            await conn.executemany(sql, rows)
+        await self.transaction(job)
+
+    async def close(self) -> None:
+        """Drain pending writes and close every connection"""
+        if not self._opened:
+            return
+        assert self._write_queue is not None
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((None, future))
+        await future
+        for conn in [self._writer, *self._reader_conns]:
+            try:
+                await conn.close()  # type: ignore[union-attr]
+            except Exception as e:
+                logger.warning(f"Error closing connection to {self.path}: {e}")
+        self._reader_conns.clear()
+        self._writer = None
+        self._opened = False
+
+
+class BatchWriter:
+    """
+    Group commit for single-row writes.
+
+    Items submitted within ``max_delay`` seconds (or until ``max_batch`` items
+    are waiting) are handed to ``flush(conn, items)`` together and written in
+    one transaction on the database's writer. ``flush`` returns one result per
+    item, which is delivered back to each submitter.
+    """
+
+    def __init__(self, db: Database, flush: Callable[[aiosqlite.Connection, List[Any]], Awaitable[Optional[List[Any]]]],
+                 max_batch: int = 200, max_delay: float = 0.005, name: str = "batch"):
+        self.db = db
+        self.flush_fn = flush
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.name = name
+        self._pending: List[tuple] = []
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit_nowait(self, item) -> asyncio.Future:
+        """Queue an item and return a future for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"batch-writer:{self.name}")
+        return future
+
+    async def submit(self, item):
+        """Queue an item and wait until its batch is committed"""
+        return await self.submit_nowait(item)
+
+    def submit_background(self, item) -> None:
+        """Queue an item without waiting; failures are logged"""
+        self.submit_nowait(item).add_done_callback(self._log_failure)
+
+    def _log_failure(self, future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Batch write ({self.name}) failed: {future.exception()}")
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_items.wait()
+            if not self._full.is_set():
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_once()
+            if self._closing and not self._pending:
+                return
+
+    async def _flush_once(self) -> None:
+        batch = self._pending[:self.max_batch]
+        del self._pending[:self.max_batch]
+        if len(self._pending) < self.max_batch:
+            self._full.clear()
+        if not self._pending:
+            self._has_items.clear()
+        if not batch:
+            return
+        items = [item for item, _ in batch]
+        try:
+            results = await self.db.transaction(lambda conn: self.flush_fn(conn, items))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        if results is None:
+            results = [None] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Write everything still pending and stop the flush task"""
+        self._closing = True
+        if self._task and not self._task.done():
+            self._has_items.set()
+            self._full.set()
+            await self._task
+        while self._pending:
+            await self._flush_once()
+        self._closing = False
+
+
+_databases: Dict[Path, Database] = {}
+
+
+def get_database(path, readers: int = DEFAULT_READERS) -> Database:
+    """Return the shared Database for ``path``, creating it on first use"""
+    key = Path(path).resolve()
+    db = _databases.get(key)
+    if db is None:
+        db = Database(Path(path), readers=readers)
+        _databases[key] = db
+    return db
+
+
+async def close_all() -> None:
+    """Close every shared database (called on bot shutdown)"""
+    for db in list(_databases.values()):
+        try:
+            await db.close()
+        except Exception as e:
+            logger.error(f"Failed to close database {db.path}: {e}")
+    _databases.clear()
+
+
+__all__ = ['Database', 'BatchWriter', 'get_database', 'close_all']
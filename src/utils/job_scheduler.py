@@ -0,0 +1,229 @@
+"""
+Persistent job scheduler
+Timed moderation actions (tempban unbans, mute expiry, temporary roles) are
+rows in a scheduled_jobs table and entries in one DeadlineScheduler heap, so
+a single timer task waits for the next due job however many are pending,
+and a restart reloads them instead of losing them. Due jobs go through a
+small bounded queue to a fixed pool of workers, which keeps a backlog of
+overdue jobs after downtime from firing all at once. A job whose handler
+raises is retried with exponential backoff and dropped after max_attempts.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+from utils.db_pool import Database
+from utils.scheduler import DeadlineScheduler
+
+logger = logging.getLogger("codeverse.job_scheduler")
+
+# Seconds before the first retry; doubles per attempt up to RETRY_MAX
+RETRY_BASE = 30.0
+RETRY_MAX = 3600.0
+
+JOBS_SQL = """
+    CREATE TABLE IF NOT EXISTS scheduled_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        ref_id INTEGER NOT NULL DEFAULT 0,
+        due REAL NOT NULL,
+        reason TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        UNIQUE (kind, guild_id, user_id, ref_id)
+    )
+"""
+
+JobKey = Tuple[str, int, int, int]  # (kind, guild_id, user_id, ref_id)
+
+
+@dataclass(slots=True)
+class Job:
+    id: int
+    kind: str
+    guild_id: int
+    user_id: int
+    ref_id: int  # e.g. the role id for a role removal, 0 when unused
+    due: float
+    reason: Optional[str] = None
+    attempts: int = 0
+
+    @property
+    def key(self) -> JobKey:
+        return (self.kind, self.guild_id, self.user_id, self.ref_id)
+
+
+Handler = Callable[[Job], Awaitable[None]]
+
+
+class JobScheduler:
+    """Durable one-shot jobs, dispatched by kind to registered handlers"""
+
+    def __init__(self, db: Database, *, name: str = "jobs", concurrency: int = 5, max_attempts: int = 5):
+        self.db = db
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.handlers: Dict[str, Handler] = {}
+        self._jobs: Dict[int, Job] = {}
+        self._ids: Dict[JobKey, int] = {}
+        self._timer = DeadlineScheduler(self._dispatch, name=f"{name}-timer")
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self.handlers[kind] = handler
+
+    def get(self, kind: str, guild_id: int, user_id: int, ref_id: int = 0) -> Optional[Job]:
+        job_id = self._ids.get((kind, guild_id, user_id, ref_id))
+        return self._jobs.get(job_id) if job_id is not None else None
+
+    def pending(self, kind: Optional[str] = None, guild_id: Optional[int] = None) -> List[Job]:
+        """Pending jobs, soonest first"""
+        jobs = [job for job in self._jobs.values()
+                if (kind is None or job.kind == kind) and (guild_id is None or job.guild_id == guild_id)]
+        return sorted(jobs, key=lambda job: job.due)
+
+    def _track(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        self._ids[job.key] = job.id
+        self._timer.schedule(job.id, job.due)
+
+    def _untrack(self, job: Job) -> None:
+        """Forget ``job`` unless it has been rescheduled since it was handed out"""
+        if self._jobs.get(job.id) is job:
+            del self._jobs[job.id]
+            self._ids.pop(job.key, None)
+            self._timer.cancel(job.id)
+
+    # -- persistence -----------------------------------------------------
+
+    async def setup(self) -> int:
+        """Create the table and load every pending job (call before start)"""
+        await self.db.execute(JOBS_SQL)
+        rows = await self.db.fetchall(
+            "SELECT id, kind, guild_id, user_id, ref_id, due, reason, attempts FROM scheduled_jobs"
+        )
+        for row in rows:
+            self._track(Job(*row))
+        overdue = sum(1 for row in rows if row[5] <= time.time())
+        if rows:
+            logger.info(f"{self.name}: loaded {len(rows)} pending job(s), {overdue} overdue")
+        return len(rows)
+
+    async def schedule(self, kind: str, guild_id: int, user_id: int, due: float, *,
+                       ref_id: int = 0, reason: Optional[str] = None) -> Job:
+        """Run ``kind`` for the target at ``due`` (Unix time), replacing any pending job with the same target"""
+        async def upsert(conn: aiosqlite.Connection) -> int:
+            await conn.execute("""
+                INSERT INTO scheduled_jobs (kind, guild_id, user_id, ref_id, due, reason)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (kind, guild_id, user_id, ref_id) DO UPDATE SET
+                    due = excluded.due, reason = excluded.reason, attempts = 0, last_error = NULL
+            """, (kind, guild_id, user_id, ref_id, due, reason))
+            async with conn.execute(
+                "SELECT id FROM scheduled_jobs WHERE kind = ? AND guild_id = ? AND user_id = ? AND ref_id = ?",
+                (kind, guild_id, user_id, ref_id),
+            ) as cursor:
+                return (await cursor.fetchone())[0]
+
+        job = Job(await self.db.transaction(upsert), kind, guild_id, user_id, ref_id, due, reason)
+        self._track(job)
+        return job
+
+    async def cancel(self, kind: str, guild_id: int, user_id: int, ref_id: int = 0) -> bool:
+        """Drop the pending job for this target; False if there was none"""
+        job = self.get(kind, guild_id, user_id, ref_id)
+        await self.db.execute(
+            "DELETE FROM scheduled_jobs WHERE kind = ? AND guild_id = ? AND user_id = ? AND ref_id = ?",
+            (kind, guild_id, user_id, ref_id),
+        )
+        if job is None:
+            return False
+        self._untrack(job)
+        return True
+
+    # -- execution -------------------------------------------------------
+
+    def start(self) -> None:
+        if self._queue is None:
+            # Small buffer: the timer waits on a full queue instead of draining the heap
+            self._queue = asyncio.Queue(maxsize=self.concurrency)
+            self._workers = [asyncio.create_task(self._work(), name=f"{self.name}-worker-{i}")
+                             for i in range(self.concurrency)]
+        self._timer.start()
+
+    async def close(self) -> None:
+        """Stop the timer and workers; unfinished jobs stay in the table for the next start"""
+        await self._timer.stop()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def _dispatch(self, job_id: int) -> None:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            await self._queue.put(job)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run_job(job)
+            except Exception:
+                logger.exception(f"{self.name}: bookkeeping for job {job.id} failed")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: Job) -> None:
+        if self._jobs.get(job.id) is not job:
+            return  # Cancelled or rescheduled while queued
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise LookupError(f"no handler registered for {job.kind!r}")
+            await handler(job)
+        except Exception as e:
+            await self._retry(job, e)
+            return
+
+        # Matching on due leaves a job rescheduled during the handler in place
+        await self.db.execute("DELETE FROM scheduled_jobs WHERE id = ? AND due = ?", (job.id, job.due))
+        self._untrack(job)
+        self.completed += 1
+
+    async def _retry(self, job: Job, error: Exception) -> None:
+        attempts = job.attempts + 1
+        if attempts >= self.max_attempts:
+            logger.error(f"{self.name}: giving up on {job.kind} job {job.id} after {attempts} attempt(s): {error}")
+            await self.db.execute("DELETE FROM scheduled_jobs WHERE id = ? AND due = ?", (job.id, job.due))
+            self._untrack(job)
+            self.failed += 1
+            return
+
+        due = time.time() + min(RETRY_MAX, RETRY_BASE * 2 ** (attempts - 1))
+        logger.warning(f"{self.name}: {job.kind} job {job.id} failed ({error}); retry {attempts} in {due - time.time():.0f}s")
+        await self.db.execute(
+            "UPDATE scheduled_jobs SET due = ?, attempts = ?, last_error = ? WHERE id = ? AND due = ?",
+            (due, attempts, str(error)[:500], job.id, job.due),
+        )
+        if self._jobs.get(job.id) is job:
+            self._track(Job(job.id, job.kind, job.guild_id, job.user_id, job.ref_id, due, job.reason, attempts))
+        self.retried += 1
+
+
+__all__ = ['Job', 'JobScheduler']
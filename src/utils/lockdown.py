@@ -0,0 +1,276 @@
+"""
+Server lockdown engine
+Locks every text channel by denying Send Messages to @everyone, and lifts
+it again. Permission edits run through a small pool of workers: Discord
+rate-limits overwrite edits per channel, so edits to different channels can
+overlap, and the pool stays well inside the global request limit.
+
+Before the first edit, each channel's original @everyone Send Messages
+value is written to lockdown_channels. Unlocking restores that value
+exactly (a channel that had no overwrite ends up with none), rather than
+resetting it to "inherit". Per-channel progress is written back in batches,
+so if a run is interrupted, running the same command again picks up the
+channels that are left.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiosqlite
+import discord
+
+from utils.db_pool import Database
+
+logger = logging.getLogger("codeverse.lockdown")
+
+# Channel permission edits in flight at once
+LOCKDOWN_CONCURRENCY = 10
+# Seconds between checkpoint writes and progress callbacks
+CHECKPOINT_INTERVAL = 2.0
+
+LOCKDOWN_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS lockdown_runs (
+        guild_id INTEGER PRIMARY KEY,
+        phase TEXT NOT NULL,
+        started_by INTEGER,
+        reason TEXT,
+        started_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS lockdown_channels (
+        guild_id INTEGER NOT NULL,
+        channel_id INTEGER NOT NULL,
+        had_overwrite INTEGER NOT NULL,
+        original_send INTEGER,
+        state TEXT NOT NULL DEFAULT 'pending',
+        PRIMARY KEY (guild_id, channel_id)
+    ) WITHOUT ROWID
+    """,
+)
+
+# Run phases
+LOCKING = "locking"
+LOCKED = "locked"
+UNLOCKING = "unlocking"
+
+# Channel states
+PENDING = "pending"      # snapshotted, not confirmed locked yet (may already be edited)
+CHANNEL_LOCKED = "locked"
+FAILED = "failed"        # the lock edit failed, so the channel was never changed
+
+
+@dataclass(slots=True)
+class LockdownResult:
+    total: int
+    resumed: bool = False
+    done: List[int] = field(default_factory=list)
+    failed: Dict[int, str] = field(default_factory=dict)
+    missing: List[int] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return len(self.done) + len(self.failed) + len(self.missing)
+
+
+class LockdownConflict(Exception):
+    """lock() refused: the guild already has a lockdown in ``phase`` (LOCKED or UNLOCKING)"""
+
+    def __init__(self, phase: str):
+        super().__init__(f"a lockdown is already {phase}")
+        self.phase = phase
+
+
+Progress = Callable[[LockdownResult], Awaitable[None]]
+# (channel_id, had_overwrite, original_send)
+Snapshot = Tuple[int, bool, Optional[bool]]
+
+
+def _to_db(value: Optional[bool]) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+def _from_db(value: Optional[int]) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+class LockdownEngine:
+    """Parallel, checkpointed lockdown and unlockdown of a guild's text channels"""
+
+    def __init__(self, db: Database, *, concurrency: int = LOCKDOWN_CONCURRENCY):
+        self.db = db
+        self.concurrency = max(1, concurrency)
+        # One lock or unlock at a time per guild
+        self._running: Dict[int, asyncio.Lock] = {}
+
+    async def setup(self) -> List[Tuple[int, str]]:
+        """Create the checkpoint tables; returns runs left unfinished by a restart"""
+        for sql in LOCKDOWN_SQL:
+            await self.db.execute(sql)
+        interrupted = await self.db.fetchall(
+            "SELECT guild_id, phase FROM lockdown_runs WHERE phase IN (?, ?)", (LOCKING, UNLOCKING)
+        )
+        for guild_id, phase in interrupted:
+            logger.warning(f"Lockdown in guild {guild_id} was interrupted while {phase}; run the command again to resume")
+        return interrupted
+
+    async def phase(self, guild_id: int) -> Optional[str]:
+        row = await self.db.fetchone("SELECT phase FROM lockdown_runs WHERE guild_id = ?", (guild_id,))
+        return row[0] if row else None
+
+    def _lock_for(self, guild_id: int) -> asyncio.Lock:
+        return self._running.setdefault(guild_id, asyncio.Lock())
+
+    # -- lock ------------------------------------------------------------
+
+    async def lock(self, guild: discord.Guild, *, moderator_id: int, reason: str,
+                   progress: Optional[Progress] = None) -> LockdownResult:
+        """
+        Lock every text channel, or resume an interrupted lock. Raises
+        LockdownConflict if the guild is already locked or an unlock is unfinished.
+        """
+        async with self._lock_for(guild.id):
+            phase = await self.phase(guild.id)
+            if phase in (LOCKED, UNLOCKING):
+                raise LockdownConflict(phase)
+            resumed = phase == LOCKING
+            if not resumed:
+                await self._snapshot(guild, moderator_id, reason)
+
+            rows = await self.db.fetchall(
+                "SELECT channel_id FROM lockdown_channels WHERE guild_id = ? AND state = ?", (guild.id, PENDING)
+            )
+            result = LockdownResult(total=len(rows), resumed=resumed)
+
+            async def apply(channel: discord.TextChannel, _row) -> None:
+                overwrite = channel.overwrites_for(guild.default_role)
+                overwrite.send_messages = False
+                await channel.set_permissions(guild.default_role, overwrite=overwrite, reason=reason)
+
+            await self._run(guild, [(row[0], None) for row in rows], apply, result, progress,
+                            done_sql="UPDATE lockdown_channels SET state = 'locked' WHERE guild_id = ? AND channel_id = ?",
+                            failed_sql="UPDATE lockdown_channels SET state = 'failed' WHERE guild_id = ? AND channel_id = ?")
+            await self.db.execute("UPDATE lockdown_runs SET phase = ? WHERE guild_id = ?", (LOCKED, guild.id))
+            return result
+
+    async def _snapshot(self, guild: discord.Guild, moderator_id: int, reason: str) -> None:
+        """Record the run and every channel's original overwrite before anything is edited"""
+        role = guild.default_role
+        snapshots: List[Snapshot] = []
+        for channel in guild.text_channels:
+            overwrite = channel.overwrites.get(role)
+            snapshots.append((channel.id, overwrite is not None, overwrite.send_messages if overwrite else None))
+
+        async def write(conn: aiosqlite.Connection) -> None:
+            await conn.execute("DELETE FROM lockdown_channels WHERE guild_id = ?", (guild.id,))
+            await conn.executemany(
+                "INSERT INTO lockdown_channels (guild_id, channel_id, had_overwrite, original_send) VALUES (?, ?, ?, ?)",
+                [(guild.id, channel_id, int(had), _to_db(send)) for channel_id, had, send in snapshots],
+            )
+            await conn.execute(
+                "INSERT OR REPLACE INTO lockdown_runs (guild_id, phase, started_by, reason, started_at) VALUES (?, ?, ?, ?, ?)",
+                (guild.id, LOCKING, moderator_id, reason, time.time()),
+            )
+
+        await self.db.transaction(write)
+
+    # -- unlock ----------------------------------------------------------
+
+    async def unlock(self, guild: discord.Guild, *, reason: str,
+                     progress: Optional[Progress] = None) -> Optional[LockdownResult]:
+        """Restore every channel the lockdown touched; None if there is no lockdown"""
+        async with self._lock_for(guild.id):
+            phase = await self.phase(guild.id)
+            if phase is None:
+                return None
+            resumed = phase == UNLOCKING
+            if not resumed:
+                await self.db.execute("UPDATE lockdown_runs SET phase = ? WHERE guild_id = ?", (UNLOCKING, guild.id))
+
+            # Pending channels may have been edited before an interruption; restoring them is harmless
+            rows = await self.db.fetchall(
+                "SELECT channel_id, had_overwrite, original_send FROM lockdown_channels WHERE guild_id = ? AND state IN (?, ?)",
+                (guild.id, PENDING, CHANNEL_LOCKED),
+            )
+            result = LockdownResult(total=len(rows), resumed=resumed)
+
+            async def apply(channel: discord.TextChannel, row) -> None:
+                had_overwrite, original_send = row
+                overwrite = channel.overwrites_for(guild.default_role)
+                overwrite.send_messages = _from_db(original_send)
+                if not had_overwrite and overwrite.is_empty():
+                    # The lockdown created this overwrite; remove it entirely
+                    await channel.set_permissions(guild.default_role, overwrite=None, reason=reason)
+                else:
+                    await channel.set_permissions(guild.default_role, overwrite=overwrite, reason=reason)
+
+            delete_sql = "DELETE FROM lockdown_channels WHERE guild_id = ? AND channel_id = ?"
+            await self._run(guild, [(row[0], (bool(row[1]), row[2])) for row in rows], apply, result, progress,
+                            done_sql=delete_sql, failed_sql=None)
+
+            if not result.failed:
+                # Every channel is back; drop the checkpoint (including channels the lock never changed)
+                async def finish(conn: aiosqlite.Connection) -> None:
+                    await conn.execute("DELETE FROM lockdown_channels WHERE guild_id = ?", (guild.id,))
+                    await conn.execute("DELETE FROM lockdown_runs WHERE guild_id = ?", (guild.id,))
+                await self.db.transaction(finish)
+            return result
+
+    # -- shared worker pool -----------------------------------------------
+
+    async def _run(self, guild: discord.Guild, items: List[Tuple[int, object]],
+                   apply: Callable[[discord.TextChannel, object], Awaitable[None]], result: LockdownResult,
+                   progress: Optional[Progress], *, done_sql: str, failed_sql: Optional[str]) -> None:
+        pending = iter(items)
+        done_rows: List[Tuple[int, int]] = []
+        failed_rows: List[Tuple[int, int]] = []
+        last_checkpoint = time.monotonic()
+        checkpoint_lock = asyncio.Lock()
+
+        async def checkpoint(final: bool = False) -> None:
+            nonlocal last_checkpoint
+            if not final and time.monotonic() - last_checkpoint < CHECKPOINT_INTERVAL:
+                return
+            async with checkpoint_lock:
+                last_checkpoint = time.monotonic()
+                done, failed = done_rows[:], failed_rows[:]
+                del done_rows[:len(done)], failed_rows[:len(failed)]
+                if done or failed:
+                    async def write(conn: aiosqlite.Connection) -> None:
+                        if done:
+                            await conn.executemany(done_sql, done)
+                        if failed and failed_sql:
+                            await conn.executemany(failed_sql, failed)
+                    await self.db.transaction(write)
+                if progress is not None:
+                    try:
+                        await progress(result)
+                    except Exception as e:
+                        logger.debug(f"Lockdown progress update failed: {e}")
+
+        async def worker() -> None:
+            # Workers share one iterator: a fixed pool, not a task per channel
+            for channel_id, row in pending:
+                channel = guild.get_channel(channel_id)
+                if channel is None:
+                    # Deleted since the snapshot: nothing left to change
+                    result.missing.append(channel_id)
+                    done_rows.append((guild.id, channel_id))
+                else:
+                    try:
+                        await apply(channel, row)
+                        result.done.append(channel_id)
+                        done_rows.append((guild.id, channel_id))
+                    except discord.HTTPException as e:
+                        result.failed[channel_id] = e.text or str(e)
+                        failed_rows.append((guild.id, channel_id))
+                await checkpoint()
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(self.concurrency, len(items))))))
+        await checkpoint(final=True)
+
+
+__all__ = ['LockdownEngine', 'LockdownResult', 'LockdownConflict', 'LOCKING', 'LOCKED', 'UNLOCKING']
@@ -0,0 +1,63 @@
+"""
+Event loop lag probe
+Measures how late the event loop wakes a sleeping task. Blocking calls inside
+coroutines (sync sqlite3, file I/O) show up directly as lag here.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger("codeverse.loop_lag")
+
+
+class LoopLagProbe:
+    """Background task that samples event loop scheduling delay"""
+
+    def __init__(self, interval: float = 0.05, window: int = 1200, warn_ms: float = 250.0):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop (no-op if already running)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="loop-lag-probe")
+
+    def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def reset(self) -> None:
+        self.samples.clear()
+        self.max_lag_ms = 0.0
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                expected = time.perf_counter() + self.interval
+                await asyncio.sleep(self.interval)
+                lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+                self.samples.append(lag_ms)
+                if lag_ms > self.max_lag_ms:
+                    self.max_lag_ms = lag_ms
+                if lag_ms >= self.warn_ms:
+                    logger.warning(f"Event loop blocked for {lag_ms:.0f}ms")
+        except asyncio.CancelledError:
+            pass
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return mean/p99/max lag in milliseconds over the current window"""
+        if not self.samples:
+            return {"samples": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": self.max_lag_ms}
+        ordered = sorted(self.samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return {
+            "samples": len(ordered),
+            "mean_ms": sum(ordered) / len(ordered),
+            "p99_ms": p99,
+            "max_ms": self.max_lag_ms,
+        }
@@ -0,0 +1,162 @@
+"""
+Mass ban engine
+Bans a list of user IDs as discord.Object, so no user is fetched first.
+Uses the guild bulk-ban endpoint (up to 200 IDs per request) when the
+library has it and the bot has Manage Server; otherwise, or if Discord
+refuses it, bans one by one through a few concurrent workers. discord.py
+queues requests behind the ban route's rate limit, so a small pool keeps
+requests in flight without tripping it. Every ID ends up banned, failed
+(with the reason) or skipped.
+"""
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import discord
+
+logger = logging.getLogger("codeverse.mass_ban")
+
+# IDs per bulk-ban request (Discord's maximum)
+BULK_BAN_LIMIT = 200
+# Concurrent single bans when the bulk endpoint can't be used
+BAN_CONCURRENCY = 5
+# Seconds between progress callbacks
+PROGRESS_INTERVAL = 2.0
+
+_SNOWFLAKE = re.compile(r"\d{15,20}")
+
+
+@dataclass(slots=True)
+class MassBanResult:
+    total: int
+    banned: List[int] = field(default_factory=list)
+    failed: Dict[int, str] = field(default_factory=dict)
+    skipped: Dict[int, str] = field(default_factory=dict)
+    bulk_requests: int = 0
+    single_requests: int = 0
+
+    @property
+    def processed(self) -> int:
+        return len(self.banned) + len(self.failed) + len(self.skipped)
+
+    def report(self) -> str:
+        """One line per ID: ``<id>\\t<outcome>``"""
+        lines = [f"{user_id}\tbanned" for user_id in self.banned]
+        lines += [f"{user_id}\tfailed: {reason}" for user_id, reason in self.failed.items()]
+        lines += [f"{user_id}\tskipped: {reason}" for user_id, reason in self.skipped.items()]
+        return "\n".join(lines) + "\n"
+
+
+Progress = Callable[[MassBanResult], Awaitable[None]]
+
+
+def parse_user_ids(text: str) -> List[int]:
+    """User IDs in ``text`` (any separators, mentions allowed), de-duplicated in order"""
+    return list(dict.fromkeys(int(match) for match in _SNOWFLAKE.findall(text)))
+
+
+def _failure_reason(error: discord.HTTPException) -> str:
+    if isinstance(error, discord.NotFound):
+        return "unknown user"
+    if isinstance(error, discord.Forbidden):
+        return "missing permissions or role hierarchy"
+    return error.text or str(error)
+
+
+class _Reporter:
+    """Calls ``progress`` at most once per PROGRESS_INTERVAL, and always at the end"""
+
+    def __init__(self, progress: Optional[Progress], result: MassBanResult):
+        self.progress = progress
+        self.result = result
+        self.last = time.monotonic()
+
+    async def tick(self, final: bool = False) -> None:
+        if self.progress is None:
+            return
+        now = time.monotonic()
+        if final or now - self.last >= PROGRESS_INTERVAL:
+            self.last = now
+            try:
+                await self.progress(self.result)
+            except Exception as e:
+                logger.debug(f"Mass ban progress update failed: {e}")
+
+
+async def _bulk_ban(guild: discord.Guild, user_ids: List[int], reason: str,
+                    result: MassBanResult, reporter: _Reporter) -> List[int]:
+    """Ban in chunks through the bulk endpoint; returns the IDs it could not attempt"""
+    for start in range(0, len(user_ids), BULK_BAN_LIMIT):
+        chunk = user_ids[start:start + BULK_BAN_LIMIT]
+        try:
+            response = await guild.bulk_ban([discord.Object(id=user_id) for user_id in chunk], reason=reason)
+        except discord.Forbidden:
+            # Endpoint refused as a whole: leave this chunk and the rest to single bans
+            return user_ids[start:]
+        except discord.HTTPException as e:
+            # Discord errors the whole request when none of the chunk could be banned
+            result.bulk_requests += 1
+            for user_id in chunk:
+                result.failed[user_id] = f"not banned ({e.text or e.status})"
+            await reporter.tick()
+            continue
+        result.bulk_requests += 1
+        result.banned.extend(user.id for user in response.banned)
+        for user in response.failed:
+            result.failed[user.id] = "not banned (already banned, unknown or above the bot)"
+        await reporter.tick()
+    return []
+
+
+async def _single_bans(guild: discord.Guild, user_ids: List[int], reason: str, result: MassBanResult,
+                       reporter: _Reporter, concurrency: int) -> None:
+    pending = iter(user_ids)
+
+    async def worker() -> None:
+        # Workers share one iterator: a fixed pool, not a task per ID
+        for user_id in pending:
+            result.single_requests += 1
+            try:
+                await guild.ban(discord.Object(id=user_id), reason=reason)
+                result.banned.append(user_id)
+            except discord.HTTPException as e:
+                result.failed[user_id] = _failure_reason(e)
+            await reporter.tick()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(user_ids))))))
+
+
+async def mass_ban(guild: discord.Guild, user_ids: Iterable[int], *, reason: str,
+                   protected: Optional[Dict[int, str]] = None, progress: Optional[Progress] = None,
+                   concurrency: int = BAN_CONCURRENCY) -> MassBanResult:
+    """
+    Ban every ID in ``user_ids`` from ``guild``. ``protected`` maps IDs that
+    must not be banned to the reason shown for skipping them; ``progress`` is
+    awaited with the running result every couple of seconds and at the end.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    protected = protected or {}
+    result = MassBanResult(total=len(user_ids))
+    reporter = _Reporter(progress, result)
+
+    targets = []
+    for user_id in user_ids:
+        if user_id in protected:
+            result.skipped[user_id] = protected[user_id]
+        else:
+            targets.append(user_id)
+
+    me = guild.me
+    if targets and hasattr(guild, "bulk_ban") and me is not None and me.guild_permissions.manage_guild:
+        targets = await _bulk_ban(guild, targets, reason, result, reporter)
+    if targets:
+        await _single_bans(guild, targets, reason, result, reporter, concurrency)
+
+    await reporter.tick(final=True)
+    return result
+
+
+__all__ = ['BULK_BAN_LIMIT', 'MassBanResult', 'parse_user_ids', 'mass_ban']
@@ -0,0 +1,153 @@
+"""
+Central message router
+Classifies every message once (bot/human, DM/guild, channel, mentions,
+reply, keywords) and dispatches it only to the handlers whose declared
+interests match, instead of each cog running its own on_message listener.
+"""
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional
+
+import discord
+
+logger = logging.getLogger("codeverse.message_router")
+
+MessageHandlerFunc = Callable[[discord.Message], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class MessageInfo:
+    """What the router knows about a message after classifying it once"""
+    is_bot: bool
+    is_dm: bool
+    guild_id: Optional[int]
+    channel_id: int
+    author_id: int
+    mention_ids: FrozenSet[int]
+    is_reply: bool
+    keywords: FrozenSet[str]
+
+
+@dataclass
+class MessageInterest:
+    """
+    Which messages a handler wants. All given conditions must hold.
+
+    ``dm``: True for DMs only, False for guild messages only, None for both.
+    ``channels``: only these channel IDs. ``keywords``: at least one of these
+    whole words (case-insensitive). ``predicate``: extra cheap, synchronous check.
+    """
+    humans_only: bool = True
+    dm: Optional[bool] = None
+    channels: Optional[FrozenSet[int]] = None
+    mentions: bool = False
+    reply: bool = False
+    keywords: FrozenSet[str] = frozenset()
+    predicate: Optional[Callable[[MessageInfo], bool]] = None
+
+    def matches(self, info: MessageInfo) -> bool:
+        if self.humans_only and info.is_bot:
+            return False
+        if self.dm is not None and info.is_dm != self.dm:
+            return False
+        if self.channels is not None and info.channel_id not in self.channels:
+            return False
+        if self.mentions and not info.mention_ids:
+            return False
+        if self.reply and not info.is_reply:
+            return False
+        if self.keywords and self.keywords.isdisjoint(info.keywords):
+            return False
+        if self.predicate is not None and not self.predicate(info):
+            return False
+        return True
+
+
+@dataclass
+class HandlerStats:
+    calls: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+@dataclass
+class _Route:
+    name: str
+    handler: MessageHandlerFunc
+    interest: MessageInterest
+    stats: HandlerStats = field(default_factory=HandlerStats)
+
+
+class MessageRouter:
+    """Single on_message entry point shared by all cogs"""
+
+    def __init__(self):
+        self._routes: Dict[str, _Route] = {}
+        self._keyword_re: Optional[re.Pattern] = None
+        self.messages = 0
+
+    def register(self, name: str, handler: MessageHandlerFunc, interest: MessageInterest) -> None:
+        """Register (or replace) a handler, usually from a cog's cog_load"""
+        self._routes[name] = _Route(name, handler, interest)
+        self._rebuild_keywords()
+
+    def unregister(self, name: str) -> None:
+        """Remove a handler, usually from a cog's cog_unload"""
+        if self._routes.pop(name, None) is not None:
+            self._rebuild_keywords()
+
+    def _rebuild_keywords(self) -> None:
+        words = sorted({word.lower() for route in self._routes.values() for word in route.interest.keywords})
+        self._keyword_re = re.compile(r"\b(" + "|".join(map(re.escape, words)) + r")\b") if words else None
+
+    def classify(self, message: discord.Message) -> MessageInfo:
+        keywords: FrozenSet[str] = frozenset()
+        if self._keyword_re is not None and message.content:
+            keywords = frozenset(self._keyword_re.findall(message.content.lower()))
+        return MessageInfo(
+            is_bot=message.author.bot,
+            is_dm=message.guild is None,
+            guild_id=message.guild.id if message.guild else None,
+            channel_id=message.channel.id,
+            author_id=message.author.id,
+            mention_ids=frozenset(user.id for user in message.mentions),
+            is_reply=message.reference is not None and message.reference.message_id is not None,
+            keywords=keywords,
+        )
+
+    async def dispatch(self, message: discord.Message) -> None:
+        """on_message listener: classify once, run matching handlers concurrently"""
+        self.messages += 1
+        info = self.classify(message)
+        matched = [route for route in self._routes.values() if route.interest.matches(info)]
+        if not matched:
+            return
+        if len(matched) == 1:
+            await self._run(matched[0], message)
+        else:
+            await asyncio.gather(*(self._run(route, message) for route in matched))
+
+    async def _run(self, route: _Route, message: discord.Message) -> None:
+        started = time.perf_counter()
+        try:
+            await route.handler(message)
+        except Exception:
+            route.stats.errors += 1
+            logger.exception(f"Message handler {route.name} failed")
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            route.stats.calls += 1
+            route.stats.total_ms += elapsed_ms
+            if elapsed_ms > route.stats.max_ms:
+                route.stats.max_ms = elapsed_ms
+
+    def stats(self) -> Dict[str, HandlerStats]:
+        """Per-handler call counts and timings"""
+        return {name: route.stats for name, route in self._routes.items()}
+
+
+__all__ = ['MessageInfo', 'MessageInterest', 'MessageRouter', 'HandlerStats']
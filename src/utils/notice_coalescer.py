@@ -0,0 +1,108 @@
+"""
+Per-channel notice coalescer
+Short-lived bot notices (for example "User is AFK") are keyed by channel and
+subject. The first post for a key sends a message; later posts for the same
+key while that message is still up only replace its embed, and the edits
+are batched so a burst costs one edit rather than one message each. The
+message is deleted once nothing has been posted for its lifetime.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Hashable, Optional
+
+import discord
+
+logger = logging.getLogger("codeverse.notice_coalescer")
+
+
+class _Notice:
+    __slots__ = ("message", "embed", "expires", "dirty", "task")
+
+    def __init__(self, embed: discord.Embed, expires: float):
+        self.message: Optional[discord.Message] = None
+        self.embed = embed
+        self.expires = expires
+        self.dirty = False
+        self.task: Optional[asyncio.Task] = None
+
+
+class NoticeCoalescer:
+    """One live message per key; repeat posts edit it instead of sending again"""
+
+    def __init__(self, edit_delay: float = 2.0, *, name: str = "notices"):
+        self.edit_delay = edit_delay
+        self.name = name
+        self._notices: Dict[Hashable, _Notice] = {}
+        # Outbound calls, for benchmarks and debugging
+        self.sent = 0
+        self.edited = 0
+        self.deleted = 0
+
+    def __len__(self) -> int:
+        return len(self._notices)
+
+    def post(self, channel: discord.abc.Messageable, key: Hashable, embed: discord.Embed, lifetime: float) -> None:
+        """Show ``embed`` under ``key`` for ``lifetime`` seconds after the latest post"""
+        expires = time.monotonic() + lifetime
+        notice = self._notices.get(key)
+        if notice is not None:
+            notice.embed = embed
+            notice.expires = expires
+            notice.dirty = True
+            return
+        notice = _Notice(embed, expires)
+        self._notices[key] = notice
+        notice.task = asyncio.create_task(self._run(channel, key, notice), name=f"{self.name}:{key}")
+
+    async def _run(self, channel: discord.abc.Messageable, key: Hashable, notice: _Notice) -> None:
+        try:
+            try:
+                # Posts that arrive while this is in flight mark the notice dirty
+                notice.message = await channel.send(embed=notice.embed)
+                self.sent += 1
+            except discord.HTTPException:
+                return  # Ignore if we can't send messages
+
+            while True:
+                remaining = notice.expires - time.monotonic()
+                if remaining <= 0 and not notice.dirty:
+                    break
+                await asyncio.sleep(self.edit_delay if notice.dirty else min(self.edit_delay, remaining))
+                if notice.dirty:
+                    # Everything posted since the last edit goes out in one edit
+                    notice.dirty = False
+                    try:
+                        await notice.message.edit(embed=notice.embed)
+                        self.edited += 1
+                    except discord.NotFound:
+                        return  # Deleted by someone else
+                    except discord.HTTPException as e:
+                        logger.debug(f"{self.name}: edit failed: {e}")
+
+            await self._delete(notice)
+        finally:
+            if self._notices.get(key) is notice:
+                del self._notices[key]
+
+    async def _delete(self, notice: _Notice) -> None:
+        if notice.message is None:
+            return
+        try:
+            await notice.message.delete()
+            self.deleted += 1
+        except discord.HTTPException:
+            pass
+
+    async def close(self) -> None:
+        """Stop all timers and remove the notices still showing"""
+        notices = list(self._notices.values())
+        self._notices.clear()
+        for notice in notices:
+            if notice.task:
+                notice.task.cancel()
+        for notice in notices:
+            await self._delete(notice)
+
+
+__all__ = ['NoticeCoalescer']
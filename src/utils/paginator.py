@@ -0,0 +1,96 @@
+"""
+Keyset-paginated embed view
+Shows one page of an ordered listing at a time with Previous/Next buttons.
+Each button press runs one query for the rows after the last key of the
+previous page (``WHERE (sort_key, id) < (?, ?) ... LIMIT n``) instead of
+loading the whole listing up front, and only the visible rows are handed
+to the renderer, so member and user lookups happen per page.
+"""
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+import discord
+
+logger = logging.getLogger("codeverse.paginator")
+
+# fetch(after, limit): up to ``limit`` rows that sort after the keyset cursor ``after`` (None = from the start)
+FetchPage = Callable[[Optional[Any], int], Awaitable[Sequence[Any]]]
+# render(rows, page): the embed for one page, pages numbered from 1
+RenderPage = Callable[[Sequence[Any], int], Awaitable[discord.Embed]]
+
+
+class KeysetPaginator(discord.ui.View):
+    """Previous/Next buttons over a keyset-paginated listing"""
+
+    def __init__(self, fetch: FetchPage, render: RenderPage, key: Callable[[Any], Any], *,
+                 page_size: int = 10, author_id: Optional[int] = None, timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.fetch = fetch
+        self.render = render
+        self.key = key
+        self.page_size = max(1, page_size)
+        self.author_id = author_id
+        # Keyset cursor each visited page starts after; going back re-runs that page's query
+        self._starts: List[Optional[Any]] = [None]
+        self.page = 0
+        self.rows: list = []
+        self.has_next = False
+        self.message: Optional[discord.Message] = None
+
+    async def _load(self) -> discord.Embed:
+        # One extra row tells whether a next page exists
+        rows = list(await self.fetch(self._starts[self.page], self.page_size + 1))
+        self.has_next = len(rows) > self.page_size
+        self.rows = rows[:self.page_size]
+        if self.has_next and len(self._starts) == self.page + 1:
+            self._starts.append(self.key(self.rows[-1]))
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = not self.has_next
+        return await self.render(self.rows, self.page + 1)
+
+    async def start(self, send: Callable[..., Awaitable[discord.Message]]) -> bool:
+        """Send the first page with ``send`` (e.g. ``ctx.reply``); False if the listing is empty"""
+        embed = await self._load()
+        if not self.rows:
+            self.stop()
+            return False
+        if not self.has_next:
+            # Everything fits on one page: no buttons to keep alive
+            self.stop()
+            await send(embed=embed)
+            return True
+        self.message = await send(embed=embed, view=self)
+        return True
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if self.author_id is not None and interaction.user.id != self.author_id:
+            await interaction.response.send_message("Only the person who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction: discord.Interaction) -> None:
+        embed = await self._load()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page + 1 < len(self._starts):
+            self.page += 1
+        await self._show(interaction)
+
+    async def on_timeout(self) -> None:
+        self.previous_page.disabled = True
+        self.next_page.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException as e:
+                logger.debug(f"Could not disable paginator buttons: {e}")
+
+
+__all__ = ['KeysetPaginator']
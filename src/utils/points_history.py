@@ -0,0 +1,154 @@
+"""
+Points history writes, daily rollups and retention
+Every points_history insert goes through record_history(), which also bumps
+the matching (guild, user, day, action_type) row of points_daily in the same
+transaction. Stats read points_daily for any date range, so raw history
+older than the retention window can be archived to gzip files and deleted
+without changing any totals.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import aiosqlite
+
+from utils.db_pool import Database
+
+logger = logging.getLogger("codeverse.points_history")
+
+# Raw history rows per archive file (and per delete transaction)
+ARCHIVE_CHUNK_ROWS = 20000
+
+# (guild_id, user_id, moderator_id, points_change, reason, action_type, timestamp)
+HistoryRow = Tuple[int, int, int, int, Optional[str], str, str]
+
+POINTS_DAILY_SQL = """
+    CREATE TABLE IF NOT EXISTS points_daily (
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        action_type TEXT NOT NULL,
+        entries INTEGER NOT NULL DEFAULT 0,
+        points_change INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (guild_id, user_id, day, action_type)
+    ) WITHOUT ROWID
+"""
+
+INSERT_HISTORY_SQL = """
+    INSERT INTO points_history (guild_id, user_id, moderator_id, points_change, reason, action_type, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+DAILY_UPSERT_SQL = """
+    INSERT INTO points_daily (guild_id, user_id, day, action_type, entries, points_change)
+    VALUES (?, ?, ?, ?, 1, ?)
+    ON CONFLICT (guild_id, user_id, day, action_type) DO UPDATE SET
+        entries = entries + 1,
+        points_change = points_change + excluded.points_change
+"""
+
+
+def history_timestamp() -> str:
+    """UTC timestamp in the format of SQLite's CURRENT_TIMESTAMP"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+
+
+async def record_history(conn: aiosqlite.Connection, rows: Sequence[HistoryRow]) -> None:
+    """Insert history rows and fold them into points_daily, in the caller's transaction"""
+    await conn.executemany(INSERT_HISTORY_SQL, rows)
+    await conn.executemany(DAILY_UPSERT_SQL, [
+        (guild_id, user_id, timestamp[:10], action_type, points_change)
+        for guild_id, user_id, _, points_change, _, action_type, timestamp in rows
+    ])
+
+
+async def backfill_daily(db: Database) -> int:
+    """Build points_daily from points_history if it has never been filled"""
+    async def fill(conn: aiosqlite.Connection) -> int:
+        async with conn.execute("SELECT 1 FROM points_daily LIMIT 1") as cursor:
+            if await cursor.fetchone():
+                return 0
+        cursor = await conn.execute("""
+            INSERT INTO points_daily (guild_id, user_id, day, action_type, entries, points_change)
+            SELECT guild_id, user_id, substr(timestamp, 1, 10), action_type, COUNT(*), SUM(points_change)
+            FROM points_history
+            WHERE timestamp IS NOT NULL
+            GROUP BY guild_id, user_id, substr(timestamp, 1, 10), action_type
+        """)
+        return cursor.rowcount
+
+    filled = await db.transaction(fill)
+    if filled:
+        logger.info(f"Backfilled {filled} points_daily row(s) from points_history")
+    return filled
+
+
+async def activity_totals(db: Database, guild_id: int, user_id: int, start_day: str,
+                          end_day: Optional[str] = None) -> List[Tuple[int, int, str]]:
+    """``(entries, points_change, action_type)`` for days in [start_day, end_day], as 'YYYY-MM-DD'"""
+    sql = """
+        SELECT SUM(entries), SUM(points_change), action_type
+        FROM points_daily
+        WHERE guild_id = ? AND user_id = ? AND day >= ?
+    """
+    params: list = [guild_id, user_id, start_day]
+    if end_day is not None:
+        sql += " AND day <= ?"
+        params.append(end_day)
+    return await db.fetchall(sql + " GROUP BY action_type", params)
+
+
+def _write_archive(path: Path, rows: Iterable[tuple]) -> None:
+    """Write rows as gzip'd JSON lines, replacing ``path`` atomically"""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            for row_id, guild_id, user_id, moderator_id, points_change, reason, action_type, timestamp in rows:
+                f.write((json.dumps({
+                    "id": row_id, "guild_id": guild_id, "user_id": user_id, "moderator_id": moderator_id,
+                    "points_change": points_change, "reason": reason, "action_type": action_type,
+                    "timestamp": timestamp,
+                }) + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+
+
+async def archive_history(db: Database, before_day: str, archive_dir: Path,
+                          chunk_rows: int = ARCHIVE_CHUNK_ROWS) -> int:
+    """
+    Move points_history rows dated before ``before_day`` ('YYYY-MM-DD') into
+    gzip files under ``archive_dir``, oldest ids first. Each file is on disk
+    before its rows are deleted; a file is named after its id range, so a run
+    interrupted between the two rewrites the same file instead of duplicating it.
+    """
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archived = 0
+    while True:
+        rows = await db.fetchall("""
+            SELECT id, guild_id, user_id, moderator_id, points_change, reason, action_type, timestamp
+            FROM points_history
+            WHERE timestamp < ?
+            ORDER BY id
+            LIMIT ?
+        """, (before_day, chunk_rows))
+        if not rows:
+            break
+        first_id, last_id = rows[0][0], rows[-1][0]
+        await asyncio.to_thread(_write_archive, archive_dir / f"points_history.{first_id}-{last_id}.jsonl.gz", rows)
+        await db.execute("DELETE FROM points_history WHERE id BETWEEN ? AND ? AND timestamp < ?",
+                         (first_id, last_id, before_day))
+        archived += len(rows)
+    if archived:
+        logger.info(f"Archived {archived} points_history row(s) dated before {before_day}")
+    return archived
+
+
+__all__ = ['POINTS_DAILY_SQL', 'HistoryRow', 'history_timestamp', 'record_history',
+           'backfill_daily', 'activity_totals', 'archive_history']
@@ -0,0 +1,229 @@
+"""
+Order-statistic rank index
+Keeps each guild's staff ordered by (points DESC, total_earned DESC, user_id)
+in memory so rank lookups are O(log n) and a leaderboard page of k entries
+is O(log n + k), instead of COUNT(*) subqueries and full-table scans.
+The owning cog loads it at startup and updates it after every write.
+"""
+import math
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+Key = Tuple[int, int, int]  # (-points, -total_earned, user_id)
+
+
+class SortedKeys:
+    """
+    Sorted list stored as buckets of at most 2 * LOAD keys, with a Fenwick
+    tree over the bucket sizes for positional lookups.
+    """
+
+    LOAD = 256
+
+    def __init__(self, keys: Iterable = ()):
+        ordered = sorted(keys)
+        self._buckets: List[list] = [ordered[i:i + self.LOAD] for i in range(0, len(ordered), self.LOAD)]
+        self._maxes: List = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+        self._rebuild_tree()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _rebuild_tree(self) -> None:
+        tree = [0] * (len(self._buckets) + 1)
+        for i, bucket in enumerate(self._buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, bucket: int, delta: int) -> None:
+        i = bucket + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, bucket: int) -> int:
+        """Number of keys in buckets before ``bucket``"""
+        total, i = 0, bucket
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """(bucket, offset) of the key at ``position``"""
+        bucket, step = 0, 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = bucket + step
+            if nxt < len(self._tree) and self._tree[nxt] <= position:
+                bucket = nxt
+                position -= self._tree[nxt]
+            step >>= 1
+        return bucket, position
+
+    def add(self, key) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._rebuild_tree()
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._buckets):
+            i -= 1
+        bucket = self._buckets[i]
+        insort(bucket, key)
+        self._maxes[i] = bucket[-1]
+        self._len += 1
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(i, 1)
+
+    def remove(self, key) -> None:
+        i = bisect_left(self._maxes, key)
+        if i == len(self._buckets):
+            raise ValueError(f"{key!r} not in index")
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, key)
+        if j == len(bucket) or bucket[j] != key:
+            raise ValueError(f"{key!r} not in index")
+        del bucket[j]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._rebuild_tree()
+
+    def index(self, key) -> int:
+        """Number of keys less than ``key``"""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._buckets):
+            return self._len
+        return self._prefix(i) + bisect_left(self._buckets[i], key)
+
+    def index_right(self, key) -> int:
+        """Number of keys less than or equal to ``key``"""
+        # Keys are unique, so an equal key can only be in the first bucket whose max >= key
+        i = bisect_left(self._maxes, key)
+        if i == len(self._buckets):
+            return self._len
+        return self._prefix(i) + bisect_right(self._buckets[i], key)
+
+    def islice(self, start: int, stop: int) -> Iterator:
+        """Keys at positions [start, stop)"""
+        stop = min(stop, self._len)
+        if start >= stop:
+            return
+        bucket, offset = self._locate(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._buckets[bucket][offset:offset + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            bucket, offset = bucket + 1, 0
+
+
+class _GuildRanks:
+    __slots__ = ("keys", "users", "total_points", "total_earned")
+
+    def __init__(self):
+        self.keys = SortedKeys()
+        self.users: Dict[int, Tuple[int, int]] = {}
+        self.total_points = 0
+        self.total_earned = 0
+
+
+class AuraRankIndex:
+    """Per-guild aura standings, ordered like the leaderboard query"""
+
+    def __init__(self):
+        self._guilds: Dict[int, _GuildRanks] = {}
+
+    def load(self, rows: Iterable[Tuple[int, int, int, int]]) -> None:
+        """Replace everything with ``(guild_id, user_id, points, total_earned)`` rows"""
+        grouped: Dict[int, List[Tuple[int, int, int]]] = {}
+        for guild_id, user_id, points, total_earned in rows:
+            grouped.setdefault(guild_id, []).append((user_id, points or 0, total_earned or 0))
+        self._guilds = {}
+        for guild_id, members in grouped.items():
+            ranks = _GuildRanks()
+            ranks.keys = SortedKeys((-points, -earned, user_id) for user_id, points, earned in members)
+            ranks.users = {user_id: (points, earned) for user_id, points, earned in members}
+            ranks.total_points = sum(points for _, points, _ in members)
+            ranks.total_earned = sum(earned for _, _, earned in members)
+            self._guilds[guild_id] = ranks
+
+    def update(self, guild_id: int, user_id: int, points: int, total_earned: int) -> None:
+        """Record a user's current points and lifetime earnings"""
+        ranks = self._guilds.setdefault(guild_id, _GuildRanks())
+        old = ranks.users.get(user_id)
+        if old is not None:
+            if old == (points, total_earned):
+                return
+            ranks.keys.remove((-old[0], -old[1], user_id))
+            ranks.total_points -= old[0]
+            ranks.total_earned -= old[1]
+        ranks.keys.add((-points, -total_earned, user_id))
+        ranks.users[user_id] = (points, total_earned)
+        ranks.total_points += points
+        ranks.total_earned += total_earned
+
+    def get(self, guild_id: int, user_id: int) -> Tuple[int, int] | None:
+        ranks = self._guilds.get(guild_id)
+        return ranks.users.get(user_id) if ranks else None
+
+    def rank(self, guild_id: int, points: int) -> int:
+        """1 + the number of staff with more points (ties share a rank)"""
+        ranks = self._guilds.get(guild_id)
+        if ranks is None:
+            return 1
+        return ranks.keys.index((-points, -math.inf)) + 1
+
+    def count(self, guild_id: int, min_points: int = 1) -> int:
+        """How many staff have at least ``min_points``"""
+        ranks = self._guilds.get(guild_id)
+        if ranks is None:
+            return 0
+        return ranks.keys.index((-min_points + 1, -math.inf))
+
+    def page(self, guild_id: int, offset: int, limit: int, min_points: int = 1) -> List[Tuple[int, int, int]]:
+        """``(user_id, points, total_earned)`` for leaderboard positions [offset, offset + limit)"""
+        ranks = self._guilds.get(guild_id)
+        if ranks is None:
+            return []
+        stop = min(offset + limit, self.count(guild_id, min_points))
+        return [(user_id, -points, -earned) for points, earned, user_id in ranks.keys.islice(offset, stop)]
+
+    def page_after(self, guild_id: int, after: Optional[Key], limit: int,
+                   min_points: int = 1) -> List[Tuple[int, int, int, int]]:
+        """
+        ``(position, user_id, points, total_earned)`` for up to ``limit`` entries
+        ranked after the keyset cursor ``after`` (None starts at the top).
+        Positions are 1-based. The cursor need not still be in the index.
+        """
+        ranks = self._guilds.get(guild_id)
+        if ranks is None:
+            return []
+        start = 0 if after is None else ranks.keys.index_right(after)
+        stop = min(start + limit, self.count(guild_id, min_points))
+        return [(position, user_id, -points, -earned)
+                for position, (points, earned, user_id) in enumerate(ranks.keys.islice(start, stop), start + 1)]
+
+    def totals(self, guild_id: int) -> Tuple[int, int, int]:
+        """(staff rows, sum of points, sum of total_earned)"""
+        ranks = self._guilds.get(guild_id)
+        if ranks is None:
+            return 0, 0, 0
+        return len(ranks.users), ranks.total_points, ranks.total_earned
+
+
+__all__ = ['AuraRankIndex', 'SortedKeys']
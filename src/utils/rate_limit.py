@@ -0,0 +1,93 @@
+"""
+Keyed sliding-window rate limiter
+Allows at most ``limit`` events per key in any ``period`` seconds, the same
+rule as a timestamp log, but a key only keeps the expiry times of its last
+``limit`` accepted events (a tuple of at most ``limit`` floats), so a check
+costs O(limit) and the limits used here are single or low double digits.
+
+A key whose events have all left the window holds no information any more.
+Keys are kept in least-recently-used order, and every check drops up to
+EVICT_PER_CHECK idle keys from the front. Idle keys are only created by
+checks, so memory stays proportional to the keys active in the last
+period; a limiter that stops being checked keeps at most that many.
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+# Idle keys examined for eviction on each check
+EVICT_PER_CHECK = 2
+
+
+class RateLimiter:
+    """Sliding-window limiter; ``limit``/``period`` can be set once or passed per check"""
+
+    def __init__(self, limit: Optional[int] = None, period: Optional[float] = None, *,
+                 clock: Callable[[], float] = time.monotonic):
+        self.limit = limit
+        self.period = period
+        self.clock = clock
+        # key -> when each of its accepted events leaves the window, oldest first.
+        # Moved to the end on every accepted event, so the least recently used keys come first
+        # (OrderedDict keeps peeking at and popping the front O(1), unlike a plain dict)
+        self._expiries: "OrderedDict[Hashable, Tuple[float, ...]]" = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._expiries
+
+    def _params(self, limit: Optional[int], period: Optional[float]) -> Tuple[int, float]:
+        limit = self.limit if limit is None else limit
+        period = self.period if period is None else period
+        if not limit or not period:
+            raise ValueError("RateLimiter needs a limit and a period")
+        return limit, period
+
+    def _live(self, key: Hashable, now: float) -> Tuple[float, ...]:
+        return tuple(expiry for expiry in self._expiries.get(key, ()) if expiry > now)
+
+    def allow(self, key: Hashable, limit: Optional[int] = None, period: Optional[float] = None) -> bool:
+        """Record one event for ``key`` if it is within the limit; False if it is rate limited"""
+        limit, period = self._params(limit, period)
+        now = self.clock()
+        self._evict_some(now)
+        live = self._live(key, now)
+        if len(live) >= limit:
+            return False
+        self._expiries[key] = live + (now + period,)
+        # Move the key to the end of the eviction order
+        self._expiries.move_to_end(key)
+        return True
+
+    def used(self, key: Hashable, limit: Optional[int] = None, period: Optional[float] = None) -> int:
+        """How many of the ``limit`` slots are currently taken for ``key``"""
+        limit, period = self._params(limit, period)
+        return min(limit, len(self._live(key, self.clock())))
+
+    def retry_after(self, key: Hashable, limit: Optional[int] = None, period: Optional[float] = None) -> float:
+        """Seconds until ``key`` may act again (0 if it may act now)"""
+        limit, period = self._params(limit, period)
+        now = self.clock()
+        live = self._live(key, now)
+        if len(live) < limit:
+            return 0.0
+        return live[-limit] - now
+
+    def reset(self, key: Hashable) -> None:
+        self._expiries.pop(key, None)
+
+    def _evict_some(self, now: float) -> None:
+        for _ in range(EVICT_PER_CHECK):
+            if not self._expiries:
+                return
+            key, expiries = next(iter(self._expiries.items()))
+            if expiries[-1] > now:
+                return
+            self._expiries.popitem(last=False)
+            self.evicted += 1
+
+
+__all__ = ['RateLimiter']
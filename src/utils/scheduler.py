@@ -0,0 +1,107 @@
+"""
+Deadline scheduler
+One background task over a min-heap of (due, key) entries. It sleeps until
+the earliest deadline (or until the schedule changes) instead of polling,
+then hands each due key to an async callback. Rescheduling or cancelling a
+key is O(log n); stale heap entries are skipped when they reach the top.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger("codeverse.scheduler")
+
+# Re-check the clock at least this often so wall-clock jumps are noticed (seconds)
+MAX_SLEEP = 300.0
+
+
+class DeadlineScheduler:
+    """Calls ``callback(key)`` once ``time.time()`` reaches the key's deadline"""
+
+    def __init__(self, callback: Callable[[Hashable], Awaitable[None]], *, name: str = "scheduler"):
+        self.callback = callback
+        self.name = name
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._due: Dict[Hashable, Tuple[float, int]] = {}
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._due
+
+    def due(self, key: Hashable) -> Optional[float]:
+        entry = self._due.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key: Hashable, due: float) -> None:
+        """Set (or move) the deadline for ``key``, as a Unix timestamp"""
+        seq = next(self._seq)
+        self._due[key] = (due, seq)
+        heapq.heappush(self._heap, (due, seq, key))
+        if self._heap[0][1] == seq:
+            # New earliest deadline: let the timer task pick it up
+            self._wake.set()
+
+    def cancel(self, key: Hashable) -> None:
+        # The heap entry stays until it surfaces and is found stale
+        self._due.pop(key, None)
+
+    def clear(self) -> None:
+        self._due.clear()
+        self._heap.clear()
+
+    def next_due(self) -> Optional[float]:
+        """Earliest live deadline, dropping stale heap entries on the way"""
+        while self._heap:
+            due, seq, key = self._heap[0]
+            if self._due.get(key) == (due, seq):
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            due = self.next_due()
+            if due is None:
+                await self._wake.wait()
+                continue
+            delay = due - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key = heapq.heappop(self._heap)
+            del self._due[key]
+            self.fired += 1
+            try:
+                await self.callback(key)
+            except Exception:
+                logger.exception(f"{self.name}: callback for {key!r} failed")
+
+
+__all__ = ['DeadlineScheduler']
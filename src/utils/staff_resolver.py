@@ -0,0 +1,70 @@
+"""
+Shared staff-membership resolver
+Caches each guild's staff role IDs from staff_points (staff_config) and
+staff_shifts (shift_settings) so is-staff checks need no database access.
+The owning cogs load their table at startup and refresh a guild after
+every write to it.
+"""
+import logging
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger("codeverse.staff_resolver")
+
+# Where a set of staff roles is configured
+POINTS = "points"   # staff_points.db -> staff_config.staff_role_ids (comma separated)
+SHIFTS = "shifts"   # staff_shifts.db -> shift_settings.staff_role_ids (JSON list)
+
+
+class StaffResolver:
+    """Per-guild staff role-ID sets, one map per configuration source"""
+
+    def __init__(self):
+        self._roles: Dict[str, Dict[int, FrozenSet[int]]] = {POINTS: {}, SHIFTS: {}}
+
+    def load(self, source: str, rows: Iterable[Tuple[int, Iterable[int]]]) -> None:
+        """Replace everything cached for ``source`` with ``(guild_id, role_ids)`` rows"""
+        self._roles[source] = {guild_id: frozenset(role_ids) for guild_id, role_ids in rows if role_ids}
+        logger.info(f"Loaded staff roles from {source} for {len(self._roles[source])} guild(s)")
+
+    def set_roles(self, source: str, guild_id: int, role_ids: Iterable[int]) -> None:
+        """Record the current staff roles of one guild (called after writes)"""
+        roles = frozenset(role_ids)
+        if roles:
+            self._roles[source][guild_id] = roles
+        else:
+            self._roles[source].pop(guild_id, None)
+
+    def invalidate(self, source: str, guild_id: Optional[int] = None) -> None:
+        """Forget one guild (or every guild) for ``source``"""
+        if guild_id is None:
+            self._roles[source].clear()
+        else:
+            self._roles[source].pop(guild_id, None)
+
+    def role_ids(self, source: str, guild_id: int) -> FrozenSet[int]:
+        return self._roles[source].get(guild_id, frozenset())
+
+    def has_staff_role(self, source: str, member: discord.Member) -> bool:
+        """True if the member holds any staff role configured in ``source``"""
+        role_ids = self._roles[source].get(member.guild.id)
+        if not role_ids:
+            return False
+        return any(role.id in role_ids for role in member.roles)
+
+
+def parse_points_roles(value: Optional[str]) -> list[int]:
+    """staff_config.staff_role_ids is a comma separated string"""
+    return [int(rid) for rid in (value or "").split(',') if rid.isdigit()]
+
+
+_resolver = StaffResolver()
+
+
+def get_staff_resolver() -> StaffResolver:
+    """Return the process-wide resolver"""
+    return _resolver
+
+
+__all__ = ['StaffResolver', 'get_staff_resolver', 'parse_points_roles', 'POINTS', 'SHIFTS']